@@ -1,20 +1,38 @@
 
+import json
 from datetime import datetime
+from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status,Body
+from fastapi import APIRouter, Depends, HTTPException, status,Body, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from app.database.postgres_db import get_db
-from app.database.models import User, Interview, InterviewQuestion, UserAnswer, GlobalQuestion
+from app.database.chroma_db import chroma_db
+from app.database.models import User, Interview, InterviewQuestion, UserAnswer, GlobalQuestion, GenerationJob
 from app.services.question_service import QuestionService
 from app.services.question_generation_service import QuestionGenerationService
 from app.services.user_service import UserService
-from app.services.interview_orchestrator import InterviewOrchestrator
+from app.services.interview_orchestrator import InterviewOrchestrator, selection_metrics
+from app.services.generation_pipeline import generation_yield
+from app.services.generation_jobs import generation_job_runner, job_to_dict
+from app.services.rate_limiter import gemini_rate_limiter
+from app.services.usage_tracker import usage_tracker
+from app.services.question_cache import question_cache
+from app.services.question_bank_snapshot import question_bank_snapshot
+from app.services.vector_outbox import vector_outbox
+from app.services.exposure_sampler import exposure_sampler
+from app.services.interview_session import interview_sessions
+from app.services.question_prefetch import question_prefetcher
+from app.services.answer_scoring import answer_scorer
+from app.services.seen_questions import SeenQuestionService, TRACKED_QUESTION_TYPES
 from app import schemas
+from app.config import get_settings
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 
 # ==========================================
@@ -31,6 +49,24 @@ def health_check():
     }
 
 
+@router.get("/metrics")
+def get_metrics(db: Session = Depends(get_db)):
+    """Operational metrics (Gemini quota usage, question selection, generation yield, usage flushes, caches, outbox lag, prefetch, scoring)"""
+    return {
+        "gemini_usage": gemini_rate_limiter.usage_report(),
+        "question_selection": selection_metrics.snapshot(),
+        "generation_yield": generation_yield.snapshot(),
+        "usage_tracker": usage_tracker.snapshot(),
+        "question_cache": question_cache.snapshot(),
+        "question_bank_snapshot": question_bank_snapshot.snapshot(),
+        "vector_outbox": vector_outbox.snapshot(db),
+        "exposure_sampler": exposure_sampler.snapshot(),
+        "interview_sessions": interview_sessions.snapshot(),
+        "question_prefetch": question_prefetcher.snapshot(),
+        "answer_scoring": answer_scorer.snapshot()
+    }
+
+
 # ==========================================
 # USER MANAGEMENT
 # ==========================================
@@ -184,12 +220,13 @@ def fetch_next_question(
             "message": "All questions completed. Call /complete to finish."
         }
 
-    # Fetch question from database
-    next_question = db.query(GlobalQuestion).filter(
-        GlobalQuestion.subcategory == category,
-        GlobalQuestion.is_static == 1,
-        ~GlobalQuestion.question_id.in_(asked_question_ids) if asked_question_ids else True
-    ).first()
+    # Usage-balanced pick from the in-memory bank snapshot (skipping questions from the user's
+    # earlier interviews), then load the row through the question cache
+    seen = SeenQuestionService.load(db, interview.user_id)
+    picked = exposure_sampler.sample(
+        db, exclude_ids=asked_question_ids, seen=seen, subcategory=category, is_static=True
+    )
+    next_question = QuestionService.get_question_by_id(db, picked) if picked is not None else None
 
     if not next_question:
         raise HTTPException(
@@ -281,27 +318,32 @@ def ask_question(
         InterviewQuestion.interview_id == interview_id
     ).count()
 
-    # Create interview question
+    # Loaded before the insert, so a history backfill does not already contain this question
+    seen = SeenQuestionService.load(db, interview.user_id)
+
+    # Create interview question (+ the user's seen filter in the same transaction)
     interview_question = InterviewQuestion(
         interview_id=interview_id,
-        user_id=interview.user_id,
         question_id=global_question.question_id,
-        question_text=global_question.question_text,
+        order_index=question_count + 1,
         question_type=global_question.question_type,
-        order_number=question_count + 1
+        subcategory=global_question.subcategory
     )
 
     db.add(interview_question)
+    db.flush()
+    if global_question.question_type in TRACKED_QUESTION_TYPES:
+        SeenQuestionService.record(db, interview.user_id, seen, [global_question.question_id])
     db.commit()
-    db.refresh(interview_question)
+    interview_sessions.drop(interview_id)  # inserted outside the orchestrator's session
 
     logger.info(f"Question {interview_question.id} asked in interview {interview_id}")
 
     return {
         "interview_question_id": interview_question.id,
-        "question_text": interview_question.question_text,
+        "question_text": global_question.question_text,
         "question_type": interview_question.question_type,
-        "order_number": interview_question.order_number,
+        "order_number": interview_question.order_index,
         "message": "Question added to interview. User can now answer it."
     }
 
@@ -316,6 +358,7 @@ def complete_interview(
     """
     Step 5: Complete interview
     Marks interview as completed and calculates statistics
+    (score = mean of per-question scores, written by the answer scorer: null while answers are still scored)
     """
     interview = db.query(Interview).filter(
         Interview.interview_id == interview_id
@@ -327,15 +370,22 @@ def complete_interview(
     if interview.status == "completed":
         raise HTTPException(status_code=400, detail="Interview already completed")
 
-    answer_count = db.query(UserAnswer).filter(
-        UserAnswer.interview_id == interview_id
-    ).count()
+    answer_count = db.execute(
+        select(func.count(UserAnswer.id)).where(UserAnswer.interview_id == interview_id)
+    ).scalar()
 
     interview.status = "completed"
     interview.total_questions = answer_count
+    interview.score = None
     interview.completed_at = func.now()
 
     db.commit()
+    # Scoring stays off the request path; with nothing left to score only the SQL aggregate runs
+    if not answer_scorer.enqueue_unscored(db, interview_id):
+        answer_scorer.update_interview_scores(db, [interview_id])
+        db.commit()
+    interview_sessions.drop(interview_id)
+    question_prefetcher.cancel(interview_id)
     db.refresh(interview)
 
     logger.info(f"Interview {interview_id} completed with {answer_count} answers")
@@ -495,12 +545,26 @@ def create_question(question: schemas.QuestionCreate, db: Session = Depends(get_
     - Personalized questions (experience, project): No similarity check, PostgreSQL only
     """
     question_type = question.question_type.lower()
+    embedding = None
+
+    # Exact duplicate: indexed hash lookup before any embedding work
+    if not QuestionService.is_personalized_question(question_type):
+        existing = QuestionService.get_question_by_hash(db, question.question_text)
+        if existing:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Question already exists with ID {existing.question_id}"
+            )
 
     # Only check similarity for generic question types
     if QuestionService.should_store_in_vector_db(question_type):
+        # Encode once: the same vector serves the similarity check and the insert
+        embedding = chroma_db.generate_embedding(question.question_text)
         similar = QuestionService.check_question_similarity(
             question.question_text,
-            threshold=0.85
+            question_type=question_type,
+            threshold=0.85,
+            embedding=embedding
         )
 
         if similar:
@@ -511,7 +575,7 @@ def create_question(question: schemas.QuestionCreate, db: Session = Depends(get_
 
     # Create question
     question_data = question.model_dump()
-    new_question = QuestionService.create_question(db, question_data)
+    new_question = QuestionService.create_question(db, question_data, embedding=embedding)
 
     storage_info = "PostgreSQL + ChromaDB" if QuestionService.should_store_in_vector_db(
         question_type) else "PostgreSQL only"
@@ -558,6 +622,35 @@ def get_question_by_id(question_id: int, db: Session = Depends(get_db)):
     return question
 
 
+@router.put("/questions/{question_id}", response_model=schemas.QuestionResponse)
+def update_question(question_id: int, update: schemas.QuestionUpdate, db: Session = Depends(get_db)):
+    """
+    Update a question
+    Only a text change re-encodes the vector; other edits are metadata-only
+    """
+    try:
+        question = QuestionService.update_question(db, question_id, update.model_dump(exclude_unset=True))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    if not question:
+        raise HTTPException(status_code=404, detail="Question not found")
+    return question
+
+
+@router.patch("/questions/bulk")
+def bulk_update_questions(request: schemas.QuestionBulkUpdate, db: Session = Depends(get_db)):
+    """
+    Update many questions in one transaction (e.g. re-tagging)
+    Vector changes are batched through the outbox; unchanged text is never re-encoded
+    """
+    try:
+        return QuestionService.bulk_update_questions(
+            db, [item.model_dump(exclude_unset=True) | {"question_id": item.question_id} for item in request.updates]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
 @router.get("/questions/stats/summary")
 def get_question_statistics(db: Session = Depends(get_db)):
     """Get statistics about questions in database"""
@@ -780,6 +873,42 @@ def generate_technical_question(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post(
+    "/questions/generate/jobs",
+    response_model=schemas.GenerationJobResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+def create_generation_job(job: schemas.GenerationJobCreate, db: Session = Depends(get_db)):
+    """
+    Queue a bulk generation job (e.g. 500 technical questions for a new role).
+    Workers run it under the shared Gemini rate limit; poll GET for progress.
+    """
+    if job.count > settings.GENERATION_JOB_MAX_COUNT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"count must be <= {settings.GENERATION_JOB_MAX_COUNT}"
+        )
+
+    new_job = generation_job_runner.create_job(
+        db,
+        question_type=job.question_type,
+        job_role=job.job_role,
+        count=job.count,
+        industry=job.industry,
+        skills=job.skills
+    )
+    return job_to_dict(new_job)
+
+
+@router.get("/questions/generate/jobs/{job_id}", response_model=schemas.GenerationJobResponse)
+def get_generation_job(job_id: int, db: Session = Depends(get_db)):
+    """Bulk generation job status: progress, yield per Gemini call and dedup statistics"""
+    job = db.query(GenerationJob).filter(GenerationJob.job_id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+    return job_to_dict(job)
+
+
 # 🔥 ADD THESE 4 ENDPOINTS (append to existing router)
 @router.post("/interviews/", response_model=dict)
 async def create_interview(request: schemas.CreateInterviewRequest, db: Session = Depends(get_db)):
@@ -804,17 +933,19 @@ async def create_interview(request: schemas.CreateInterviewRequest, db: Session
 
 @router.post("/interviews/{interview_id}/start")
 async def start_interview(interview_id: int, db: Session = Depends(get_db)):
-    """🎯 PHASE 3: Mark interview as started (no pre-loading)"""
+    """🎯 PHASE 3: Mark interview as started and plan all slots (INTERVIEW_PLANNING_ENABLED)"""
     interview = db.query(Interview).filter(Interview.interview_id == interview_id).first()
     if not interview:
         raise HTTPException(404, "Interview not found")
 
-    # Just mark as started - NO question pre-loading!
     interview.status = "in_progress"
     db.commit()
 
     orchestrator = InterviewOrchestrator(db)
 
+    # Planning mode: every slot picked now, next-question only reveals them
+    plan = orchestrator.plan_interview(interview_id) if settings.INTERVIEW_PLANNING_ENABLED else None
+
     # Return FIRST question immediately (user can answer it)
     first_question = orchestrator.get_next_question(interview_id)
 
@@ -823,19 +954,55 @@ async def start_interview(interview_id: int, db: Session = Depends(get_db)):
     return {
         "interview_id": interview_id,
         "first_question": first_question,  # Single question object
+        "plan": plan,
         "message": "Interview started - answer first question to continue",
         "next_action": "POST /interviews/{interview_id}/next-question"
     }
 
 
 @router.post("/interviews/{interview_id}/next-question")
-async def next_question(interview_id: int, db: Session = Depends(get_db)):
-    """🎯 PHASE 3: SINGLE ENDPOINT - Smart next question"""
+async def next_question(
+        interview_id: int,
+        deadline_ms: Optional[int] = Query(None, gt=0, le=60000),
+        db: Session = Depends(get_db)
+):
+    """
+    🎯 PHASE 3: SINGLE ENDPOINT - Smart next question
+    deadline_ms overrides the deployment's QUESTION_DEADLINE_MS for this call
+    """
     orchestrator = InterviewOrchestrator(db)
-    result = orchestrator.get_next_question(interview_id)
+    result = orchestrator.get_next_question(interview_id, deadline_ms=deadline_ms)
     return result
 
 
+@router.get("/interviews/{interview_id}/next-question/stream")
+def next_question_stream(
+        interview_id: int,
+        deadline_ms: Optional[int] = Query(None, gt=0, le=60000),
+        db: Session = Depends(get_db)
+):
+    """
+    🎯 PHASE 3: Server-Sent Events version of /next-question
+    AI-generated text is relayed token by token ("token" events); the stored
+    question (deduplicated against the bank) arrives in the final "question" event.
+    """
+    orchestrator = InterviewOrchestrator(db)
+
+    def event_stream():
+        try:
+            for event in orchestrator.stream_next_question(interview_id, deadline_ms=deadline_ms):
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming next question for interview {interview_id}: {e}")
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/interviews/{interview_id}/questions/{interview_question_id}/answer")
 async def submit_answer(
         interview_id: int,
@@ -845,7 +1012,10 @@ async def submit_answer(
 ):
     """🎯 PHASE 3: Store answer + prepare next"""
     orchestrator = InterviewOrchestrator(db)
-    result = orchestrator.submit_answer(interview_question_id, answer.answer_text)
+    try:
+        result = orchestrator.submit_answer(interview_question_id, answer.answer_text, interview_id=interview_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     return result
 
 @router.get("/interviews/{interview_id}/status")
@@ -21,11 +21,88 @@ class Settings(BaseSettings):
     # Gemini API Settings
     GEMINI_API_KEY: str  # Add this line
     GEMINI_MODEL: str = "gemini-2.0-flash"
+    # Point at app/scripts/gemini_stub_server.py (e.g. http://localhost:8089/v1beta) for offline runs
+    GEMINI_BASE_URL: str = "https://generativelanguage.googleapis.com/v1beta"
     GEMINI_TEMPERATURE: float = 0.7  # Add this line
     GEMINI_MAX_TOKENS: int = 1000  # Add this line
+    GEMINI_BATCH_SIZE: int = 10  # Questions requested per batch call
+    GEMINI_BATCH_MAX_SIZE: int = 25  # Upper bound so one response fits the output budget
+    GEMINI_BATCH_TOKENS_PER_QUESTION: int = 200  # Output budget per question in a batch
+    GENERATION_OVERSAMPLE_K: int = 20  # Candidates requested per over-generate-and-filter call
+
+    # Bulk generation jobs
+    GENERATION_JOB_WORKERS: int = 2  # Jobs running concurrently in this process
+    GENERATION_JOB_MAX_COUNT: int = 5000  # Upper bound on questions requested by one job
+    GENERATION_JOB_MAX_EMPTY_BATCHES: int = 5  # Consecutive zero-yield calls before a job stops (bank saturated)
+    GENERATION_JOB_MAX_FAILURES: int = 5  # Consecutive failed calls before a job is marked failed
+    GENERATION_JOB_RETRY_BACKOFF: float = 5.0  # Seconds, doubled per consecutive failure
+    GENERATION_JOB_STALE_SECONDS: int = 120  # Heartbeat age after which a running job can be taken over
+
+    # Gemini quota shared by all workers (token buckets in a local SQLite file)
+    GEMINI_REQUESTS_PER_MINUTE: int = 15
+    GEMINI_TOKENS_PER_MINUTE: int = 1_000_000
+    GEMINI_RATE_LIMIT_DB: str = "./gemini_rate_limit.db"
+    GEMINI_RATE_LIMIT_MAX_WAIT: float = 30.0  # Seconds a blocking caller may queue
+    GEMINI_REQUEST_TIMEOUT_SECONDS: float = 30.0  # Cap on any single Gemini HTTP call
+
+    # Question selection latency budget (per get_next_question, overridable per request)
+    QUESTION_DEADLINE_MS: int = 4000
+    QUESTION_SELECTION_MAX_ATTEMPTS: int = 3
+    QUESTION_HEDGE_WORKERS: int = 4  # Background threads for hedged AI generation
+    GEMINI_LATENCY_WINDOW: int = 200  # Calls kept for the rolling p95
+    GEMINI_DEFAULT_P95_MS: int = 2500  # Hedge budget until enough calls were observed
 
     # Similarity threshold for duplicate detection
     SIMILARITY_THRESHOLD: float = 0.85  # Add this line
+    STATIC_LOAD_BATCH_SIZE: int = 1000  # Rows per multi-row INSERT / vectors per ChromaDB add in bulk loads
+    QUESTION_STATS_TTL_SECONDS: int = 60  # Full refresh of cached question stats (catches other processes' writes)
+    BANK_INVENTORY_TTL_SECONDS: int = 300  # Full refresh of per-(role, industry, type) question counts
+    QUESTION_BANK_SNAPSHOT_TTL_SECONDS: int = 600  # Full rebuild (and tombstone compaction) of the columnar bank snapshot
+
+    # Write-behind usage_count aggregation
+    USAGE_FLUSH_INTERVAL_SECONDS: float = 5.0
+    USAGE_FLUSH_THRESHOLD: int = 500  # Pending questions that trigger an early flush
+
+    # Read-through cache of questions by id
+    QUESTION_CACHE_MAX_SIZE: int = 5000
+    QUESTION_CACHE_TTL_SECONDS: int = 300
+
+    # Usage-balanced selection: weight = 1 / (1 + usage_count) ** alpha (0 = uniform)
+    EXPOSURE_ALPHA: float = 1.0
+
+    # PostgreSQL -> ChromaDB outbox dispatcher
+    VECTOR_OUTBOX_BATCH_SIZE: int = 256  # Entries claimed (and encoded together) per dispatch
+    VECTOR_OUTBOX_POLL_SECONDS: float = 1.0  # Idle poll interval; writes in this process wake the dispatcher at once
+    VECTOR_OUTBOX_RETRY_BACKOFF: float = 2.0  # Seconds, doubled per failed attempt
+    VECTOR_OUTBOX_MAX_BACKOFF: float = 300.0
+    VECTOR_OUTBOX_MAX_ATTEMPTS: int = 8  # Failed attempts before an entry is parked (kept, no longer claimed)
+
+    # Per-interview session state (orchestrator working set)
+    INTERVIEW_SESSION_MAX_SIZE: int = 10000
+    INTERVIEW_SESSION_TTL_SECONDS: int = 3600  # Idle time before a session is re-hydrated
+
+    # Answer scoring (background, batched)
+    ANSWER_SCORING_BATCH_SIZE: int = 256
+    ANSWER_SCORING_INTERVAL_SECONDS: float = 2.0
+    ANSWER_SCORING_MAX_ATTEMPTS: int = 3  # Failed scoring attempts before an answer is dropped
+    ANSWER_SIMILARITY_WEIGHT: float = 0.6  # Whole-answer similarity vs expected-sentence coverage
+    ANSWER_COVERAGE_THRESHOLD: float = 0.6  # Sentence similarity that counts an expected point as covered
+
+    # Speculative prefetch of the next question on answer submission (unplanned slots)
+    QUESTION_PREFETCH_ENABLED: bool = True
+    QUESTION_PREFETCH_WORKERS: int = 4
+
+    # Per-user seen-question Bloom filter (cross-interview repeat avoidance)
+    SEEN_FILTER_BITS: int = 16384  # 2 KB per user; ~0.001% false positives at 500 questions, ~2% at 2000
+    SEEN_FILTER_HASHES: int = 7
+
+    # Interview planning (whole plan picked at /start)
+    INTERVIEW_PLANNING_ENABLED: bool = True
+    INTERVIEW_PLAN_WORKERS: int = 4  # Background threads generating planned AI slots
+    INTERVIEW_PLAN_CANDIDATES_PER_TYPE: int = 10  # Chroma hits fetched per planned question type
+
+    # Interview phases
+    INTRODUCTORY_PHASE_LENGTH: int = 3  # Slots served from the mandatory roster
 
     class Config:
         env_file = '/Users/disha/PycharmProjects/ai-mock-interview/.env'
@@ -56,6 +56,36 @@ class ChromaDBManager:
         embedding = self._embedding_model.encode(text, normalize_embeddings=True)
         return embedding.tolist()
 
+    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for many texts in a single encode call"""
+        if not texts:
+            return []
+        embeddings = self._embedding_model.encode(texts, normalize_embeddings=True)
+        return embeddings.tolist()
+
+    @staticmethod
+    def _build_metadata(
+            question_id: int,
+            question_type: str,
+            industry: str = "general",
+            job_role: str = "general",
+            difficulty: str = "medium",
+            tags: Optional[List[str]] = None,
+            subcategory: Optional[str] = None,
+            is_static: int = 0
+    ) -> Dict:
+        """Prepare metadata (ChromaDB requires string/int/float values)"""
+        return {
+            "question_id": str(question_id),
+            "question_type": question_type,
+            "industry": industry,
+            "job_role": job_role,
+            "difficulty": difficulty,
+            "tags": ",".join(tags) if tags else "",  # Store as comma-separated string
+            "subcategory": subcategory or "general",
+            "is_static": is_static
+        }
+
     def add_question(
             self,
             question_id: int,
@@ -66,7 +96,8 @@ class ChromaDBManager:
             difficulty: str = "medium",
             tags: Optional[List[str]] = None,
             subcategory: Optional[str] = None,
-            is_static: int = 0
+            is_static: int = 0,
+            embedding: Optional[List[float]] = None
     ):
         """
         Add question to vector database with comprehensive metadata
@@ -81,21 +112,16 @@ class ChromaDBManager:
             tags: List of tags for the question
             subcategory: Subcategory (introductory, behavioral, etc.)
             is_static: 1 for static questions, 0 for generated
+            embedding: Precomputed (normalized) embedding; encoded here if omitted
         """
         try:
-            embedding = self.generate_embedding(question_text)
-
-            # Prepare metadata (ChromaDB requires string/int/float values)
-            metadata = {
-                "question_id": str(question_id),
-                "question_type": question_type,
-                "industry": industry,
-                "job_role": job_role,
-                "difficulty": difficulty,
-                "tags": ",".join(tags) if tags else "",  # Store as comma-separated string
-                "subcategory": subcategory or "general",
-                "is_static": is_static
-            }
+            if embedding is None:
+                embedding = self.generate_embedding(question_text)
+
+            metadata = self._build_metadata(
+                question_id, question_type, industry, job_role,
+                difficulty, tags, subcategory, is_static
+            )
 
             self._collection.add(
                 ids=[str(question_id)],
@@ -108,20 +134,165 @@ class ChromaDBManager:
             logger.error(f"Error adding question to ChromaDB: {e}")
             raise
 
+    def add_questions(self, questions: List[Dict]):
+        """
+        Add many questions to vector database in one call
+        Texts are encoded in a single batch instead of one model call per question
+
+        Args:
+            questions: Dicts with the same keys as add_question's parameters
+                       (an "embedding" entry skips encoding for that question)
+        """
+        if not questions:
+            return
+
+        try:
+            embeddings = self._fill_embeddings(questions)
+
+            self._collection.add(
+                ids=[str(q["question_id"]) for q in questions],
+                embeddings=embeddings,
+                documents=[q["question_text"] for q in questions],
+                metadatas=[
+                    self._build_metadata(
+                        q["question_id"],
+                        q["question_type"],
+                        q.get("industry") or "general",
+                        q.get("job_role") or "general",
+                        q.get("difficulty") or "medium",
+                        q.get("tags"),
+                        q.get("subcategory"),
+                        q.get("is_static", 0)
+                    )
+                    for q in questions
+                ]
+            )
+            logger.info(f"Added {len(questions)} questions to ChromaDB")
+        except Exception as e:
+            logger.error(f"Error adding questions to ChromaDB: {e}")
+            raise
+
+    def _fill_embeddings(self, questions: List[Dict]) -> List[List[float]]:
+        """Use precomputed embeddings where given, batch-encode the rest"""
+        missing = [i for i, q in enumerate(questions) if q.get("embedding") is None]
+        encoded = self.generate_embeddings([questions[i]["question_text"] for i in missing])
+
+        embeddings = [q.get("embedding") for q in questions]
+        for i, embedding in zip(missing, encoded):
+            embeddings[i] = embedding
+        return [list(e) for e in embeddings]
+
+    def upsert_questions(self, questions: List[Dict]):
+        """
+        Insert or replace many questions in one call (idempotent counterpart of add_questions)
+        Missing embeddings are encoded in a single batch
+        """
+        if not questions:
+            return
+
+        try:
+            self._collection.upsert(
+                ids=[str(q["question_id"]) for q in questions],
+                embeddings=self._fill_embeddings(questions),
+                documents=[q["question_text"] for q in questions],
+                metadatas=[
+                    self._build_metadata(
+                        q["question_id"],
+                        q["question_type"],
+                        q.get("industry") or "general",
+                        q.get("job_role") or "general",
+                        q.get("difficulty") or "medium",
+                        q.get("tags"),
+                        q.get("subcategory"),
+                        q.get("is_static") or 0
+                    )
+                    for q in questions
+                ]
+            )
+            logger.info(f"Upserted {len(questions)} questions in ChromaDB")
+        except Exception as e:
+            logger.error(f"Error upserting questions in ChromaDB: {e}")
+            raise
+
+    def update_questions_metadata(self, questions: List[Dict]):
+        """
+        Replace the metadata of many existing questions in one call
+        Embeddings and documents are left untouched (no encoding)
+        """
+        if not questions:
+            return
+
+        try:
+            self._collection.update(
+                ids=[str(q["question_id"]) for q in questions],
+                metadatas=[
+                    self._build_metadata(
+                        q["question_id"],
+                        q["question_type"],
+                        q.get("industry") or "general",
+                        q.get("job_role") or "general",
+                        q.get("difficulty") or "medium",
+                        q.get("tags"),
+                        q.get("subcategory"),
+                        q.get("is_static") or 0
+                    )
+                    for q in questions
+                ]
+            )
+            logger.info(f"Updated metadata of {len(questions)} questions in ChromaDB")
+        except Exception as e:
+            logger.error(f"Error updating question metadata in ChromaDB: {e}")
+            raise
+
+    def upsert_question(
+            self,
+            question_id: int,
+            question_text: str,
+            question_type: str,
+            industry: str = "general",
+            job_role: str = "general",
+            difficulty: str = "medium",
+            tags: Optional[List[str]] = None,
+            subcategory: Optional[str] = None,
+            is_static: int = 0,
+            embedding: Optional[List[float]] = None
+    ):
+        """Insert or replace a question (idempotent counterpart of add_question)"""
+        try:
+            if embedding is None:
+                embedding = self.generate_embedding(question_text)
+
+            self._collection.upsert(
+                ids=[str(question_id)],
+                embeddings=[embedding],
+                documents=[question_text],
+                metadatas=[self._build_metadata(
+                    question_id, question_type, industry, job_role,
+                    difficulty, tags, subcategory, is_static
+                )]
+            )
+            logger.info(f"Upserted question {question_id} in ChromaDB")
+        except Exception as e:
+            logger.error(f"Error upserting question in ChromaDB: {e}")
+            raise
+
     def find_similar_questions(
             self,
             question_text: str,
             n_results: int = 5,
-            threshold: float = 0.85
+            threshold: float = 0.85,
+            embedding: Optional[List[float]] = None
     ) -> List[Dict]:
         """
         Find similar questions using cosine similarity
         Returns questions with similarity >= threshold
+        Pass `embedding` when the caller already encoded question_text
 
         Used for: Duplicate detection
         """
         try:
-            embedding = self.generate_embedding(question_text)
+            if embedding is None:
+                embedding = self.generate_embedding(question_text)
 
             results = self._collection.query(
                 query_embeddings=[embedding],
@@ -153,11 +324,50 @@ class ChromaDBManager:
             logger.error(f"Error finding similar questions: {e}")
             return []
 
+    def nearest_questions(
+            self,
+            embeddings: List[List[float]],
+            question_type: Optional[str] = None
+    ) -> List[Optional[Dict]]:
+        """
+        Nearest stored question for EACH embedding in a single query
+        Used for: Batch duplicate detection
+
+        Returns:
+            One {'question_id', 'similarity'} dict per embedding (None if the collection is empty)
+        """
+        if not embeddings:
+            return []
+
+        try:
+            results = self._collection.query(
+                query_embeddings=embeddings,
+                n_results=1,
+                where={"question_type": question_type} if question_type else None,
+                include=["distances"]
+            )
+
+            nearest = []
+            for ids, distances in zip(results['ids'], results['distances']):
+                if ids:
+                    nearest.append({
+                        'question_id': int(ids[0]),
+                        'similarity': 1 - (distances[0] / 2)
+                    })
+                else:
+                    nearest.append(None)
+            return nearest
+
+        except Exception as e:
+            logger.error(f"Error finding nearest questions: {e}")
+            raise
+
     def check_duplicate_question(
             self,
             question_text: str,
             question_type: str,
-            threshold: float = 0.85
+            threshold: float = 0.85,
+            embedding: Optional[List[float]] = None
     ) -> Optional[Dict]:
         """
         Purpose 2: Duplicate Detection
@@ -168,12 +378,14 @@ class ChromaDBManager:
             question_text: The new question to check
             question_type: Filter by question type (hr, technical, behavioral)
             threshold: Similarity threshold (0.85 = 85% similar)
+            embedding: Precomputed embedding of question_text (optional)
 
         Returns:
             Dict with duplicate question info, or None if unique
         """
         try:
-            embedding = self.generate_embedding(question_text)
+            if embedding is None:
+                embedding = self.generate_embedding(question_text)
 
             # Search only within same question type
             results = self._collection.query(
@@ -426,11 +638,23 @@ class ChromaDBManager:
         except Exception as e:
             logger.error(f"Error deleting question from ChromaDB: {e}")
 
+    def delete_questions(self, question_ids: List[int]):
+        """Remove many questions from vector database in one call"""
+        if not question_ids:
+            return
+        try:
+            self._collection.delete(ids=[str(qid) for qid in question_ids])
+            logger.info(f"Deleted {len(question_ids)} questions from ChromaDB")
+        except Exception as e:
+            logger.error(f"Error deleting questions from ChromaDB: {e}")
+            raise
+
     def update_question(
             self,
             question_id: int,
             question_text: Optional[str] = None,
-            metadata: Optional[Dict] = None
+            metadata: Optional[Dict] = None,
+            embedding: Optional[List[float]] = None
     ):
         """
         Update existing question in ChromaDB
@@ -439,12 +663,14 @@ class ChromaDBManager:
             question_id: ID of question to update
             question_text: New question text (will regenerate embedding)
             metadata: New metadata to update
+            embedding: Precomputed embedding of question_text (optional)
         """
         try:
             update_params = {"ids": [str(question_id)]}
 
             if question_text:
-                embedding = self.generate_embedding(question_text)
+                if embedding is None:
+                    embedding = self.generate_embedding(question_text)
                 update_params["embeddings"] = [embedding]
                 update_params["documents"] = [question_text]
 
@@ -522,6 +748,52 @@ class ChromaDBManager:
             logger.error(f"Error in query_similar_questions: {e}")
             return []
 
+    def query_profile_candidates(
+            self,
+            embedding: List[float],
+            question_types: List[str],
+            job_role: Optional[str] = None,
+            limit_per_type: int = 10
+    ) -> Dict[str, List[Dict]]:
+        """
+        Nearest questions of SEVERAL types for one embedding, up to limit_per_type each
+        One query per type, so a dense type can never crowd the others out.
+        Used by InterviewOrchestrator.plan_interview
+
+        Returns:
+            question_type -> [{'question_id', 'similarity'}, ...], best first
+        """
+        candidates = {qtype: [] for qtype in question_types}
+        if not question_types:
+            return candidates
+
+        try:
+            for qtype in question_types:
+                conditions = [{"question_type": qtype}]
+                if job_role:
+                    conditions.append({"job_role": job_role})
+
+                results = self._collection.query(
+                    query_embeddings=[embedding],
+                    n_results=limit_per_type,
+                    where=conditions[0] if len(conditions) == 1 else {"$and": conditions},
+                    include=["distances"]
+                )
+
+                if results['ids'] and len(results['ids'][0]) > 0:
+                    for qid, distance in zip(results['ids'][0], results['distances'][0]):
+                        candidates[qtype].append({
+                            'question_id': int(qid),
+                            'similarity': 1 - (distance / 2)  # L2 → cosine
+                        })
+
+            logger.info(f"🔍 Chroma plan query: { {t: len(hits) for t, hits in candidates.items()} }")
+            return candidates
+
+        except Exception as e:
+            logger.error(f"Error in query_profile_candidates: {e}")
+            return candidates
+
 
 # Create singleton instance
 chroma_db = ChromaDBManager()
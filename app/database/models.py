@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text, JSON,Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text, JSON,Boolean, LargeBinary
 # from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql import func
@@ -55,6 +55,7 @@ class GlobalQuestion(Base):
 
     question_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     question_text = Column(Text, nullable=False)
+    question_hash = Column(String(64), nullable=True, unique=True, index=True)  # sha256 of normalized text (NULL for personalized)
     question_type = Column(String(50), nullable=False, index=True)  # hr, technical, behavioral
     subcategory = Column(String(100), index=True)  # introductory, behavioral, personality
     tags = Column(JSON)  # Store as JSON array
@@ -75,6 +76,9 @@ class GlobalQuestion(Base):
 
 class InterviewQuestion(Base):
     __tablename__ = "interview_questions"
+    __table_args__ = (
+        UniqueConstraint("interview_id", "order_index", name="uq_interview_order"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     interview_id = Column(Integer, ForeignKey("interviews.interview_id"), nullable=False, index=True)
@@ -128,3 +132,73 @@ class UserAnswer(Base):
     expected_answer = Column(Text, nullable=True)
     submitted_at = Column(DateTime(timezone=True), server_default=func.now())
     score = Column(Float, nullable=True)  # Individual question score
+
+
+class GenerationJob(Base):
+    """Bulk question-generation job (progress persisted so jobs survive restarts)"""
+    __tablename__ = "generation_jobs"
+
+    job_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    question_type = Column(String(50), nullable=False)  # hr, technical
+    job_role = Column(String(100), nullable=False)
+    industry = Column(String(100), default="general")
+    skills = Column(Text, nullable=True)
+    target_count = Column(Integer, nullable=False)
+    status = Column(String(20), default="queued", index=True)  # queued, running, completed, failed, cancelled
+
+    # Progress + yield/dedup statistics (accumulated per Gemini batch call)
+    stored_count = Column(Integer, default=0)
+    gemini_calls = Column(Integer, default=0)
+    failed_calls = Column(Integer, default=0)
+    candidates = Column(Integer, default=0)
+    exact_duplicates = Column(Integer, default=0)
+    intra_batch_duplicates = Column(Integer, default=0)
+    bank_duplicates = Column(Integer, default=0)
+
+    owner = Column(String(64), nullable=True)  # process currently running the job
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class VectorOutbox(Base):
+    """Pending PostgreSQL -> ChromaDB write, committed in the same transaction as the question change"""
+    __tablename__ = "vector_outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    question_id = Column(Integer, nullable=False, index=True)  # no FK: delete entries outlive their row
+    operation = Column(String(10), nullable=False)  # upsert, metadata, delete
+    embedding = Column(JSON, nullable=True)  # precomputed vector (skips encoding on dispatch)
+    attempts = Column(Integer, default=0)
+    available_at = Column(DateTime(timezone=True), nullable=True, index=True)  # NULL = dispatch now, else retry backoff
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class InterviewPlanSlot(Base):
+    """One precomputed slot of an interview plan (filled at /start, revealed by next-question)"""
+    __tablename__ = "interview_plan_slots"
+    __table_args__ = (
+        UniqueConstraint("interview_id", "order_number", name="uq_interview_plan_order"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    interview_id = Column(Integer, ForeignKey("interviews.interview_id"), nullable=False, index=True)
+    order_number = Column(Integer, nullable=False)  # 1-based, same as next-question's order_number
+    question_type = Column(String(50), nullable=False)
+    question_id = Column(Integer, ForeignKey("global_questions.question_id"), nullable=True)  # NULL while generating
+    source = Column(String(10), nullable=False)  # roster, bank, ai
+    status = Column(String(10), nullable=False, default="ready")  # ready, pending, failed
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class UserSeenQuestions(Base):
+    """Bloom filter of the bank questions a user was already asked (across interviews)"""
+    __tablename__ = "user_seen_questions"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    bloom = Column(LargeBinary, nullable=False)  # SEEN_FILTER_BITS / 8 bytes
+    item_count = Column(Integer, default=0)  # questions added (for the false-positive estimate)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
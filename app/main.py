@@ -13,6 +13,12 @@ from app.database.postgres_db import engine, init_db, SessionLocal
 from app.database.chroma_db import chroma_db
 from app.database.models import Base
 from app.services.question_service import QuestionService
+from app.services.generation_jobs import generation_job_runner
+from app.services.usage_tracker import usage_tracker
+from app.services.mandatory_roster import mandatory_roster
+from app.services.vector_outbox import vector_outbox
+from app.services.answer_scoring import answer_scorer
+from app.services.interview_orchestrator import check_stale_session_protection
 from app.api.routes import router
 from app.config import get_settings
 
@@ -80,6 +86,35 @@ async def lifespan(app: FastAPI):
         finally:
             db.close()
 
+        # Introductory questions are served from memory; refuse to start without enough of them
+        db = SessionLocal()
+        try:
+            mandatory_roster.load(db)
+            check_stale_session_protection(db)
+        finally:
+            db.close()
+
+        usage_tracker.start()
+        vector_outbox.start()
+
+        # Score answers left in the queue by the last shutdown/crash
+        db = SessionLocal()
+        try:
+            pending_answers = answer_scorer.enqueue_unscored(db)
+            if pending_answers:
+                logger.info(f"✓ {pending_answers} unscored answers queued for scoring")
+        except Exception as e:
+            logger.error(f"❌ Error queueing unscored answers: {e}")
+        finally:
+            db.close()
+        answer_scorer.start()
+
+        # Resume bulk generation jobs interrupted by the last shutdown/crash
+        try:
+            generation_job_runner.resume_pending()
+        except Exception as e:
+            logger.error(f"❌ Error resuming generation jobs: {e}")
+
         logger.info("✅ AI Mock Interview API started successfully!")
         logger.info(f"📖 API Documentation: http://localhost:8000/docs")
         logger.info(f"🔍 Health Check: http://localhost:8000/api/{settings.API_VERSION}/health")
@@ -94,6 +129,10 @@ async def lifespan(app: FastAPI):
     # SHUTDOWN
     # ============================================================
     logger.info("🛑 Shutting down AI Mock Interview API...")
+    generation_job_runner.shutdown()
+    answer_scorer.stop()
+    vector_outbox.stop()
+    usage_tracker.stop()
     logger.info("✓ Cleanup completed")
 
 
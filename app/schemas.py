@@ -153,6 +153,16 @@ class QuestionUpdate(BaseModel):
     is_mandatory: Optional[bool] = None
 
 
+class QuestionBulkUpdateItem(QuestionUpdate):
+    """One question of a bulk update"""
+    question_id: int = Field(..., gt=0)
+
+
+class QuestionBulkUpdate(BaseModel):
+    """Bulk update (e.g. re-tagging) - applied in one transaction"""
+    updates: List[QuestionBulkUpdateItem] = Field(..., min_length=1, max_length=10000)
+
+
 class QuestionResponse(BaseModel):
     """Question response"""
     question_id: int
@@ -214,6 +224,64 @@ class SimilarQuestionResponse(BaseModel):
     metadata: Dict[str, Any]
 
 
+# ============================================================
+# GENERATION SCHEMAS
+# ============================================================
+
+class GeneratedQuestion(BaseModel):
+    """Single question returned by a Gemini batch call"""
+    question_text: str = Field(..., min_length=10, max_length=2000)
+    difficulty: QuestionDifficulty = QuestionDifficulty.MEDIUM
+    tags: Optional[List[str]] = None
+    expected_answer: Optional[str] = None
+
+    @field_validator('question_text')
+    @classmethod
+    def strip_question_text(cls, v):
+        return v.strip()
+
+    @field_validator('tags')
+    @classmethod
+    def validate_tags(cls, v):
+        if v and len(v) > 20:
+            raise ValueError('Maximum 20 tags allowed')
+        return v
+
+
+class GeneratedQuestionBatch(BaseModel):
+    """Structured JSON payload of a Gemini batch call"""
+    questions: List[GeneratedQuestion]
+
+
+class GenerationJobCreate(BaseModel):
+    """Bulk generation job spec"""
+    question_type: str = Field(..., pattern="^(hr|technical)$")
+    job_role: str = Field(..., min_length=1, max_length=100)
+    industry: str = "general"
+    skills: Optional[str] = None
+    count: int = Field(..., gt=0)
+
+
+class GenerationJobResponse(BaseModel):
+    """Bulk generation job status, progress and yield"""
+    job_id: int
+    status: str
+    question_type: str
+    job_role: str
+    industry: str
+    target_count: int
+    stored_count: int
+    progress: float
+    gemini_calls: int
+    failed_calls: int
+    yield_per_call: float
+    dedup: Dict[str, int]
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
 # ============================================================
 # ANSWER SCHEMAS
 # ============================================================
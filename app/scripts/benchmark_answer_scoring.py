@@ -0,0 +1,138 @@
+# app/scripts/benchmark_answer_scoring.py
+"""
+Benchmark for answer scoring: answers scored per second
+
+Scores N synthetic answers against a pool of expected answers (static questions
+share theirs across candidates) with score_answers(), in batches of each
+--batch-sizes, and once per answer (one encode + score call each, the naive
+request-path approach) for comparison.
+
+Encoders:
+  model  the SentenceTransformer used by the vector store (all-MiniLM-L6-v2)
+  hash   hashed bag-of-words vectors: isolates the NumPy similarity/coverage cost
+
+--db scores the unscored answers of the configured PostgreSQL through the
+answer_scorer queue instead (one bulk UPDATE per batch).
+
+Usage:
+    python -m app.scripts.benchmark_answer_scoring
+    python -m app.scripts.benchmark_answer_scoring --answers 5000 --batch-sizes 32 256 1024 --encoder hash
+    python -m app.scripts.benchmark_answer_scoring --db
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import Callable, List
+import numpy as np
+from app.services.answer_scoring import score_answers
+
+POINTS = [
+    "I described the situation and the deadline we were facing.",
+    "I split the work into smaller tasks and agreed on priorities with the team.",
+    "I kept stakeholders informed with a short daily update.",
+    "We measured the outcome and cut the error rate by a third.",
+    "Afterwards I wrote down what I would do differently next time.",
+    "I asked a senior engineer to review the riskiest change.",
+    "We added monitoring so the issue would be caught earlier.",
+    "I took ownership of the follow-up actions.",
+]
+FILLER = ["Honestly it was hard.", "That was at my previous job.", "I think it went well overall.", "Let me explain."]
+
+
+def synthetic_pairs(count: int, pool: int, seed: int):
+    """(answers, expected) where expected answers come from a pool of `pool` static ones"""
+    rng = random.Random(seed)
+    expected_pool = [" ".join(rng.sample(POINTS, 3)) for _ in range(pool)]
+    answers, expected = [], []
+    for _ in range(count):
+        reference = rng.choice(expected_pool)
+        sentences = rng.sample(POINTS, rng.randint(1, 4)) + rng.sample(FILLER, rng.randint(0, 2))
+        rng.shuffle(sentences)
+        answers.append(" ".join(sentences))
+        expected.append(reference)
+    return answers, expected
+
+
+def hash_encoder(dim: int = 384) -> Callable[[List[str]], np.ndarray]:
+    def encode(texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for token in re.findall(r"[a-z']+", text.lower()):
+                vectors[i, hash(token) % dim] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+    return encode
+
+
+def model_encoder() -> Callable[[List[str]], np.ndarray]:
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer('all-MiniLM-L6-v2')
+    return lambda texts: model.encode(texts, normalize_embeddings=True)
+
+
+def bench(encode, answers: List[str], expected: List[str], batch_sizes: List[int], per_answer_limit: int,
+          weight: float, threshold: float):
+    print(f"{'mode':>14} {'answers':>8} {'seconds':>9} {'answers/s':>11}")
+
+    count = min(per_answer_limit, len(answers))
+    started = time.perf_counter()
+    for i in range(count):
+        score_answers(answers[i:i + 1], expected[i:i + 1], encode, weight, threshold)
+    elapsed = time.perf_counter() - started
+    print(f"{'per-answer':>14} {count:>8} {elapsed:>9.2f} {count / elapsed:>11.1f}")
+
+    for batch_size in batch_sizes:
+        started = time.perf_counter()
+        for i in range(0, len(answers), batch_size):
+            score_answers(answers[i:i + batch_size], expected[i:i + batch_size], encode, weight, threshold)
+        elapsed = time.perf_counter() - started
+        print(f"{f'batch {batch_size}':>14} {len(answers):>8} {elapsed:>9.2f} {len(answers) / elapsed:>11.1f}")
+
+
+def bench_db():
+    from app.database.postgres_db import SessionLocal
+    from app.services.answer_scoring import answer_scorer
+
+    db = SessionLocal()
+    try:
+        queued = answer_scorer.enqueue_unscored(db)
+    finally:
+        db.close()
+    started = time.perf_counter()
+    scored = answer_scorer.flush()
+    elapsed = time.perf_counter() - started
+    print(f"{queued} unscored answers queued, {scored} scored in {elapsed:.2f}s "
+          f"({scored / elapsed if elapsed else 0:.1f} answers/s)")
+    print(answer_scorer.snapshot())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched answer scoring")
+    parser.add_argument("--answers", type=int, default=2000)
+    parser.add_argument("--pool", type=int, default=50, help="Distinct expected answers")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[32, 256])
+    parser.add_argument("--per-answer", type=int, default=200, help="Answers timed in the one-by-one baseline")
+    parser.add_argument("--encoder", choices=["model", "hash"], default="model")
+    parser.add_argument("--weight", type=float, default=0.6, help="Similarity weight (rest is coverage)")
+    parser.add_argument("--threshold", type=float, default=0.6, help="Sentence coverage threshold")
+    parser.add_argument("--db", action="store_true", help="Score the live unscored answers through the queue")
+    args = parser.parse_args()
+
+    if args.db:
+        bench_db()
+        return
+
+    encode = model_encoder() if args.encoder == "model" else hash_encoder()
+    answers, expected = synthetic_pairs(args.answers, args.pool, seed=3)
+    encode(answers[:8])  # warm-up (model load / first call)
+    bench(encode, answers, expected, args.batch_sizes, args.per_answer, args.weight, args.threshold)
+
+    _, coverage, scores = score_answers(answers[:1000], expected[:1000], encode, args.weight, args.threshold)
+    print(f"\nscore mean {scores.mean():.1f} p10 {np.percentile(scores, 10):.1f} "
+          f"p90 {np.percentile(scores, 90):.1f}, coverage mean {coverage.mean():.2f}")
+
+
+if __name__ == "__main__":
+    main()
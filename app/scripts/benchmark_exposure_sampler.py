@@ -0,0 +1,146 @@
+# app/scripts/benchmark_exposure_sampler.py
+"""
+Benchmark + exposure report for usage-balanced question sampling
+
+1. Sampling cost per bucket size: alias-table build, O(1) alias draws, and the
+   O(n) weighted draw (numpy choice with p=...) it replaces.
+2. Exposure simulation: N interviews each take K questions from one bucket
+   (no repeats within an interview) under three policies
+     - first:    always the first unasked question (the old fetch-next-question)
+     - uniform:  uniform random
+     - exposure: alias tables weighted 1 / (1 + usage) ** alpha, rebuilt every
+                 --rebuild-every draws (like the usage_tracker flush)
+   and reports how concentrated usage_count ends up.
+3. --db: the same concentration report for the live bank, per subcategory.
+
+Usage:
+    python -m app.scripts.benchmark_exposure_sampler
+    python -m app.scripts.benchmark_exposure_sampler --bucket 200 --interviews 5000 --alpha 1.5
+    python -m app.scripts.benchmark_exposure_sampler --db
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List
+import numpy as np
+from app.services.exposure_sampler import AliasTable, exposure_weights
+
+
+def concentration(usage: np.ndarray) -> Dict:
+    """How evenly usage is spread: Gini, top-1%/top-10% share, max/mean, never used"""
+    usage = np.sort(np.asarray(usage, dtype=np.float64))
+    n, total = len(usage), usage.sum()
+    if n == 0 or total == 0:
+        return {"questions": n, "total": 0}
+    gini = float((2 * np.arange(1, n + 1) - n - 1).dot(usage) / (n * total))
+    top = lambda share: float(usage[-max(1, int(n * share)):].sum() / total)
+    return {
+        "questions": n,
+        "total": int(total),
+        "gini": round(gini, 3),
+        "top_1pct_share": round(top(0.01), 3),
+        "top_10pct_share": round(top(0.10), 3),
+        "max_over_mean": round(float(usage[-1] / usage.mean()), 1),
+        "never_used": int(np.count_nonzero(usage == 0))
+    }
+
+
+def bench_sampling(sizes: List[int], draws: int, alpha: float):
+    print(f"{'bucket':>8} {'build (ms)':>11} {'alias (us/draw)':>16} {'np.choice p= (us/draw)':>23}")
+    rng = np.random.default_rng(7)
+    for size in sizes:
+        ids = np.arange(1, size + 1)
+        weights = exposure_weights(rng.zipf(1.5, size).clip(max=10_000), alpha)
+
+        started = time.perf_counter()
+        table = AliasTable(ids, weights)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        for _ in range(draws):
+            table.draw()
+        alias_us = (time.perf_counter() - started) / draws * 1e6
+
+        p = weights / weights.sum()
+        linear_draws = max(1, min(draws, 2_000_000 // size))
+        started = time.perf_counter()
+        for _ in range(linear_draws):
+            rng.choice(ids, p=p)
+        linear_us = (time.perf_counter() - started) / linear_draws * 1e6
+
+        print(f"{size:>8} {build_ms:>11.1f} {alias_us:>16.2f} {linear_us:>23.1f}")
+
+
+def simulate(policy: str, bucket: int, interviews: int, per_interview: int,
+             alpha: float, rebuild_every: int, seed: int) -> np.ndarray:
+    rng = random.Random(seed)
+    usage = np.zeros(bucket, dtype=np.int64)
+    ids = np.arange(bucket)
+    table, since_rebuild = None, rebuild_every
+
+    for _ in range(interviews):
+        asked = set()
+        for _ in range(min(per_interview, bucket)):
+            if policy == "first":
+                pick = next(i for i in range(bucket) if i not in asked)
+            elif policy == "uniform":
+                pick = rng.randrange(bucket)
+                while pick in asked:
+                    pick = rng.randrange(bucket)
+            else:
+                if since_rebuild >= rebuild_every:
+                    table, since_rebuild = AliasTable(ids, exposure_weights(usage, alpha)), 0
+                pick = table.draw(rng)
+                while pick in asked:
+                    pick = table.draw(rng)
+                since_rebuild += 1
+            asked.add(pick)
+            usage[pick] += 1
+    return usage
+
+
+def report_db():
+    from sqlalchemy import select
+    from app.database.postgres_db import SessionLocal
+    from app.database.models import GlobalQuestion
+
+    db = SessionLocal()
+    try:
+        rows = db.execute(select(GlobalQuestion.subcategory, GlobalQuestion.usage_count)).all()
+    finally:
+        db.close()
+    by_subcategory: Dict[str, list] = {}
+    for subcategory, usage_count in rows:
+        by_subcategory.setdefault(subcategory or "-", []).append(usage_count or 0)
+    for subcategory, usage in sorted(by_subcategory.items()):
+        print(f"{subcategory:>16}  {concentration(np.array(usage))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark exposure-balanced sampling")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--draws", type=int, default=100000, help="Draws timed per bucket size")
+    parser.add_argument("--alpha", type=float, default=1.0)
+    parser.add_argument("--bucket", type=int, default=100, help="Questions in the simulated bucket")
+    parser.add_argument("--interviews", type=int, default=2000)
+    parser.add_argument("--per-interview", type=int, default=5)
+    parser.add_argument("--rebuild-every", type=int, default=50, help="Draws between alias-table rebuilds")
+    parser.add_argument("--db", action="store_true", help="Report usage concentration of the live bank instead")
+    args = parser.parse_args()
+
+    if args.db:
+        report_db()
+        return
+
+    bench_sampling(args.sizes, args.draws, args.alpha)
+    print()
+    print(f"Exposure after {args.interviews} interviews x {args.per_interview} questions, bucket of {args.bucket}:")
+    for policy in ("first", "uniform", "exposure"):
+        usage = simulate(policy, args.bucket, args.interviews, args.per_interview,
+                         args.alpha, args.rebuild_every, seed=11)
+        print(f"{policy:>10}  {concentration(usage)}")
+
+
+if __name__ == "__main__":
+    main()
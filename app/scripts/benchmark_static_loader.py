@@ -0,0 +1,153 @@
+# app/scripts/benchmark_static_loader.py
+"""
+Benchmark for the static question loader
+
+Loads N synthetic static questions (1k / 10k / 100k by default) through
+QuestionService.bulk_load_static_questions against the configured PostgreSQL
++ ChromaDB, re-runs the same payload to time the all-duplicates path, and
+optionally times the old row-by-row loader for comparison. Every row and
+vector it creates is removed afterwards.
+
+Usage:
+    python -m app.scripts.benchmark_static_loader
+    python -m app.scripts.benchmark_static_loader --sizes 1000 10000 --legacy
+    python -m app.scripts.benchmark_static_loader --sizes 100000 --skip-vectors
+"""
+
+import argparse
+import logging
+import time
+import uuid
+from typing import Dict, List
+from app.database.postgres_db import SessionLocal, init_db
+from app.database.models import GlobalQuestion
+from app.database.chroma_db import chroma_db
+from app.services.question_service import QuestionService
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+SUBJECTS = ["a teammate", "a deadline", "a customer", "a manager", "an outage", "a budget", "a launch", "a migration"]
+VERBS = ["handled", "prioritised", "escalated", "negotiated", "recovered from", "planned", "simplified", "measured"]
+
+
+def synthetic_questions(count: int, tag: str) -> List[Dict]:
+    """Unique static-question dicts shaped like data/static_questions.json entries"""
+    return [
+        {
+            "question_text": (
+                f"Tell me about a time you {VERBS[i % len(VERBS)]} {SUBJECTS[(i // len(VERBS)) % len(SUBJECTS)]} "
+                f"(scenario {i} of benchmark {tag})."
+            ),
+            "question_type": "hr",
+            "subcategory": "behavioral",
+            "tags": ["benchmark"],
+            "industry": "general",
+            "job_role": tag,
+            "difficulty": "medium",
+            "expected_answer": "A STAR answer with a measurable outcome.",
+            "is_mandatory": False
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_load(db, questions: List[Dict], with_vectors: bool) -> int:
+    """The previous loader: one SELECT + one flush (+ one encode) per entry"""
+    count = 0
+    for q_data in questions:
+        existing = db.query(GlobalQuestion).filter(
+            GlobalQuestion.question_text == q_data['question_text']
+        ).first()
+        if existing:
+            continue
+        question = GlobalQuestion(
+            **q_data, is_static=1, question_hash=QuestionService.question_hash(q_data['question_text'])
+        )
+        db.add(question)
+        db.flush()
+        if with_vectors:
+            chroma_db.add_question(
+                question_id=question.question_id,
+                question_text=question.question_text,
+                question_type=question.question_type,
+                industry=question.industry,
+                job_role=question.job_role,
+                difficulty=question.difficulty,
+                tags=q_data.get('tags', []),
+                subcategory=question.subcategory,
+                is_static=1
+            )
+        count += 1
+    db.commit()
+    return count
+
+
+def cleanup(tag: str):
+    db = SessionLocal()
+    try:
+        ids = [qid for (qid,) in db.query(GlobalQuestion.question_id).filter(GlobalQuestion.job_role == tag)]
+        for i in range(0, len(ids), 5000):
+            chroma_db.delete_questions(ids[i:i + 5000])
+        db.query(GlobalQuestion).filter(GlobalQuestion.job_role == tag).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def run_size(size: int, with_vectors: bool, legacy: bool) -> Dict:
+    tag = f"benchmark-{uuid.uuid4().hex[:8]}"
+    questions = synthetic_questions(size, tag)
+    result = {"size": size}
+
+    try:
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            stats = QuestionService.bulk_load_static_questions(db, questions, push_vectors=with_vectors)
+            result["bulk_s"] = round(time.perf_counter() - started, 2)
+            result["bulk_phases_ms"] = stats["timings_ms"]
+
+            started = time.perf_counter()
+            rerun = QuestionService.bulk_load_static_questions(db, questions, push_vectors=with_vectors)
+            result["rerun_all_duplicates_s"] = round(time.perf_counter() - started, 2)
+            assert rerun["inserted"] == 0, "re-run should only find duplicates"
+        finally:
+            db.close()
+        cleanup(tag)
+
+        if legacy:
+            db = SessionLocal()
+            try:
+                started = time.perf_counter()
+                legacy_load(db, questions, with_vectors)
+                result["legacy_s"] = round(time.perf_counter() - started, 2)
+            finally:
+                db.close()
+    finally:
+        cleanup(tag)
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the static question loader")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--skip-vectors", action="store_true", help="Time the PostgreSQL path only")
+    parser.add_argument("--legacy", action="store_true", help="Also time the old row-by-row loader")
+    parser.add_argument("--legacy-max", type=int, default=10000, help="Largest size timed with --legacy")
+    args = parser.parse_args()
+
+    init_db()
+    print(f"{'size':>8} {'bulk (s)':>10} {'re-run (s)':>11} {'legacy (s)':>11}  phases (ms)")
+    for size in args.sizes:
+        result = run_size(size, with_vectors=not args.skip_vectors, legacy=args.legacy and size <= args.legacy_max)
+        legacy = f"{result['legacy_s']:>11}" if "legacy_s" in result else f"{'-':>11}"
+        print(
+            f"{size:>8} {result['bulk_s']:>10} {result['rerun_all_duplicates_s']:>11} {legacy}  "
+            f"{result['bulk_phases_ms']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# app/scripts/gemini_stub_server.py
+"""
+Local Gemini stand-in for load tests and offline runs
+
+Implements :generateContent and :streamGenerateContent (alt=sse) with
+configurable latency, error and 429 injection, and deterministic
+synthetic question text (same seed + same request sequence = same output).
+
+Usage:
+    python -m app.scripts.gemini_stub_server --port 8089 --latency lognormal --median-ms 800
+    GEMINI_BASE_URL=http://localhost:8089/v1beta uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+from typing import List, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TOPICS = [
+    "conflict with a teammate", "a missed deadline", "learning a new technology quickly",
+    "a production incident", "mentoring a junior colleague", "disagreeing with a manager",
+    "prioritising competing tasks", "a failed project", "improving a slow process",
+    "handling ambiguous requirements", "giving difficult feedback", "owning a mistake",
+    "designing a rate limiter", "caching a hot read path", "debugging a memory leak",
+    "scaling a relational database", "choosing between SQL and NoSQL", "testing legacy code",
+    "reviewing a large pull request", "reducing API latency", "securing user data",
+    "migrating a service without downtime", "estimating a large feature", "on-call burnout"
+]
+
+TEMPLATES = [
+    "Tell me about a time you dealt with {topic}. What did you do and what was the outcome?",
+    "How would you approach {topic} in your first month on the team?",
+    "Walk me through how you handled {topic} and what you would change next time.",
+    "What is your process for {topic}, and how do you know it worked?",
+    "Describe a situation involving {topic}. Which trade-offs did you consider?",
+    "If you faced {topic} tomorrow, what would your first three steps be?"
+]
+
+
+class StubProfile(BaseModel):
+    """Latency and failure profile of the stub"""
+    latency: str = Field("fixed", pattern="^(fixed|lognormal|recorded)$")
+    fixed_ms: float = 300.0
+    median_ms: float = 600.0  # lognormal median
+    sigma: float = 0.5  # lognormal shape
+    recorded_file: Optional[str] = None  # one latency in ms per line
+    chunk_interval_ms: float = 40.0  # delay between streamed chunks
+    error_rate: float = Field(0.0, ge=0.0, le=1.0)  # share of 500 responses
+    rate_limit_rate: float = Field(0.0, ge=0.0, le=1.0)  # share of 429 responses
+    seed: int = 42
+
+
+class SyntheticGemini:
+    """Deterministic text, latency and fault sampling for one stub process"""
+
+    def __init__(self, profile: StubProfile):
+        self.profile = profile
+        self._rng = random.Random(profile.seed)
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._recorded: List[float] = []
+        if profile.latency == "recorded":
+            if not profile.recorded_file:
+                raise ValueError("--recorded-file is required for the 'recorded' latency profile")
+            with open(profile.recorded_file) as f:
+                self._recorded = [float(line) for line in f if line.strip()]
+            if not self._recorded:
+                raise ValueError(f"No latencies found in {profile.recorded_file}")
+
+    def next_request(self):
+        """Sample (request number, latency seconds, injected status or None) in one step"""
+        with self._lock:
+            self._counter += 1
+            if self.profile.latency == "fixed":
+                latency_ms = self.profile.fixed_ms
+            elif self.profile.latency == "lognormal":
+                latency_ms = self._rng.lognormvariate(0.0, self.profile.sigma) * self.profile.median_ms
+            else:
+                latency_ms = self._rng.choice(self._recorded)
+
+            roll = self._rng.random()
+            if roll < self.profile.rate_limit_rate:
+                status = 429
+            elif roll < self.profile.rate_limit_rate + self.profile.error_rate:
+                status = 500
+            else:
+                status = None
+            return self._counter, latency_ms / 1000.0, status
+
+    def question_text(self, prompt: str, request_no: int, index: int = 0) -> str:
+        digest = hashlib.sha256(f"{self.profile.seed}:{request_no}:{index}:{prompt}".encode()).digest()
+        topic = TOPICS[digest[0] % len(TOPICS)]
+        template = TEMPLATES[digest[1] % len(TEMPLATES)]
+        return template.format(topic=topic)
+
+    def batch_payload(self, prompt: str, request_no: int) -> str:
+        match = re.search(r"exactly\s+(\d+)", prompt)
+        count = int(match.group(1)) if match else 5
+        return json.dumps({
+            "questions": [
+                {
+                    "question_text": self.question_text(prompt, request_no, i),
+                    "difficulty": ["easy", "medium", "hard"][i % 3],
+                    "tags": ["synthetic"],
+                    "expected_answer": "A structured answer with a concrete example and outcome."
+                }
+                for i in range(count)
+            ]
+        })
+
+
+def _usage(prompt: str, text: str) -> dict:
+    prompt_tokens = max(1, len(prompt) // 4)
+    output_tokens = max(1, len(text) // 4)
+    return {
+        "promptTokenCount": prompt_tokens,
+        "candidatesTokenCount": output_tokens,
+        "totalTokenCount": prompt_tokens + output_tokens
+    }
+
+
+def _error(status: int) -> JSONResponse:
+    message = "Resource has been exhausted (e.g. check quota)." if status == 429 else "Internal error (injected)."
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"code": status, "message": message,
+                           "status": "RESOURCE_EXHAUSTED" if status == 429 else "INTERNAL"}}
+    )
+
+
+def create_app(profile: StubProfile) -> FastAPI:
+    synthetic = SyntheticGemini(profile)
+    app = FastAPI(title="Gemini stub")
+
+    @app.post("/v1beta/models/{model_action}")
+    async def model_action(model_action: str, request: Request):
+        model, _, action = model_action.partition(":")
+        body = await request.json()
+        prompt = "".join(
+            part.get("text", "")
+            for content in body.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        generation_config = body.get("generationConfig", {})
+
+        request_no, latency, status = synthetic.next_request()
+        await asyncio.sleep(latency)
+        if status is not None:
+            return _error(status)
+
+        if generation_config.get("responseMimeType") == "application/json":
+            text = synthetic.batch_payload(prompt, request_no)
+        else:
+            text = synthetic.question_text(prompt, request_no)
+
+        if action == "generateContent":
+            return {
+                "candidates": [{"content": {"role": "model", "parts": [{"text": text}]},
+                                "finishReason": "STOP"}],
+                "usageMetadata": _usage(prompt, text),
+                "modelVersion": model
+            }
+
+        if action == "streamGenerateContent":
+            async def events():
+                words = text.split(" ")
+                for i in range(0, len(words), 3):
+                    chunk = " ".join(words[i:i + 3]) + (" " if i + 3 < len(words) else "")
+                    payload = {"candidates": [{"content": {"role": "model", "parts": [{"text": chunk}]}}]}
+                    if i + 3 >= len(words):
+                        payload["candidates"][0]["finishReason"] = "STOP"
+                        payload["usageMetadata"] = _usage(prompt, text)
+                    yield f"data: {json.dumps(payload)}\r\n\r\n"
+                    await asyncio.sleep(profile.chunk_interval_ms / 1000.0)
+
+            if request.query_params.get("alt") == "sse":
+                return StreamingResponse(events(), media_type="text/event-stream")
+            # Without alt=sse Gemini returns a JSON array of chunks
+            return JSONResponse([{
+                "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}],
+                "usageMetadata": _usage(prompt, text)
+            }])
+
+        return JSONResponse(status_code=404, content={"error": {"code": 404, "message": f"Unknown action {action}"}})
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gemini stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", choices=["fixed", "lognormal", "recorded"], default="fixed")
+    parser.add_argument("--fixed-ms", type=float, default=300.0)
+    parser.add_argument("--median-ms", type=float, default=600.0)
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--recorded-file")
+    parser.add_argument("--chunk-interval-ms", type=float, default=40.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    profile = StubProfile(
+        latency=args.latency,
+        fixed_ms=args.fixed_ms,
+        median_ms=args.median_ms,
+        sigma=args.sigma,
+        recorded_file=args.recorded_file,
+        chunk_interval_ms=args.chunk_interval_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed
+    )
+    logger.info(f"🧪 Gemini stub on http://{args.host}:{args.port}/v1beta with profile {profile.model_dump()}")
+
+    import uvicorn
+    uvicorn.run(create_app(profile), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,186 +1,283 @@
 # app/scripts/generate_static_questions_simple.py
-
-from google import genai
-from pydantic import BaseModel, Field
-from typing import List, Optional
+"""
+Static HR question bank generator
+
+Categories are generated concurrently through GeminiService (so every call
+goes through the shared rate limiter). Each finished batch is checkpointed
+to disk, so a crashed or interrupted run resumes without re-spending quota.
+Questions are deduplicated across ALL categories with embeddings, and short
+categories are topped up in further rounds.
+
+Usage:
+    python -m app.scripts.generate_static_questions_simple --output data/static_questions.json
+    python -m app.scripts.generate_static_questions_simple --behavioral 60 --workers 6
+    python -m app.scripts.generate_static_questions_simple --fresh   # ignore old checkpoints
+"""
+
+import argparse
 import json
 import logging
-import time  # ADD THIS
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Dict, List
+import numpy as np
 from app.config import get_settings
+from app.database.chroma_db import chroma_db
+from app.services.gemini_service import GeminiService
+from app.services.generation_pipeline import normalize_text, select_unique
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+MANDATORY_INTRO_COUNT = 3
+AVOID_EXAMPLES = 30  # already-kept questions quoted in top-up prompts
 
-class Question(BaseModel):
-    """Single question structure"""
-    question_text: str
-    question_type: str
-    subcategory: str
-    tags: List[str]
-    industry: str
-    job_role: str
-    difficulty: str
-    expected_answer: Optional[str] = None
-    is_mandatory: Optional[bool] = False
-
-
-class QuestionCategory(BaseModel):
-    """Questions for one category"""
-    questions: List[Question]
-
-
-def generate_questions_batch(category: str, count: int, subcategory: str, difficulty: str, description: str) -> List[
-    Question]:
-    """Generate questions in batches"""
-
-    logger.info(f"Generating {count} {category} questions...")
-    client = genai.Client(api_key=settings.GEMINI_API_KEY)
-
-    prompt = f"""
-    Generate exactly {count} {category} interview questions.
-
-    {description}
-
-    REQUIREMENTS:
-    - All questions must have: question_type="hr", subcategory="{subcategory}", 
-      industry="general", job_role="general", difficulty="{difficulty}"
-    - Make every question unique and professional
-    - Provide brief expected_answer (1-2 sentences)
-    - Use proper interview language
-    - Keep questions open-ended
-    - For subcategory="introductory", set is_mandatory=true for the first 3 questions only
-
-    Return ONLY valid JSON matching the schema.
-    """
-
-    try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash-exp",
-            contents=prompt,
-            config={
-                "response_mime_type": "application/json",
-                "response_schema": QuestionCategory.model_json_schema(),
-            }
-        )
-
-        category_data = QuestionCategory.model_validate_json(response.text)
-        logger.info(f"✅ Generated {len(category_data.questions)} {category} questions")
-        return category_data.questions
-
-    except Exception as e:
-        logger.error(f"❌ Error generating {category} questions: {e}")
-        with open(f"debug_{category}_response.txt", "w") as f:
-            f.write(response.text if 'response' in locals() else "No response")
-        raise
-
-
-def generate_static_questions_json():
-    """Generate questions in proper categories WITH DELAYS"""
-
-    all_questions = {
-        "introductory": [],
-        "behavioral": [],
-        "personality": [],
-        "closing": []
-    }
-
-    # Category 1: Introductory
-    intro_desc = """
+# Output order = category order (introductory first so its mandatory questions win ties)
+CATEGORIES = {
+    "introductory": {
+        "count": 12,
+        "difficulty": "easy",
+        "description": """
     ONLY questions asked at the ABSOLUTE START of interviews (first 5 minutes).
     These MUST be about the candidate introducing themselves and their background.
 
-    EXAMPLES: "Tell me about yourself", "Walk me through your resume", 
+    EXAMPLES: "Tell me about yourself", "Walk me through your resume",
     "Describe your professional background", "How did you get into this field?"
 
     DO NOT INCLUDE: Hobbies, salary, personality traits, work style
-
-    Mark the first 3 questions with is_mandatory=true.
     Tags: ["background", "education", "career-path", "professional-journey"]
     """
-
-    intro_questions = generate_questions_batch(
-        category="introductory",
-        count=12,
-        subcategory="introductory",
-        difficulty="easy",
-        description=intro_desc
-    )
-    all_questions["introductory"] = [q.model_dump() for q in intro_questions]
-
-    logger.info("⏳ Waiting 30 seconds before next batch...")
-    time.sleep(30)
-
-    # Category 2: Behavioral
-    behavioral_desc = """
+    },
+    "behavioral": {
+        "count": 45,
+        "difficulty": "medium",
+        "description": """
     STAR format questions about PAST EXPERIENCES.
     Cover: teamwork, conflict resolution, leadership, problem-solving, failure, success,
     time management, adaptability, decision-making, ethics, innovation, customer service.
     Examples: "Tell me about a time you...", "Describe a situation when..."
     Tags should match competency: ["teamwork", "leadership", "problem-solving"]
     """
-
-    behavioral_questions = generate_questions_batch(
-        category="behavioral",
-        count=45,
-        subcategory="behavioral",
-        difficulty="medium",
-        description=behavioral_desc
-    )
-    all_questions["behavioral"] = [q.model_dump() for q in behavioral_questions]
-
-    logger.info("⏳ Waiting 30 seconds before next batch...")
-    time.sleep(30)
-
-    # Category 3: Personality
-    personality_desc = """
+    },
+    "personality": {
+        "count": 35,
+        "difficulty": "medium",
+        "description": """
     Questions about traits, goals, values, work style, and motivation.
     Cover: strengths/weaknesses, career goals, stress management, company/role motivation, values.
     Examples: "What are your strengths?", "Where do you see yourself in 5 years?"
-    Mix difficulty: 15 easy, 20 medium.
+    Mix easy and medium difficulty.
     Tags: ["self-awareness", "motivation", "culture-fit", "goals", "values"]
     """
-
-    personality_questions = generate_questions_batch(
-        category="personality",
-        count=35,
-        subcategory="personality",
-        difficulty="medium",
-        description=personality_desc
-    )
-    all_questions["personality"] = [q.model_dump() for q in personality_questions]
-
-    logger.info("⏳ Waiting 30 seconds before next batch...")
-    time.sleep(30)
-
-    # Category 4: Closing
-    closing_desc = """
+    },
+    "closing": {
+        "count": 23,
+        "difficulty": "easy",
+        "description": """
     Questions asked at the END of interviews - lighter, conversational.
     EXAMPLES: "What are your salary expectations?", "What are your hobbies?",
     "Tell me about volunteer work", "Who do you look up to?", "Do you have questions for us?"
-    All should have: question_type="hr", subcategory="closing", difficulty="easy"
     Tags: ["conversation", "culture-fit", "personal", "wrap-up", "casual"]
     """
+    }
+}
 
-    closing_questions = generate_questions_batch(
-        category="closing",
-        count=23,
-        subcategory="closing",
-        difficulty="easy",
-        description=closing_desc
-    )
-    all_questions["closing"] = [q.model_dump() for q in closing_questions]
 
-    return all_questions
+# ============================================================
+# CHECKPOINTS
+# ============================================================
+
+def load_checkpoints(checkpoint_dir: Path) -> Dict[str, List[List[Dict]]]:
+    """All checkpointed batches per category, in the order they were written"""
+    batches = {category: [] for category in CATEGORIES}
+    for path in sorted(checkpoint_dir.glob("*.json")):
+        category = path.stem.rsplit("_", 1)[0]
+        if category not in batches:
+            continue
+        try:
+            batches[category].append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠ Ignoring unreadable checkpoint {path.name}: {e}")
+    return batches
+
 
+def write_checkpoint(checkpoint_dir: Path, category: str, batch_no: int, questions: List[Dict]):
+    """Write atomically so a crash never leaves a half-written batch behind"""
+    path = checkpoint_dir / f"{category}_{batch_no:05d}.json"
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(questions, ensure_ascii=False), encoding="utf-8")
+    tmp_path.replace(path)
 
-def save_to_json(data: dict,
-                 filepath: str = "/Users/disha/PycharmProjects/ai-mock-interview/data/static_questions.json"):
+
+# ============================================================
+# GENERATION
+# ============================================================
+
+def build_prompt(category: str, count: int, avoid: List[str]) -> str:
+    spec = CATEGORIES[category]
+    prompt = f"""
+    Generate exactly {count} {category} interview questions.
+
+    {spec['description']}
+
+    REQUIREMENTS:
+    - Make every question unique and professional
+    - Provide brief expected_answer (1-2 sentences)
+    - Use proper interview language
+    - Keep questions open-ended
+    - Default difficulty: "{spec['difficulty']}"
+    """
+    if avoid:
+        listed = "\n".join(f"    - {text}" for text in avoid[:AVOID_EXAMPLES])
+        prompt += f"""
+    These questions already exist; do NOT repeat or rephrase them:
+{listed}
+    """
+    return prompt + "\n    Return ONLY valid JSON matching the schema.\n"
+
+
+def generate_batch(category: str, count: int, avoid: List[str]) -> List[Dict]:
+    """One Gemini call -> static question dicts (rate limited by GeminiService)"""
+    generated = GeminiService.generate_questions_batch(build_prompt(category, count, avoid), count)
+    return [
+        {
+            "question_text": q.question_text,
+            "question_type": "hr",
+            "subcategory": category,
+            "tags": q.tags or [],
+            "industry": "general",
+            "job_role": "general",
+            "difficulty": q.difficulty.value,
+            "expected_answer": q.expected_answer,
+            "is_mandatory": False
+        }
+        for q in generated
+    ]
+
+
+class CrossCategoryDeduplicator:
+    """Exact + embedding dedup over every category; embeddings cached per text"""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self._embeddings: Dict[str, np.ndarray] = {}
+
+    def unique(self, batches: Dict[str, List[List[Dict]]]) -> Dict[str, List[Dict]]:
+        candidates = []
+        seen = set()
+        for category in CATEGORIES:
+            for batch in batches[category]:
+                for question in batch:
+                    key = normalize_text(question["question_text"])
+                    if key not in seen:
+                        seen.add(key)
+                        candidates.append(question)
+
+        missing = [q["question_text"] for q in candidates if q["question_text"] not in self._embeddings]
+        if missing:
+            for text, vector in zip(missing, chroma_db.generate_embeddings(missing)):
+                self._embeddings[text] = np.asarray(vector, dtype=np.float32)
+
+        kept = {category: [] for category in CATEGORIES}
+        if candidates:
+            matrix = np.stack([self._embeddings[q["question_text"]] for q in candidates])
+            for i in select_unique(matrix, self.threshold):
+                kept[candidates[i]["subcategory"]].append(candidates[i])
+        return kept
+
+
+def run(
+        targets: Dict[str, int],
+        output: Path,
+        checkpoint_dir: Path,
+        batch_size: int,
+        workers: int,
+        threshold: float,
+        max_rounds: int
+) -> Dict:
+    started = time.perf_counter()
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    batches = load_checkpoints(checkpoint_dir)
+    resumed_batches = sum(len(b) for b in batches.values())
+    if resumed_batches:
+        logger.info(f"🔁 Resuming from {resumed_batches} checkpointed batch(es) in {checkpoint_dir}")
+
+    dedup = CrossCategoryDeduplicator(threshold)
+    next_batch_no = {category: len(batches[category]) for category in CATEGORIES}
+    gemini_calls = 0
+    failed_calls = 0
+
+    kept = dedup.unique(batches)
+    for round_no in range(1, max_rounds + 1):
+        shortfall = {c: targets[c] - len(kept[c]) for c in CATEGORIES if len(kept[c]) < targets[c]}
+        if not shortfall:
+            break
+
+        # Every missing batch of every category goes into one pool; the limiter paces them
+        tasks = []
+        for category, missing in shortfall.items():
+            avoid = [q["question_text"] for q in kept[category]]
+            for _ in range(math.ceil(missing / batch_size)):
+                tasks.append((category, next_batch_no[category], avoid))
+                next_batch_no[category] += 1
+        logger.info(f"Round {round_no}: {len(tasks)} batch(es) for {shortfall}")
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(generate_batch, category, batch_size, avoid): (category, batch_no)
+                for category, batch_no, avoid in tasks
+            }
+            for future in as_completed(futures):
+                category, batch_no = futures[future]
+                gemini_calls += 1
+                try:
+                    questions = future.result()
+                except Exception as e:  # incl. RateLimitExceeded after the max wait
+                    failed_calls += 1
+                    logger.warning(f"⚠ {category} batch {batch_no} failed, retrying next round: {e}")
+                    continue
+                write_checkpoint(checkpoint_dir, category, batch_no, questions)
+                batches[category].append(questions)
+                logger.info(f"✅ {category} batch {batch_no}: {len(questions)} questions checkpointed")
+
+        kept = dedup.unique(batches)
+
+    result = {}
+    for category in CATEGORIES:
+        questions = [dict(q) for q in kept[category][:targets[category]]]
+        if category == "introductory":
+            for i, question in enumerate(questions):
+                question["is_mandatory"] = i < MANDATORY_INTRO_COUNT
+        result[category] = questions
+        if len(questions) < targets[category]:
+            logger.warning(f"⚠ {category}: only {len(questions)}/{targets[category]} unique questions")
+
+    save_to_json(result, output)
+
+    generated = sum(len(q) for b in batches.values() for q in b)
+    stored = sum(len(q) for q in result.values())
+    successful_calls = gemini_calls - failed_calls
+    return {
+        "wall_time_s": round(time.perf_counter() - started, 1),
+        "gemini_calls": gemini_calls,
+        "failed_calls": failed_calls,
+        "resumed_batches": resumed_batches,
+        "generated": generated,
+        "unique_written": stored,
+        "yield_per_call": round(stored / (successful_calls + resumed_batches), 2)
+        if successful_calls + resumed_batches else 0.0,
+        "per_category": {c: f"{len(result[c])}/{targets[c]}" for c in CATEGORIES}
+    }
+
+
+def save_to_json(data: dict, filepath: Path):
     """Save questions to JSON file"""
-    Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
 
     with open(filepath, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
@@ -190,39 +287,45 @@ def save_to_json(data: dict,
 
 def main():
     """Main execution"""
-    try:
-        logger.info("=" * 70)
-        logger.info("STATIC QUESTION GENERATION - WITH RATE LIMIT PROTECTION")
-        logger.info("=" * 70)
-        logger.info("⚠️  This will take ~2-3 minutes due to delays between batches")
-
-        logger.info("\n[Step 1/2] Generating questions with delays...")
-        questions_data = generate_static_questions_json()
-
-        intro_count = len(questions_data["introductory"])
-        behavioral_count = len(questions_data["behavioral"])
-        personality_count = len(questions_data["personality"])
-        closing_count = len(questions_data["closing"])
-        total = intro_count + behavioral_count + personality_count + closing_count
-
-        logger.info(f"\n📊 Generation Summary:")
-        logger.info(f"  • Introductory (opening): {intro_count} questions")
-        logger.info(f"  • Behavioral (mid-interview): {behavioral_count} questions")
-        logger.info(f"  • Personality (mid-interview): {personality_count} questions")
-        logger.info(f"  • Closing (wrap-up): {closing_count} questions")
-        logger.info(f"  • Total: {total} questions")
-
-        logger.info("\n[Step 2/2] Saving to JSON file...")
-        save_to_json(questions_data)
-
-        logger.info("\n" + "=" * 70)
-        logger.info("✅ GENERATION COMPLETE!")
-        logger.info("📁 File: /Users/disha/PycharmProjects/ai-mock-interview/data/static_questions.json")
-        logger.info("=" * 70)
-
-    except Exception as e:
-        logger.error(f"❌ Script failed: {e}")
-        raise
+    parser = argparse.ArgumentParser(description="Generate the static HR question bank")
+    parser.add_argument("--output", type=Path, default=PROJECT_ROOT / "data" / "static_questions.json")
+    parser.add_argument("--checkpoint-dir", type=Path, default=PROJECT_ROOT / "data" / "static_generation_checkpoints")
+    for category, spec in CATEGORIES.items():
+        parser.add_argument(f"--{category}", type=int, default=spec["count"], help=f"{category} questions")
+    parser.add_argument("--batch-size", type=int, default=settings.GEMINI_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--similarity-threshold", type=float, default=settings.SIMILARITY_THRESHOLD)
+    parser.add_argument("--max-rounds", type=int, default=5, help="Top-up rounds for short categories")
+    parser.add_argument("--fresh", action="store_true", help="Delete existing checkpoints first")
+    args = parser.parse_args()
+
+    if args.fresh and args.checkpoint_dir.exists():
+        for path in args.checkpoint_dir.glob("*.json"):
+            path.unlink()
+
+    logger.info("=" * 70)
+    logger.info("STATIC QUESTION GENERATION - CONCURRENT, RESUMABLE")
+    logger.info("=" * 70)
+
+    report = run(
+        targets={category: getattr(args, category) for category in CATEGORIES},
+        output=args.output,
+        checkpoint_dir=args.checkpoint_dir,
+        batch_size=max(1, min(args.batch_size, settings.GEMINI_BATCH_MAX_SIZE)),
+        workers=args.workers,
+        threshold=args.similarity_threshold,
+        max_rounds=args.max_rounds
+    )
+
+    logger.info("\n📊 Generation Summary:")
+    for category, counts in report["per_category"].items():
+        logger.info(f"  • {category}: {counts}")
+    logger.info(f"  • Gemini calls: {report['gemini_calls']} ({report['failed_calls']} failed, "
+                f"{report['resumed_batches']} batches resumed from checkpoints)")
+    logger.info(f"  • Generated: {report['generated']} → unique written: {report['unique_written']} "
+                f"({report['yield_per_call']} per call)")
+    logger.info(f"  • Wall time: {report['wall_time_s']}s")
+    logger.info("=" * 70)
 
 
 if __name__ == "__main__":
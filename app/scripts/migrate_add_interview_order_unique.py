@@ -0,0 +1,91 @@
+# app/scripts/migrate_add_interview_order_unique.py
+"""
+Migration: add UNIQUE (interview_id, order_index) to interview_questions
+
+The orchestrator detects a stale interview session (a slot already recorded
+through another worker) by this constraint raising on insert; create_all never
+adds it to an existing table.
+
+1. LOCK TABLE interview_questions (no new duplicates while migrating)
+2. Renumber the interviews that have duplicate (interview_id, order_index) rows:
+   order_index = 1, 2, 3, ... by (order_index, id), the order sessions are
+   hydrated in. Rows are kept (answers reference them), nothing is deleted.
+3. ALTER TABLE ... ADD CONSTRAINT uq_interview_order, unless it exists already
+
+Safe to re-run. Fresh databases get the constraint from init_db() and need no migration.
+
+Usage:
+    python -m app.scripts.migrate_add_interview_order_unique
+    python -m app.scripts.migrate_add_interview_order_unique --dry-run
+"""
+
+import argparse
+import logging
+from sqlalchemy import text
+from app.database.postgres_db import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONSTRAINT_NAME = "uq_interview_order"  # InterviewQuestion.__table_args__
+
+
+def migrate(dry_run: bool) -> dict:
+    stats = {"interviews": [], "renumbered": 0, "constraint_added": False}
+
+    with engine.begin() as conn:
+        if not dry_run:
+            conn.execute(text("LOCK TABLE interview_questions IN SHARE ROW EXCLUSIVE MODE"))
+
+        stats["interviews"] = [interview_id for (interview_id,) in conn.execute(text(
+            "SELECT DISTINCT interview_id FROM interview_questions "
+            "GROUP BY interview_id, order_index HAVING count(*) > 1 ORDER BY interview_id"
+        ))]
+
+        if stats["interviews"] and not dry_run:
+            stats["renumbered"] = conn.execute(text(
+                "WITH ranked AS ("
+                "  SELECT id, row_number() OVER (PARTITION BY interview_id ORDER BY order_index, id) AS new_order"
+                "  FROM interview_questions WHERE interview_id = ANY(:interview_ids)"
+                ") "
+                "UPDATE interview_questions iq SET order_index = ranked.new_order "
+                "FROM ranked WHERE iq.id = ranked.id AND iq.order_index <> ranked.new_order"
+            ), {"interview_ids": stats["interviews"]}).rowcount
+            logger.info(f"✓ Renumbered {stats['renumbered']} rows in {len(stats['interviews'])} interviews")
+
+        exists = conn.execute(text(
+            "SELECT 1 FROM pg_constraint WHERE conname = :name AND conrelid = 'interview_questions'::regclass"
+        ), {"name": CONSTRAINT_NAME}).first() is not None
+
+        if not exists and not dry_run:
+            conn.execute(text(
+                f"ALTER TABLE interview_questions "
+                f"ADD CONSTRAINT {CONSTRAINT_NAME} UNIQUE (interview_id, order_index)"
+            ))
+            stats["constraint_added"] = True
+            logger.info(f"✓ Constraint {CONSTRAINT_NAME} added")
+        elif exists:
+            logger.info(f"✓ Constraint {CONSTRAINT_NAME} already present")
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add UNIQUE (interview_id, order_index) to interview_questions")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = parser.parse_args()
+
+    stats = migrate(args.dry_run)
+
+    logger.info("=" * 70)
+    logger.info(f"{'DRY RUN - ' if args.dry_run else ''}{CONSTRAINT_NAME} migration")
+    logger.info(f"  • Interviews with duplicate slots: {len(stats['interviews'])}")
+    for interview_id in stats["interviews"][:50]:
+        logger.info(f"      interview {interview_id}")
+    logger.info(f"  • Rows renumbered: {stats['renumbered']}")
+    logger.info(f"  • Constraint added: {stats['constraint_added']}")
+    logger.info("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# app/scripts/migrate_add_question_hash.py
+"""
+Migration: add global_questions.question_hash + unique index
+
+1. ALTER TABLE ... ADD COLUMN IF NOT EXISTS question_hash VARCHAR(64)
+2. Backfill hashes in id order, in batches (same normalization as the app)
+   - personalized types keep NULL (never deduplicated)
+   - for exact duplicates only the oldest row gets the hash; the others
+     keep NULL and are listed so they can be reviewed/merged by hand
+3. CREATE UNIQUE INDEX IF NOT EXISTS ix_global_questions_question_hash
+
+Safe to re-run. Fresh databases get the column from init_db() and need no migration.
+
+Usage:
+    python -m app.scripts.migrate_add_question_hash
+    python -m app.scripts.migrate_add_question_hash --dry-run
+"""
+
+import argparse
+import logging
+from sqlalchemy import text
+from app.database.postgres_db import engine
+from app.services.question_service import QuestionService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "ix_global_questions_question_hash"  # name SQLAlchemy uses for index=True, unique=True
+
+
+def migrate(batch_size: int, dry_run: bool) -> dict:
+    stats = {"hashed": 0, "personalized": 0, "duplicates": []}
+
+    with engine.begin() as conn:
+        if not dry_run:
+            conn.execute(text(
+                "ALTER TABLE global_questions ADD COLUMN IF NOT EXISTS question_hash VARCHAR(64)"
+            ))
+            logger.info("✓ Column question_hash present")
+
+        has_column = conn.execute(text(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = 'global_questions' AND column_name = 'question_hash'"
+        )).first() is not None
+
+        # Hashes already assigned (re-runs) claim their text first
+        owner_by_hash = dict(conn.execute(text(
+            "SELECT question_hash, question_id FROM global_questions WHERE question_hash IS NOT NULL"
+        )).all()) if has_column else {}
+
+        pending_filter = "WHERE question_hash IS NULL AND question_id > :last_id" if has_column \
+            else "WHERE question_id > :last_id"
+        update = text(
+            "UPDATE global_questions SET question_hash = :question_hash WHERE question_id = :question_id"
+        )
+
+        last_id = 0
+        while True:
+            rows = conn.execute(text(
+                f"SELECT question_id, question_text, question_type FROM global_questions "
+                f"{pending_filter} ORDER BY question_id LIMIT :limit"
+            ), {"last_id": last_id, "limit": batch_size}).all()
+            if not rows:
+                break
+            last_id = rows[-1].question_id
+
+            updates = []
+            for question_id, question_text, question_type in rows:
+                question_hash = QuestionService.question_hash(question_text, question_type or "")
+                if question_hash is None:
+                    stats["personalized"] += 1
+                elif question_hash in owner_by_hash:
+                    stats["duplicates"].append((question_id, owner_by_hash[question_hash]))
+                else:
+                    owner_by_hash[question_hash] = question_id
+                    updates.append({"question_hash": question_hash, "question_id": question_id})
+
+            if updates and not dry_run:
+                conn.execute(update, updates)
+            stats["hashed"] += len(updates)
+            logger.info(f"… backfilled up to question_id {last_id} ({stats['hashed']} hashed)")
+
+        if not dry_run:
+            conn.execute(text(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {INDEX_NAME} ON global_questions (question_hash)"
+            ))
+            logger.info(f"✓ Unique index {INDEX_NAME} present")
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add and backfill global_questions.question_hash")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = parser.parse_args()
+
+    stats = migrate(args.batch_size, args.dry_run)
+
+    logger.info("=" * 70)
+    logger.info(f"{'DRY RUN - ' if args.dry_run else ''}question_hash migration")
+    logger.info(f"  • Hashed: {stats['hashed']}")
+    logger.info(f"  • Personalized (NULL): {stats['personalized']}")
+    logger.info(f"  • Exact duplicates left NULL: {len(stats['duplicates'])}")
+    for question_id, original_id in stats["duplicates"][:50]:
+        logger.info(f"      question {question_id} duplicates {original_id}")
+    logger.info("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+Answer Scoring - batched, vectorized scoring against expected answers
+submit_answer only enqueues the new user_answers id; a background worker
+drains the queue in batches (ANSWER_SCORING_BATCH_SIZE) and per batch:
+
+  1. loads answer text + expected answer (the answer row's, else the question's) in ONE query
+  2. embeds every distinct text - whole answers, whole expected answers and their
+     sentences - in ONE encode call (normalized vectors)
+  3. similarity: row-wise dot product of answer and expected vectors
+     coverage:   share of expected sentences matched (>= ANSWER_COVERAGE_THRESHOLD)
+                 by some sentence of the same answer, from one batched (padded) matmul
+     score:      100 * (w * similarity + (1 - w) * coverage), w = ANSWER_SIMILARITY_WEIGHT
+  4. writes all scores with one UPDATE ... FROM (VALUES ...) per chunk, then
+     Interview.score of the completed interviews among them (mean of per-question scores)
+
+Answers without any expected answer are left unscored (NULL). A failed batch
+is retried one answer at a time; an answer that keeps failing is re-queued up
+to ANSWER_SCORING_MAX_ATTEMPTS times, then dropped (it stays NULL and is
+re-enqueued at the next startup). complete_interview only queues the
+interview's unscored answers, read from the database (they may have been
+submitted to another worker), and returns with the score still NULL.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import Float, Integer, column, func, select, update, values
+from sqlalchemy.orm import Session
+from app.database.postgres_db import SessionLocal
+from app.database.models import GlobalQuestion, Interview, InterviewQuestion, UserAnswer
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?;])\s+|\n+")
+
+
+def split_sentences(text: str) -> List[str]:
+    sentences = [sentence.strip() for sentence in _SENTENCE_SPLIT.split(text or "") if sentence.strip()]
+    return sentences or [(text or "").strip()]
+
+
+def _pad(vectors: np.ndarray, owner: np.ndarray, n: int):
+    """Rows grouped by owner (sorted) -> zero-padded (n, longest group, dim) block + validity mask"""
+    counts = np.bincount(owner, minlength=n)
+    slot = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+    block = np.zeros((n, counts.max(), vectors.shape[1]), dtype=vectors.dtype)
+    block[owner, slot] = vectors
+    valid = np.zeros((n, counts.max()), dtype=bool)
+    valid[owner, slot] = True
+    return block, valid
+
+
+def score_answers(
+        answers: Sequence[str],
+        expected: Sequence[str],
+        encode: Callable[[List[str]], Sequence[Sequence[float]]],
+        similarity_weight: float,
+        coverage_threshold: float
+):
+    """(similarity, coverage, score) arrays for answers[i] against expected[i]; encode must normalize"""
+    n = len(answers)
+    if n == 0:
+        empty = np.zeros(0, dtype=np.float32)
+        return empty, empty, empty
+
+    answer_sentences = [split_sentences(text) for text in answers]
+    expected_sentences = [split_sentences(text) for text in expected]
+    answer_owner = np.repeat(np.arange(n), [len(s) for s in answer_sentences])
+    expected_owner = np.repeat(np.arange(n), [len(s) for s in expected_sentences])
+
+    # Encode each distinct text once (expected answers repeat across candidates)
+    texts = [*answers, *expected,
+             *(s for group in answer_sentences for s in group),
+             *(s for group in expected_sentences for s in group)]
+    unique = list(dict.fromkeys(texts))
+    position = {text: i for i, text in enumerate(unique)}
+    vectors = np.asarray(encode(unique), dtype=np.float32)[[position[text] for text in texts]]
+
+    split_at = np.cumsum([n, n, len(answer_owner)])
+    answer_vecs, expected_vecs, answer_sentence_vecs, expected_sentence_vecs = np.split(vectors, split_at)
+
+    similarity = np.clip(np.einsum("ij,ij->i", answer_vecs, expected_vecs), 0.0, 1.0)
+
+    # Expected sentences x answer sentences per answer: one batched matmul over padded blocks
+    expected_block, expected_valid = _pad(expected_sentence_vecs, expected_owner, n)
+    answer_block, answer_valid = _pad(answer_sentence_vecs, answer_owner, n)
+    pairs = np.matmul(expected_block, answer_block.transpose(0, 2, 1))  # (n, expected, answer sentences)
+    pairs = np.where(answer_valid[:, None, :], pairs, -1.0)
+    covered = (pairs.max(axis=2) >= coverage_threshold) & expected_valid
+    coverage = covered.sum(axis=1) / expected_valid.sum(axis=1)
+
+    score = 100.0 * (similarity_weight * similarity + (1.0 - similarity_weight) * coverage)
+    return similarity, coverage, np.round(score, 1)
+
+
+def _encode(texts: List[str]):
+    from app.database.chroma_db import chroma_db  # shared SentenceTransformer, loaded with the vector store
+    return chroma_db.generate_embeddings(texts)
+
+
+class AnswerScorer:
+    """Process-wide scoring queue: answer id -> interview id, drained in batches"""
+
+    def __init__(self, batch_size: int, interval: float, similarity_weight: float, coverage_threshold: float,
+                 max_attempts: int):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.similarity_weight = similarity_weight
+        self.coverage_threshold = coverage_threshold
+        self.max_attempts = max_attempts
+        self._pending: "OrderedDict[int, int]" = OrderedDict()
+        self._attempts: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._score_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"enqueued": 0, "scored": 0, "no_reference": 0, "batches": 0, "failed_batches": 0, "dropped": 0,
+                       "last_batch_ms": 0.0, "last_answers_per_second": 0.0}
+
+    def enqueue(self, answer_id: int, interview_id: int):
+        """O(1), no database access (call after the answer is committed)"""
+        with self._lock:
+            self._pending[answer_id] = interview_id
+            self._stats["enqueued"] += 1
+            should_score = len(self._pending) >= self.batch_size
+        if should_score:
+            self._wake.set()
+
+    @staticmethod
+    def _unscored():
+        """(answer id, interview id) of unscored answers that have an expected answer"""
+        return (
+            select(UserAnswer.id, UserAnswer.interview_id)
+            .join(InterviewQuestion, InterviewQuestion.id == UserAnswer.question_id)
+            .join(GlobalQuestion, GlobalQuestion.question_id == InterviewQuestion.question_id)
+            .where(
+                UserAnswer.score.is_(None),
+                func.coalesce(UserAnswer.expected_answer, GlobalQuestion.expected_answer).isnot(None)
+            )
+            .order_by(UserAnswer.id)
+        )
+
+    def enqueue_unscored(self, db: Session, interview_id: Optional[int] = None) -> int:
+        """Re-enqueue answers left unscored (by a previous process, or for one interview on any worker); one query"""
+        query = self._unscored()
+        if interview_id is not None:
+            query = query.where(UserAnswer.interview_id == interview_id)
+        rows = db.execute(query).all()
+        with self._lock:
+            for answer_id, owner in rows:
+                self._pending.setdefault(answer_id, owner)
+        if rows:
+            self._wake.set()
+        return len(rows)
+
+    @staticmethod
+    def update_interview_scores(db: Session, interview_ids: Sequence[int]):
+        """Interview.score = mean of per-question mean answer scores, for the completed ones (caller commits)"""
+        per_question = (
+            select(UserAnswer.interview_id, func.avg(UserAnswer.score).label("score"))
+            .where(UserAnswer.interview_id.in_(interview_ids))
+            .group_by(UserAnswer.interview_id, UserAnswer.question_id)
+            .subquery()
+        )
+        scores = [
+            (interview_id, round(float(score), 1))
+            for interview_id, score in db.execute(
+                select(per_question.c.interview_id, func.avg(per_question.c.score))
+                .group_by(per_question.c.interview_id)
+            )
+            if score is not None
+        ]
+        if not scores:
+            return
+        updates = values(column("interview_id", Integer), column("score", Float), name="v").data(scores)
+        db.execute(
+            update(Interview)
+            .where(Interview.interview_id == updates.c.interview_id, Interview.status == "completed")
+            .values(score=updates.c.score)
+        )
+
+    def flush(self) -> int:
+        """Score everything pending now; returns answers scored"""
+        scored = 0
+        while True:
+            with self._score_lock:  # one batch at a time
+                chunk = self._take()
+                if not chunk:
+                    return scored
+                count, failed = self._score_chunk(chunk)
+                scored += count
+                if failed:
+                    return scored  # retried on the next run
+
+    def _take(self) -> List[tuple]:
+        """Remove and return up to batch_size pending (answer_id, interview_id) pairs"""
+        with self._lock:
+            chunk = list(islice(self._pending.items(), self.batch_size))
+            for answer_id, _ in chunk:
+                del self._pending[answer_id]
+            return chunk
+
+    def _score_chunk(self, chunk: List[tuple]) -> Tuple[int, bool]:
+        """(answers scored, any failed); a failed batch is retried answer by answer so one bad answer only fails itself"""
+        try:
+            scored = self._score_batch([answer_id for answer_id, _ in chunk])
+        except Exception as e:
+            with self._lock:
+                self._stats["failed_batches"] += 1
+            logger.error(f"❌ Scoring {len(chunk)} answers failed: {e}")
+        else:
+            with self._lock:
+                for answer_id, _ in chunk:
+                    self._attempts.pop(answer_id, None)
+            return scored, False
+
+        if len(chunk) == 1:
+            self._retry_later(*chunk[0])
+            return 0, True
+        scored, failed = 0, False
+        for pair in chunk:
+            count, single_failed = self._score_chunk([pair])
+            scored, failed = scored + count, failed or single_failed
+        return scored, failed
+
+    def _retry_later(self, answer_id: int, interview_id: int):
+        """Back to the queue, or dropped after max_attempts failures"""
+        with self._lock:
+            attempts = self._attempts.pop(answer_id, 0) + 1
+            if attempts < self.max_attempts:
+                self._attempts[answer_id] = attempts
+                self._pending.setdefault(answer_id, interview_id)
+                return
+            self._stats["dropped"] += 1
+        logger.error(f"❌ Answer {answer_id} dropped after {attempts} failed scoring attempts (left unscored)")
+
+    def _score_batch(self, answer_ids: List[int]) -> int:
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(
+                    UserAnswer.id,
+                    UserAnswer.interview_id,
+                    UserAnswer.answer_text,
+                    func.coalesce(UserAnswer.expected_answer, GlobalQuestion.expected_answer)
+                )
+                .join(InterviewQuestion, InterviewQuestion.id == UserAnswer.question_id)
+                .join(GlobalQuestion, GlobalQuestion.question_id == InterviewQuestion.question_id)
+                .where(UserAnswer.id.in_(answer_ids))
+            ).all()
+            rows = [row for row in rows if row[3] and row[3].strip()]
+            no_reference = len(answer_ids) - len(rows)
+
+            if rows:
+                _, _, scores = score_answers(
+                    [row[2] for row in rows], [row[3] for row in rows], _encode,
+                    self.similarity_weight, self.coverage_threshold
+                )
+                updates = values(column("id", Integer), column("score", Float), name="v").data(
+                    [(row[0], float(score)) for row, score in zip(rows, scores)]
+                )
+                db.execute(update(UserAnswer).where(UserAnswer.id == updates.c.id).values(score=updates.c.score))
+                self.update_interview_scores(db, sorted({row[1] for row in rows}))
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._stats["scored"] += len(rows)
+            self._stats["no_reference"] += no_reference
+            self._stats["batches"] += 1
+            self._stats["last_batch_ms"] = round(elapsed * 1000, 1)
+            self._stats["last_answers_per_second"] = round(len(answer_ids) / elapsed, 1) if elapsed else 0.0
+        logger.debug(f"Scored {len(rows)} answers ({no_reference} without expected answer) in {elapsed * 1000:.0f}ms")
+        return len(rows)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="answer-scorer", daemon=True)
+        self._thread.start()
+        logger.info(f"✓ Answer scorer started (batch {self.batch_size}, every {self.interval}s)")
+
+    def stop(self):
+        """Stop the worker and score whatever is still pending"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+        scored = self.flush()
+        logger.info(f"✓ Answer scorer stopped ({scored} answers scored on shutdown)")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self._stats, "pending": len(self._pending)}
+
+
+# Global instance
+answer_scorer = AnswerScorer(
+    batch_size=settings.ANSWER_SCORING_BATCH_SIZE,
+    interval=settings.ANSWER_SCORING_INTERVAL_SECONDS,
+    similarity_weight=settings.ANSWER_SIMILARITY_WEIGHT,
+    coverage_threshold=settings.ANSWER_COVERAGE_THRESHOLD,
+    max_attempts=settings.ANSWER_SCORING_MAX_ATTEMPTS
+)
@@ -0,0 +1,122 @@
+"""
+Bank Inventory - question counts per (job_role, industry, question_type)
+Loaded with ONE grouped query, then kept current from question events, so
+count lookups on the interview hot path never go to PostgreSQL. A TTL
+refresh (done by a single caller while others keep reading) picks up
+writes made by other processes.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.database.models import GlobalQuestion
+from app.services.question_events import question_events, CREATED, UPDATED, DELETED, RELOADED
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class BankInventory:
+    """In-memory counts of the question bank"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._counts = Counter()  # (job_role, industry, question_type) -> count
+        self._by_type_role = Counter()  # (question_type, job_role) -> count (all industries)
+
+    # ------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------
+
+    def count(self, db: Session, job_role: str, industry: str, question_type: str) -> int:
+        self._ensure_fresh(db)
+        with self._lock:
+            return self._counts[(job_role, industry, question_type)]
+
+    def counts_by_type(self, db: Session, job_role: str, industry: str, question_types: List[str]) -> Dict[str, int]:
+        self._ensure_fresh(db)
+        with self._lock:
+            return {q_type: self._counts[(job_role, industry, q_type)] for q_type in question_types}
+
+    def count_by_type_role(self, db: Session, question_type: str, job_role: str) -> int:
+        self._ensure_fresh(db)
+        with self._lock:
+            return self._by_type_role[(question_type, job_role)]
+
+    # ------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------
+
+    def _ensure_fresh(self, db: Session):
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < self.ttl_seconds:
+            return
+        if loaded_at is None:
+            with self._refresh_lock:  # first load: everyone waits for it
+                if self._loaded_at is None:
+                    self.refresh(db)
+        elif self._refresh_lock.acquire(blocking=False):  # stale: one caller refreshes, others read
+            try:
+                self.refresh(db)
+            finally:
+                self._refresh_lock.release()
+
+    def refresh(self, db: Session):
+        """Rebuild all counts with a single grouped query"""
+        counts, by_type_role = Counter(), Counter()
+        rows = db.execute(
+            select(
+                GlobalQuestion.job_role,
+                GlobalQuestion.industry,
+                GlobalQuestion.question_type,
+                func.count()
+            ).group_by(GlobalQuestion.job_role, GlobalQuestion.industry, GlobalQuestion.question_type)
+        )
+        for job_role, industry, question_type, count in rows:
+            counts[(job_role, industry, question_type)] = count
+            by_type_role[(question_type, job_role)] += count
+
+        with self._lock:
+            self._counts, self._by_type_role = counts, by_type_role
+            self._loaded_at = time.monotonic()
+        logger.debug(f"Bank inventory refreshed: {len(counts)} (job_role, industry, type) buckets")
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    # ------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------
+
+    def _apply(self, snapshot, sign: int):
+        self._counts[(snapshot.job_role, snapshot.industry, snapshot.question_type)] += sign
+        self._by_type_role[(snapshot.question_type, snapshot.job_role)] += sign
+
+    def on_event(self, kind: str, snapshot, previous):
+        if kind == RELOADED:
+            self.invalidate()
+            return
+        with self._lock:
+            if self._loaded_at is None:
+                return  # the next read loads everything
+            if kind == CREATED:
+                self._apply(snapshot, +1)
+            elif kind == DELETED:
+                self._apply(snapshot, -1)
+            elif kind == UPDATED:
+                self._apply(previous, -1)
+                self._apply(snapshot, +1)
+
+
+# Global instance
+bank_inventory = BankInventory(ttl_seconds=settings.BANK_INVENTORY_TTL_SECONDS)
+question_events.subscribe(bank_inventory.on_event)
@@ -0,0 +1,173 @@
+"""
+Exposure Sampler - usage-balanced question selection
+Always serving the first/top question makes a handful of questions absorb
+nearly all usage (and leak to candidates). Here every bucket of candidates
+(one per filter combination, e.g. subcategory="behavioral" + is_static, or
+question_type="hr" + job_role) gets a Walker alias table with weights
+
+    w = 1 / (1 + usage_count) ** EXPOSURE_ALPHA
+
+so a draw is O(1) and rarely used questions are favoured. Candidates and usage
+come from the in-memory bank snapshot; a table is rebuilt (O(bucket size)) only
+when the bank changed or a usage flush touched one of its questions.
+"""
+
+import logging
+import random
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from sqlalchemy.orm import Session
+from app.services.question_bank_snapshot import question_bank_snapshot
+from app.services.usage_tracker import usage_tracker
+from app.services.seen_questions import SeenFilter
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def exposure_weights(usage: np.ndarray, alpha: float) -> np.ndarray:
+    return 1.0 / np.power(1.0 + np.asarray(usage, dtype=np.float64), alpha)
+
+
+def _weighted_index(weights: np.ndarray, rng: random.Random) -> int:
+    """O(n) inverse-CDF draw, for one-off picks that do not deserve a table"""
+    cumulative = np.cumsum(weights)
+    return min(int(np.searchsorted(cumulative, rng.random() * cumulative[-1], side="right")), len(weights) - 1)
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(n) build, O(1) weighted draw"""
+
+    __slots__ = ("ids", "id_array", "prob", "alias", "version")
+
+    def __init__(self, ids: np.ndarray, weights: np.ndarray, version: int = 0):
+        n = len(ids)
+        self.id_array = np.asarray(ids, dtype=np.int64)
+        self.ids = self.id_array.tolist()  # plain ints: cheapest to index in draw()
+        self.version = version
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        if n == 0:
+            return
+
+        scaled = np.asarray(weights, dtype=np.float64) * (n / float(np.sum(weights)))
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        scaled = scaled.tolist()
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large:  # leftovers are 1.0 up to rounding
+            self.prob[i] = 1.0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def draw(self, rng: random.Random = random) -> int:
+        i = int(rng.random() * len(self.ids))
+        return self.ids[i] if rng.random() < self.prob[i] else self.ids[self.alias[i]]
+
+
+class ExposureSampler:
+    """Per-bucket alias tables over the bank snapshot, kept in step with usage flushes"""
+
+    def __init__(self, alpha: float, max_rejections: int = 8):
+        self.alpha = alpha
+        self.max_rejections = max_rejections
+        self._tables: Dict[tuple, AliasTable] = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    @staticmethod
+    def _key(filters: dict) -> tuple:
+        return tuple(sorted((name, value) for name, value in filters.items() if value is not None))
+
+    def _table(self, db: Session, filters: dict) -> AliasTable:
+        key = self._key(filters)
+        version = question_bank_snapshot.current_version(db)
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None and table.version == version and key not in self._dirty:
+                return table
+            self._dirty.discard(key)  # a flush during the rebuild marks it dirty again
+
+        ids, usage, version = question_bank_snapshot.select(db, **filters)
+        table = AliasTable(ids, exposure_weights(usage, self.alpha), version)
+        with self._lock:
+            self._tables[key] = table
+            self._stats["rebuilds"] += 1
+        return table
+
+    def sample(
+            self,
+            db: Session,
+            exclude_ids: Optional[Iterable[int]] = None,
+            rng: random.Random = random,
+            seen: Optional[SeenFilter] = None,
+            **filters
+    ) -> Optional[int]:
+        """
+        One question id matching the snapshot filters, weighted against high usage (None if none left)
+        Questions in the user's seen filter are avoided too, unless every remaining candidate is in it
+        """
+        table = self._table(db, filters)
+        if len(table) == 0:
+            return None
+        excluded = {int(qid) for qid in exclude_ids or ()}
+        with self._lock:
+            self._stats["draws"] += 1
+
+        for _ in range(self.max_rejections):
+            question_id = table.draw(rng)
+            if question_id not in excluded and (seen is None or question_id not in seen):
+                return question_id
+
+        # Bucket mostly excluded (e.g. nearly exhausted by this interview): weigh the remainder directly
+        with self._lock:
+            self._stats["fallback_draws"] += 1
+        ids, usage, _ = question_bank_snapshot.select(db, exclude_ids=excluded, **filters)
+        if len(ids) == 0:
+            return None
+        if seen is not None:
+            unseen = ~seen.contains_many(ids)
+            if unseen.any():  # a repeat only when the user has seen the whole bucket
+                ids, usage = ids[unseen], usage[unseen]
+        return int(ids[_weighted_index(exposure_weights(usage, self.alpha), rng)])
+
+    def choose(self, question_ids: List[int], rng: random.Random = random) -> int:
+        """Weighted pick among a few already-qualified candidates (e.g. vector hits above the threshold)"""
+        if len(question_ids) == 1:
+            return question_ids[0]
+        usage = question_bank_snapshot.usage_of(question_ids)
+        weights = exposure_weights([usage.get(int(qid), 0) for qid in question_ids], self.alpha)
+        return question_ids[_weighted_index(weights, rng)]
+
+    def on_usage_flush(self, deltas: Dict[int, int]):
+        """usage_tracker listener: tables holding a flushed question are rebuilt on their next draw"""
+        touched = np.fromiter(deltas.keys(), dtype=np.int64, count=len(deltas))
+        with self._lock:
+            for key, table in self._tables.items():
+                if key not in self._dirty and np.isin(touched, table.id_array).any():
+                    self._dirty.add(key)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "alpha": self.alpha,
+                "tables": len(self._tables),
+                "dirty_tables": len(self._dirty),
+                "largest_table": max((len(t) for t in self._tables.values()), default=0)
+            }
+
+
+# Global instance (registered after the bank snapshot, so it sees flushed usage first)
+exposure_sampler = ExposureSampler(alpha=settings.EXPOSURE_ALPHA)
+usage_tracker.on_flush(exposure_sampler.on_usage_flush)
@@ -2,25 +2,98 @@
 Gemini API Client Wrapper - Compatible with generateContent endpoint
 """
 
+import json
 import logging
+import time
 import requests
+from typing import Iterator, List, Optional
+from pydantic import ValidationError
 from app.config import get_settings
+from app.schemas import GeneratedQuestion
+from app.services.rate_limiter import gemini_rate_limiter, estimate_tokens, RateLimitExceeded
+from app.services.latency_tracker import gemini_latency
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Gemini responseSchema (OpenAPI subset) for batch generation
+BATCH_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "questions": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "question_text": {"type": "STRING"},
+                    "difficulty": {"type": "STRING", "enum": ["easy", "medium", "hard"]},
+                    "tags": {"type": "ARRAY", "items": {"type": "STRING"}},
+                    "expected_answer": {"type": "STRING"}
+                },
+                "required": ["question_text", "difficulty"]
+            }
+        }
+    },
+    "required": ["questions"]
+}
+
+
 class GeminiService:
-    BASE_URL = f"https://generativelanguage.googleapis.com/v1beta/models/{settings.GEMINI_MODEL}:generateContent"
+    MODEL_URL = f"{settings.GEMINI_BASE_URL.rstrip('/')}/models/{settings.GEMINI_MODEL}"
+    BASE_URL = f"{MODEL_URL}:generateContent"
+    STREAM_URL = f"{MODEL_URL}:streamGenerateContent?alt=sse"
 
     @staticmethod
-    def generate_question(prompt: str, temperature: float = None, max_tokens: int = None) -> str:
+    def _acquire_quota(prompt: str, max_tokens: int, blocking: bool) -> int:
         """
-        Call Gemini API with prompt to generate question text.
-        Uses the correct request structure for :generateContent endpoint.
+        Reserve shared quota before calling Gemini.
+        Returns the token estimate that was charged (reconciled after the call).
+
+        Raises:
+            RateLimitExceeded: non-blocking call without free quota, or max wait exceeded
+        """
+        estimated = estimate_tokens(prompt, max_tokens)
+        if blocking:
+            gemini_rate_limiter.acquire(estimated)
+        elif not gemini_rate_limiter.try_acquire(estimated):
+            raise RateLimitExceeded("Gemini quota unavailable for non-blocking call")
+        return estimated
+
+    @staticmethod
+    def _record_usage(endpoint: str, estimated_tokens: int, data: dict):
+        """Account real token usage and give back the unused part of the estimate"""
+        usage = data.get("usageMetadata", {})
+        total_tokens = usage.get("totalTokenCount", estimated_tokens)
+        gemini_rate_limiter.reconcile(estimated_tokens, total_tokens)
+        gemini_rate_limiter.record_usage(
+            endpoint,
+            prompt_tokens=usage.get("promptTokenCount", 0),
+            output_tokens=usage.get("candidatesTokenCount", 0),
+            total_tokens=total_tokens
+        )
+
+    @staticmethod
+    def _request_timeout(timeout: Optional[float]) -> float:
+        cap = settings.GEMINI_REQUEST_TIMEOUT_SECONDS
+        return min(timeout, cap) if timeout is not None else cap
+
+    @staticmethod
+    def _generate_content(
+            prompt: str,
+            generation_config: dict,
+            endpoint: str = "question",
+            blocking: bool = True,
+            timeout: Optional[float] = None
+    ) -> str:
+        """
+        POST a single prompt to the :generateContent endpoint and return the text part.
+        Every call goes through the shared rate limiter and is accounted under `endpoint`.
+        The HTTP call times out after `timeout` seconds, capped at GEMINI_REQUEST_TIMEOUT_SECONDS.
         Includes debug logs for requests and responses.
         """
-        temperature = temperature if temperature is not None else settings.GEMINI_TEMPERATURE
-        max_tokens = max_tokens if max_tokens is not None else settings.GEMINI_MAX_TOKENS
+        estimated_tokens = GeminiService._acquire_quota(
+            prompt, generation_config["maxOutputTokens"], blocking
+        )
 
         headers = {
             "Content-Type": "application/json",
@@ -34,30 +107,35 @@ class GeminiService:
                     ]
                 }
             ],
-            "generationConfig": {
-                "temperature": temperature,
-                "maxOutputTokens": max_tokens
-            }
+            "generationConfig": generation_config
         }
         logger.debug(f"Gemini request prompt: {prompt}")
 
         try:
-            response = requests.post(GeminiService.BASE_URL, headers=headers, json=body)
+            started = time.perf_counter()
+            response = requests.post(
+                GeminiService.BASE_URL, headers=headers, json=body,
+                timeout=GeminiService._request_timeout(timeout)
+            )
+            if response.ok and endpoint == "question":
+                # Only single-question calls: batches would skew the hedging budget
+                gemini_latency.record(time.perf_counter() - started)
             logger.debug(f"Gemini raw response: {response.text}")
+            if response.status_code == 429:
+                gemini_rate_limiter.record_usage(endpoint, throttled=True)
             response.raise_for_status()
             data = response.json()
+            GeminiService._record_usage(endpoint, estimated_tokens, data)
             # Adapt extraction depending on Gemini version used
             # Gemini responses typically: data['candidates'][0]['content']['parts'][0]['text']
             candidates = data.get("candidates", [])
             if candidates and "content" in candidates[0]:
-                question_text = candidates[0]["content"]["parts"][0]["text"].strip()
+                return candidates[0]["content"]["parts"][0]["text"].strip()
             elif candidates and "output" in candidates[0]:  # for backward compatibility
-                question_text = candidates[0]["output"].strip()
+                return candidates[0]["output"].strip()
             else:
                 logger.error(f"No text found in Gemini API response: {data}")
                 raise ValueError("No question generated by Gemini API")
-            logger.info(f"Gemini generated question: {question_text}")
-            return question_text
         except requests.HTTPError as e:
             logger.error(f"HTTP error during Gemini call: {e} - Response: {response.text}")
             raise
@@ -66,47 +144,225 @@ class GeminiService:
             raise
 
     @staticmethod
-    def generate_hr_question(job_role: str, industry: str) -> str:
-        prompt = (
+    def generate_question(
+            prompt: str,
+            temperature: float = None,
+            max_tokens: int = None,
+            blocking: bool = True,
+            timeout: Optional[float] = None
+    ) -> str:
+        """
+        Call Gemini API with prompt to generate question text.
+        Uses the correct request structure for :generateContent endpoint.
+        With blocking=False, raises RateLimitExceeded instead of queueing for quota.
+        timeout bounds the HTTP call (seconds, capped at GEMINI_REQUEST_TIMEOUT_SECONDS).
+        """
+        temperature = temperature if temperature is not None else settings.GEMINI_TEMPERATURE
+        max_tokens = max_tokens if max_tokens is not None else settings.GEMINI_MAX_TOKENS
+
+        question_text = GeminiService._generate_content(prompt, {
+            "temperature": temperature,
+            "maxOutputTokens": max_tokens
+        }, blocking=blocking, timeout=timeout)
+        logger.info(f"Gemini generated question: {question_text}")
+        return question_text
+
+    @staticmethod
+    def generate_questions_batch(
+            prompt: str,
+            count: int,
+            temperature: float = None,
+            max_tokens: int = None
+    ) -> List[GeneratedQuestion]:
+        """
+        Ask Gemini for `count` questions in ONE call using structured JSON output.
+        Each item is validated on its own, so a single malformed entry
+        only drops that entry instead of the whole batch.
+        """
+        count = max(1, min(count, settings.GEMINI_BATCH_MAX_SIZE))
+        temperature = temperature if temperature is not None else settings.GEMINI_TEMPERATURE
+        if max_tokens is None:
+            max_tokens = max(settings.GEMINI_MAX_TOKENS, count * settings.GEMINI_BATCH_TOKENS_PER_QUESTION)
+
+        raw_text = GeminiService._generate_content(prompt, {
+            "temperature": temperature,
+            "maxOutputTokens": max_tokens,
+            "responseMimeType": "application/json",
+            "responseSchema": BATCH_RESPONSE_SCHEMA
+        }, endpoint="question_batch")
+
+        try:
+            payload = json.loads(raw_text)
+        except json.JSONDecodeError as e:
+            logger.error(f"Gemini batch response is not valid JSON: {e}")
+            raise ValueError("Gemini batch response is not valid JSON") from e
+
+        items = payload.get("questions", []) if isinstance(payload, dict) else []
+        questions = []
+        for item in items:
+            try:
+                questions.append(GeneratedQuestion.model_validate(item))
+            except ValidationError as e:
+                logger.warning(f"Dropping invalid generated question {item!r}: {e}")
+
+        logger.info(f"Gemini batch returned {len(questions)}/{count} valid questions")
+        return questions[:count]
+
+    @staticmethod
+    def stream_question(
+            prompt: str,
+            temperature: float = None,
+            max_tokens: int = None,
+            blocking: bool = True
+    ) -> Iterator[str]:
+        """
+        Call the :streamGenerateContent endpoint (SSE) and yield text chunks
+        as soon as Gemini produces them. Usage is accounted once the stream ends.
+        """
+        temperature = temperature if temperature is not None else settings.GEMINI_TEMPERATURE
+        max_tokens = max_tokens if max_tokens is not None else settings.GEMINI_MAX_TOKENS
+        endpoint = "question_stream"
+
+        estimated_tokens = GeminiService._acquire_quota(prompt, max_tokens, blocking)
+
+        headers = {
+            "Content-Type": "application/json",
+            "X-Goog-Api-Key": settings.GEMINI_API_KEY
+        }
+        body = {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": {
+                "temperature": temperature,
+                "maxOutputTokens": max_tokens
+            }
+        }
+        logger.debug(f"Gemini stream request prompt: {prompt}")
+
+        usage_data = {}
+        with requests.post(
+                GeminiService.STREAM_URL, headers=headers, json=body, stream=True,
+                timeout=GeminiService._request_timeout(None)
+        ) as response:
+            if response.status_code == 429:
+                gemini_rate_limiter.record_usage(endpoint, throttled=True)
+            if not response.ok:
+                logger.error(f"HTTP error during Gemini stream: {response.status_code} - {response.text}")
+                response.raise_for_status()
+
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                chunk = json.loads(line[len("data:"):].strip())
+                if "usageMetadata" in chunk:
+                    usage_data = {"usageMetadata": chunk["usageMetadata"]}
+
+                for candidate in chunk.get("candidates", [])[:1]:
+                    for part in candidate.get("content", {}).get("parts", []):
+                        if part.get("text"):
+                            yield part["text"]
+
+        GeminiService._record_usage(endpoint, estimated_tokens, usage_data)
+
+    @staticmethod
+    def _hr_prompt(job_role: str, industry: str) -> str:
+        return (
             f"Generate a concise, focused HR interview question for the job role '{job_role}' "
             f"in the '{industry}' industry. "
             "The question should be open-ended and assess the candidate's soft skills. "
             "Do NOT include explanations or extra commentary."
         )
-        return GeminiService.generate_question(prompt)
 
     @staticmethod
-    def generate_technical_question(job_role: str, skills: str) -> str:
-        prompt = (
+    def _technical_prompt(job_role: str, skills: str) -> str:
+        return (
             f"Generate a concise, clear technical interview question for the job role '{job_role}' "
             f"with skills including {skills}. "
             "The question should test problem-solving or coding skills. "
             "Do NOT include explanations or additional text."
         )
-        return GeminiService.generate_question(prompt)
 
     @staticmethod
-    def generate_experience_question(user_profile: str) -> str:
-        prompt = (
+    def _experience_prompt(user_profile: str) -> str:
+        return (
             f"Based on the following user profile, generate a personalized experience question: {user_profile}"
         )
-        return GeminiService.generate_question(prompt)
+
+    @staticmethod
+    def generate_hr_question(job_role: str, industry: str, blocking: bool = True) -> str:
+        prompt = GeminiService._hr_prompt(job_role, industry)
+        return GeminiService.generate_question(prompt, blocking=blocking)
+
+    @staticmethod
+    def generate_technical_question(job_role: str, skills: str, blocking: bool = True) -> str:
+        prompt = GeminiService._technical_prompt(job_role, skills)
+        return GeminiService.generate_question(prompt, blocking=blocking)
+
+    @staticmethod
+    def generate_experience_question(user_profile: str, blocking: bool = True) -> str:
+        prompt = GeminiService._experience_prompt(user_profile)
+        return GeminiService.generate_question(prompt, blocking=blocking)
+
+    @staticmethod
+    def generate_question_batch_for_type(
+            question_type: str,
+            job_role: str,
+            industry: str = "general",
+            count: int = None,
+            skills: str = ""
+    ) -> List[GeneratedQuestion]:
+        """Batch counterpart of generate_hr_question / generate_technical_question"""
+        count = count or settings.GEMINI_BATCH_SIZE
+
+        if question_type == "technical":
+            focus = (
+                f"with skills including {skills}. " if skills else ""
+            ) + "Each question should test problem-solving or coding skills."
+        elif question_type == "hr":
+            focus = (
+                f"in the '{industry}' industry. "
+                "Each question should be open-ended and assess the candidate's soft skills."
+            )
+        else:
+            focus = f"in the '{industry}' industry."
+
+        prompt = (
+            f"Generate exactly {count} distinct, concise {question_type} interview questions "
+            f"for the job role '{job_role}' {focus} "
+            "Every question must cover a different topic; do not rephrase the same question. "
+            "Provide a brief expected_answer (1-2 sentences) and a few lowercase tags for each. "
+            "Return ONLY valid JSON matching the schema."
+        )
+        return GeminiService.generate_questions_batch(prompt, count)
 
     # 🔥 ADD THIS METHOD to GeminiService class
 
     @staticmethod
-    def generate_question_for_type(question_type: str, user) -> str:
-        """Generate based on type + user profile"""
+    def prompt_for_type(question_type: str, user) -> str:
+        """Build the generation prompt for a question type + user profile"""
         job_role = getattr(user, 'job_role', 'Software Engineer')
         skills_str = ' '.join(user.skills) if hasattr(user, 'skills') and user.skills else ''
 
         if question_type == "hr":
-            return GeminiService.generate_hr_question(job_role, user.industry)
+            return GeminiService._hr_prompt(job_role, user.industry)
         elif question_type == "technical":
-            return GeminiService.generate_technical_question(job_role, skills_str)
+            return GeminiService._technical_prompt(job_role, skills_str)
         elif question_type == "experience":
             profile = f"Profile: {user.bio or ''}. Skills: {skills_str}"
-            return GeminiService.generate_experience_question(profile)
+            return GeminiService._experience_prompt(profile)
         else:
-            return GeminiService.generate_question(f"Generate {question_type} question for {user.industry}")
+            return f"Generate {question_type} question for {user.industry}"
+
+    @staticmethod
+    def generate_question_for_type(question_type: str, user, blocking: bool = True) -> str:
+        """Generate based on type + user profile"""
+        return GeminiService.generate_question(
+            GeminiService.prompt_for_type(question_type, user), blocking=blocking
+        )
+
+    @staticmethod
+    def stream_question_for_type(question_type: str, user, blocking: bool = True) -> Iterator[str]:
+        """Streaming counterpart of generate_question_for_type"""
+        return GeminiService.stream_question(
+            GeminiService.prompt_for_type(question_type, user), blocking=blocking
+        )
 
@@ -0,0 +1,269 @@
+"""
+Generation Jobs - Bulk question generation in the background
+Jobs are rows in generation_jobs; progress is committed after every Gemini
+batch so a restarted process resumes where the previous one stopped.
+"""
+
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from app.database.postgres_db import SessionLocal
+from app.database.models import GenerationJob
+from app.services.question_generation_service import QuestionGenerationService
+from app.services.rate_limiter import RateLimitExceeded
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def job_to_dict(job: GenerationJob) -> Dict:
+    """Status payload (matches schemas.GenerationJobResponse)"""
+    stored = job.stored_count or 0
+    calls = job.gemini_calls or 0
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "question_type": job.question_type,
+        "job_role": job.job_role,
+        "industry": job.industry,
+        "target_count": job.target_count,
+        "stored_count": stored,
+        "progress": round(min(stored / job.target_count, 1.0), 4) if job.target_count else 0.0,
+        "gemini_calls": calls,
+        "failed_calls": job.failed_calls or 0,
+        "yield_per_call": round(stored / calls, 2) if calls else 0.0,
+        "dedup": {
+            "candidates": job.candidates or 0,
+            "exact_duplicates": job.exact_duplicates or 0,
+            "intra_batch_duplicates": job.intra_batch_duplicates or 0,
+            "bank_duplicates": job.bank_duplicates or 0
+        },
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at
+    }
+
+
+class GenerationJobRunner:
+    """Runs generation jobs on a bounded worker pool (GENERATION_JOB_WORKERS)"""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.owner = uuid.uuid4().hex[:12]
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="generation-job")
+            return self._executor
+
+    # ------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------
+
+    def create_job(
+            self,
+            db: Session,
+            question_type: str,
+            job_role: str,
+            count: int,
+            industry: str = "general",
+            skills: Optional[str] = None
+    ) -> GenerationJob:
+        """Persist a queued job and hand it to the worker pool"""
+        job = GenerationJob(
+            question_type=question_type,
+            job_role=job_role,
+            industry=industry or "general",
+            skills=skills,
+            target_count=count,
+            status="queued"
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        self.submit(job.job_id)
+        logger.info(f"📦 Queued generation job {job.job_id}: {count} {question_type} questions for {job_role}")
+        return job
+
+    def submit(self, job_id: int):
+        self._pool().submit(self._run, job_id)
+
+    def resume_pending(self) -> int:
+        """Re-submit queued/running jobs left over from a previous process"""
+        db = SessionLocal()
+        try:
+            job_ids = [
+                row.job_id for row in db.query(GenerationJob.job_id).filter(
+                    GenerationJob.status.in_(ACTIVE_STATUSES)
+                ).order_by(GenerationJob.job_id).all()
+            ]
+        finally:
+            db.close()
+
+        for job_id in job_ids:
+            self.submit(job_id)
+        if job_ids:
+            logger.info(f"🔁 Resumed {len(job_ids)} generation job(s): {job_ids}")
+        return len(job_ids)
+
+    def shutdown(self):
+        """Stop after the current batch; unfinished jobs stay 'running' and resume on next start"""
+        self._stop.set()
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    # ------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------
+
+    def _claim(self, db: Session, job_id: int) -> bool:
+        """Atomically take ownership (queued, or running with a stale heartbeat)"""
+        now = _utcnow()
+        stale_before = now - timedelta(seconds=settings.GENERATION_JOB_STALE_SECONDS)
+        claimed = db.query(GenerationJob).filter(
+            GenerationJob.job_id == job_id,
+            or_(
+                GenerationJob.status == "queued",
+                (GenerationJob.status == "running") & or_(
+                    GenerationJob.owner == self.owner,
+                    GenerationJob.heartbeat_at.is_(None),
+                    GenerationJob.heartbeat_at < stale_before
+                )
+            )
+        ).update({
+            GenerationJob.status: "running",
+            GenerationJob.owner: self.owner,
+            GenerationJob.heartbeat_at: now,
+            GenerationJob.started_at: func.coalesce(GenerationJob.started_at, now)  # keep first start on resume
+        }, synchronize_session=False)
+        db.commit()
+        return claimed == 1
+
+    def _run(self, job_id: int):
+        db = SessionLocal()
+        try:
+            if not self._claim(db, job_id):
+                job = db.get(GenerationJob, job_id)
+                if job and job.status == "running":
+                    # Fresh heartbeat: either another process owns it or this process
+                    # restarted quickly. Retry once the heartbeat would be stale.
+                    logger.info(f"Generation job {job_id} has a live heartbeat, retrying later")
+                    retry = threading.Timer(settings.GENERATION_JOB_STALE_SECONDS, self._retry_claim, args=(job_id,))
+                    retry.daemon = True
+                    retry.start()
+                return
+
+            self._generate(db, db.get(GenerationJob, job_id))
+
+        except Exception as e:
+            logger.error(f"❌ Generation job {job_id} crashed: {e}")
+            db.rollback()
+            self._finish(db, job_id, "failed", error=str(e))
+        finally:
+            db.close()
+
+    def _retry_claim(self, job_id: int):
+        if not self._stop.is_set():
+            self.submit(job_id)
+
+    def _generate(self, db: Session, job: GenerationJob):
+        empty_batches = 0
+        failures = 0
+
+        while job.stored_count < job.target_count:
+            if self._stop.is_set():
+                logger.info(f"⏸ Generation job {job.job_id} paused at {job.stored_count}/{job.target_count}")
+                return
+
+            remaining = job.target_count - job.stored_count
+            try:
+                result = QuestionGenerationService.generate_and_store_question_batch(
+                    db,
+                    question_type=job.question_type,
+                    job_role=job.job_role,
+                    industry=job.industry,
+                    skills=job.skills or "",
+                    max_store=remaining
+                )
+            except RateLimitExceeded as e:
+                # Quota, not a fault: wait for the buckets to refill without counting a failure
+                logger.info(f"Generation job {job.job_id} throttled: {e}")
+                db.rollback()
+                self._heartbeat(db, job)
+                self._stop.wait(settings.GENERATION_JOB_RETRY_BACKOFF)
+                continue
+            except Exception as e:
+                db.rollback()
+                failures += 1
+                job.failed_calls = (job.failed_calls or 0) + 1
+                job.error = str(e)
+                self._heartbeat(db, job)
+                logger.warning(f"Generation job {job.job_id} batch failed ({failures} in a row): {e}")
+                if failures >= settings.GENERATION_JOB_MAX_FAILURES:
+                    self._finish(db, job.job_id, "failed", error=f"{failures} consecutive batch failures: {e}")
+                    return
+                self._stop.wait(settings.GENERATION_JOB_RETRY_BACKOFF * (2 ** (failures - 1)))
+                continue
+
+            failures = 0
+            stats = result["stats"]
+            job.gemini_calls = (job.gemini_calls or 0) + 1
+            job.stored_count = (job.stored_count or 0) + stats["stored"]
+            job.candidates = (job.candidates or 0) + stats["candidates"]
+            job.exact_duplicates = (job.exact_duplicates or 0) + stats["exact_duplicates"]
+            job.intra_batch_duplicates = (job.intra_batch_duplicates or 0) + stats["intra_batch_duplicates"]
+            job.bank_duplicates = (job.bank_duplicates or 0) + stats["bank_duplicates"]
+            job.error = None
+            self._heartbeat(db, job)
+
+            empty_batches = empty_batches + 1 if stats["stored"] == 0 else 0
+            if empty_batches >= settings.GENERATION_JOB_MAX_EMPTY_BATCHES:
+                self._finish(
+                    db, job.job_id, "completed",
+                    error=f"Stopped early: {empty_batches} consecutive batches produced only duplicates"
+                )
+                return
+
+        self._finish(db, job.job_id, "completed")
+
+    def _heartbeat(self, db: Session, job: GenerationJob):
+        job.heartbeat_at = _utcnow()
+        db.commit()
+
+    def _finish(self, db: Session, job_id: int, status: str, error: Optional[str] = None):
+        job = db.get(GenerationJob, job_id)
+        if not job:
+            return
+        job.status = status
+        job.error = error
+        job.finished_at = _utcnow()
+        job.heartbeat_at = job.finished_at
+        db.commit()
+        logger.info(
+            f"✅ Generation job {job_id} {status}: {job.stored_count}/{job.target_count} stored "
+            f"in {job.gemini_calls} Gemini calls"
+        )
+
+
+# Global instance
+generation_job_runner = GenerationJobRunner(workers=settings.GENERATION_JOB_WORKERS)
@@ -0,0 +1,148 @@
+"""
+Generation Pipeline - Over-generate-and-filter stage
+Takes K candidate texts from one Gemini call, encodes them in one batch,
+and keeps the largest subset that is unique within the batch AND
+against the bank, using one similarity matrix and one vector DB query.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+import numpy as np
+from app.database.chroma_db import chroma_db
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Case/whitespace-insensitive key for exact duplicate detection"""
+    return " ".join(text.lower().split())
+
+
+def select_unique(
+        embeddings: np.ndarray,
+        threshold: float,
+        excluded: Optional[np.ndarray] = None
+) -> List[int]:
+    """
+    Maximal subset of rows whose pairwise cosine similarity stays below threshold
+
+    Builds the K x K similarity matrix in one matrix product, then picks
+    candidates greedily by fewest conflicts (min-degree greedy), which keeps
+    more items than first-come-first-kept when duplicates cluster.
+
+    Args:
+        embeddings: (K, d) normalized embeddings
+        threshold: Similarity at or above which two candidates are duplicates
+        excluded: Optional (K,) bool mask of candidates that must be dropped
+
+    Returns:
+        Indices of kept rows, in ascending order
+    """
+    count = len(embeddings)
+    if count == 0:
+        return []
+
+    conflicts = (embeddings @ embeddings.T) >= threshold
+    np.fill_diagonal(conflicts, False)
+
+    alive = np.ones(count, dtype=bool) if excluded is None else ~excluded
+    kept = []
+    while alive.any():
+        degrees = np.where(alive, (conflicts & alive).sum(axis=1), count + 1)
+        pick = int(np.argmin(degrees))  # argmin breaks ties by original order
+        kept.append(pick)
+        alive[pick] = False
+        alive &= ~conflicts[pick]
+
+    return sorted(kept)
+
+
+def filter_candidates(
+        texts: List[str],
+        threshold: float,
+        exact_in_bank: Optional[List[bool]] = None
+) -> Dict:
+    """
+    Deduplicate K candidate texts within the batch and against the bank
+
+    Args:
+        texts: Candidate question texts
+        threshold: Similarity at or above which two questions are duplicates
+        exact_in_bank: Optional per-text flags from the bank's hash index;
+                       flagged texts are dropped without being encoded
+
+    Returns:
+        {
+            "kept": indices into texts that survived,
+            "embeddings": (K, d) array of candidate embeddings (zeros for texts never encoded),
+            "stats": counts per drop reason
+        }
+    """
+    # 1. Exact duplicates inside the batch / already in the bank
+    first_seen = {}
+    exact_duplicate = np.zeros(len(texts), dtype=bool)
+    for i, text in enumerate(texts):
+        key = normalize_text(text)
+        if key in first_seen:
+            exact_duplicate[i] = True
+        else:
+            first_seen[key] = i
+    bank_duplicate = np.array(exact_in_bank, dtype=bool) if exact_in_bank is not None \
+        else np.zeros(len(texts), dtype=bool)
+    bank_duplicate &= ~exact_duplicate
+
+    # 2. One batched encode + one vector DB round trip for the remaining candidates
+    to_encode = np.flatnonzero(~(exact_duplicate | bank_duplicate))
+    encoded = np.asarray(chroma_db.generate_embeddings([texts[i] for i in to_encode]), dtype=np.float32)
+    embeddings = np.zeros((len(texts), encoded.shape[1] if len(encoded) else 0), dtype=np.float32)
+    if len(to_encode):
+        embeddings[to_encode] = encoded
+        nearest = chroma_db.nearest_questions(encoded.tolist())
+        similarity = np.array([n['similarity'] if n else 0.0 for n in nearest], dtype=np.float32)
+        bank_duplicate[to_encode] = similarity >= threshold
+
+    # 3. Maximal unique subset of what is left
+    kept = select_unique(embeddings, threshold, excluded=exact_duplicate | bank_duplicate)
+
+    stats = {
+        "candidates": len(texts),
+        "exact_duplicates": int(exact_duplicate.sum()),
+        "bank_duplicates": int(bank_duplicate.sum()),
+        "intra_batch_duplicates": int(len(texts) - len(kept) - (exact_duplicate | bank_duplicate).sum()),
+        "unique": len(kept)
+    }
+    return {"kept": kept, "embeddings": embeddings, "stats": stats}
+
+
+class GenerationYieldTracker:
+    """Per question type yield of Gemini batch calls (to tune K)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = defaultdict(lambda: defaultdict(int))
+
+    def record(self, question_type: str, stats: Dict, stored: int):
+        with self._lock:
+            totals = self._totals[question_type]
+            totals["gemini_calls"] += 1
+            totals["stored"] += stored
+            for key, value in stats.items():
+                totals[key] += value
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            report = {}
+            for question_type, totals in self._totals.items():
+                calls = totals["gemini_calls"]
+                candidates = totals["candidates"]
+                report[question_type] = {
+                    **totals,
+                    "yield_per_call": round(totals["stored"] / calls, 2) if calls else 0.0,
+                    "yield_per_candidate": round(totals["stored"] / candidates, 3) if candidates else 0.0
+                }
+            return report
+
+
+generation_yield = GenerationYieldTracker()
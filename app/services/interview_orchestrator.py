@@ -1,14 +1,190 @@
+from sqlalchemy import inspect, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from app.database.models import Interview, InterviewQuestion, UserAnswer, GlobalQuestion
+from app.database.models import InterviewQuestion, InterviewPlanSlot, UserAnswer, GlobalQuestion
+from app.database.postgres_db import SessionLocal
 from app.services.question_service import QuestionService
 from app.services.gemini_service import GeminiService
+from app.services.rate_limiter import RateLimitExceeded
+from app.services.latency_tracker import gemini_latency
+from app.services.mandatory_roster import mandatory_roster
+from app.services.exposure_sampler import exposure_sampler
+from app.services.question_prefetch import question_prefetcher
+from app.services.answer_scoring import answer_scorer
+from app.services.seen_questions import SeenQuestionService, SeenFilter, TRACKED_QUESTION_TYPES
+from app.services.interview_session import (
+    interview_sessions, InterviewSession, PlanSlot, PLAN_READY, PLAN_PENDING, PLAN_FAILED
+)
 from app.database.chroma_db import chroma_db
-from sentence_transformers import SentenceTransformer
+from app.config import get_settings
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from collections import Counter
+from functools import partial
 import logging
-from sqlalchemy import func
+import threading
+import time
+from typing import Iterator, Optional, Union
 import numpy as np
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+TOTAL_QUESTIONS = 12
+
+# Question types whose generated questions are kept in the bank
+REUSABLE_QUESTION_TYPES = ["hr", "technical"]
+
+# Profile-match similarity: first try / retries (and planned bank slots)
+STRICT_MATCH_THRESHOLD = 0.75
+RELAXED_MATCH_THRESHOLD = 0.6
+
+# Extra Chroma hits fetched to make up for the ones the user has already seen
+SEEN_OVERFETCH = 20
+
+# Hedged AI generations may outlive the request that started them
+_hedge_executor = ThreadPoolExecutor(
+    max_workers=settings.QUESTION_HEDGE_WORKERS,
+    thread_name_prefix="question-hedge"
+)
+
+# Planned AI slots are generated while the candidate answers the earlier ones
+_plan_executor = ThreadPoolExecutor(
+    max_workers=settings.INTERVIEW_PLAN_WORKERS,
+    thread_name_prefix="interview-plan"
+)
+
+
+class SelectionMetrics:
+    """Process-wide counters for question selection"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = Counter()
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        counters["gemini_latency"] = gemini_latency.snapshot()
+        return counters
+
+
+selection_metrics = SelectionMetrics()
+
+
+class _StaleSession(Exception):
+    """The slot was already asked and answered through another worker (the session is re-hydrated)"""
+
+
+def check_stale_session_protection(db: Session) -> bool:
+    """
+    True if interview_questions has uq_interview_order
+    Without it a stale session silently records a second row for a slot instead of re-hydrating.
+    """
+    constraints = inspect(db.get_bind()).get_unique_constraints(InterviewQuestion.__tablename__)
+    if any(constraint["name"] == "uq_interview_order" for constraint in constraints):
+        return True
+    logger.warning(
+        "⚠ interview_questions has no uq_interview_order constraint: stale-session protection is OFF "
+        "(run python -m app.scripts.migrate_add_interview_order_unique)"
+    )
+    return False
+
+
+def _enrich_bank_from_hedge(qtype: str, industry: str, job_role: str, future):
+    """Store a generation that finished after its request was served from the bank"""
+    if future.cancelled() or future.exception() is not None:
+        logger.warning(f"Background {qtype} generation failed: {future.exception() if not future.cancelled() else 'cancelled'}")
+        return
+
+    question_text = future.result()
+    db = SessionLocal()
+    try:
+        if QuestionService.get_question_by_hash(db, question_text):
+            logger.info(f"Background {qtype} generation is an exact duplicate, dropped")
+            return
+        embedding = chroma_db.generate_embedding(question_text)
+        if QuestionService.check_question_similarity(question_text, qtype, embedding=embedding):
+            logger.info(f"Background {qtype} generation duplicates the bank, dropped")
+            return
+        QuestionService.store_question(
+            db, question_text, qtype, industry, job_role=job_role, embedding=embedding
+        )
+        selection_metrics.incr("background_stored")
+        logger.info(f"💾 Background {qtype} generation stored for {job_role}")
+    except Exception as e:
+        logger.error(f"Error storing background {qtype} generation: {e}")
+    finally:
+        db.close()
+
+
+def _generate_plan_slot(interview_id: int, order: int, slot: PlanSlot, user, job_role: str,
+                        fallback_id: Optional[int]) -> Optional[int]:
+    """Planned AI slot: generate + store, then mark the slot ready (bank fallback, else failed)"""
+    db = SessionLocal()
+    try:
+        source = "ai"
+        try:
+            orchestrator = InterviewOrchestrator(db)
+            prompt = orchestrator.gemini_service.prompt_for_type(slot.question_type, user)
+            question_text = orchestrator.gemini_service.generate_question(prompt)
+            question_id = orchestrator._store_generated_question(
+                user, slot.question_type, job_role, question_text
+            ).question_id
+        except Exception as e:
+            db.rollback()
+            selection_metrics.incr("ai_errors")
+            logger.warning(f"Planned {slot.question_type} generation for interview {interview_id} slot {order} failed: {e}")
+            question_id, source = fallback_id, "bank"
+
+        status = PLAN_READY if question_id is not None else PLAN_FAILED
+        db.execute(
+            update(InterviewPlanSlot)
+            .where(InterviewPlanSlot.interview_id == interview_id, InterviewPlanSlot.order_number == order)
+            .values(question_id=question_id, source=source, status=status)
+        )
+        db.commit()
+        interview_sessions.fill_plan_slot(slot, question_id, status)
+        return question_id
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error filling plan slot {order} of interview {interview_id}: {e}")
+        interview_sessions.fill_plan_slot(slot, None, PLAN_FAILED)
+        return None
+    finally:
+        db.close()
+
+
+def _prefetch_question(session: InterviewSession, order: int) -> Union[int, str]:
+    """
+    Speculative live selection of the next slot (own DB session)
+    Returns the question id, or for personalized types only the generated text: their temp
+    row is created when the prefetch is served, so a discarded prefetch leaves no orphan row.
+    """
+    db = SessionLocal()
+    try:
+        orchestrator = InterviewOrchestrator(db)
+        qtype = orchestrator._get_question_type(order)
+        if qtype not in REUSABLE_QUESTION_TYPES:
+            prompt = orchestrator.gemini_service.prompt_for_type(qtype, session.user)
+            return orchestrator.gemini_service.generate_question(
+                prompt, blocking=False, timeout=settings.GEMINI_REQUEST_TIMEOUT_SECONDS
+            )
+
+        question = orchestrator._get_personalized_question(
+            session.user,
+            qtype,
+            order,
+            orchestrator._get_user_profile_embedding(session),
+            orchestrator._deadline(None),
+            seen=session.seen
+        )
+        return question.question_id
+    finally:
+        db.close()
 
 
 class InterviewOrchestrator:
@@ -17,71 +193,338 @@ class InterviewOrchestrator:
         self.question_service = QuestionService()
         self.gemini_service = GeminiService()
         self.chroma = chroma_db
-        self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
 
-    def get_next_question(self, interview_id: int) -> dict:
-        """Core orchestrator with hybrid DB/AI + Chroma personalization"""
-        interview = (
-            self.db.query(Interview)
-            .filter(Interview.interview_id == interview_id)
-            .first()
-        )
-        if not interview:
-            raise ValueError(f"Interview {interview_id} not found")
-
-        # Count how many answers exist for this interview
-        total_asked_count = (
-                self.db.query(func.count(InterviewQuestion.id))
-                .filter(InterviewQuestion.interview_id == interview_id)
-                .scalar() or 0
-        )
-        answered_count = (
-                self.db.query(func.count(UserAnswer.id))
-                .filter(UserAnswer.interview_id == interview_id)
-                .scalar() or 0
-        )
+    @staticmethod
+    def _deadline(deadline_ms: Optional[int]) -> float:
+        """Absolute monotonic deadline for one get_next_question call"""
+        budget_ms = deadline_ms if deadline_ms is not None else settings.QUESTION_DEADLINE_MS
+        return time.monotonic() + budget_ms / 1000.0
 
-        total_target = 12
-        logger.info(f"interview_id={interview_id} answered={answered_count}/{total_target}")
+    def _next_slot(self, interview_id: int):
+        """Session state (cached) and the next order number (None when complete)"""
+        session = interview_sessions.get(self.db, interview_id)
 
-        if total_asked_count >= total_target:
-            return {"status": "complete", "message": "Interview finished"}
+        logger.info(f"interview_id={interview_id} answered={session.answered_count}/{TOTAL_QUESTIONS}")
 
-        next_order = total_asked_count+ 1
-        question_type = self._get_question_type(next_order)
+        if session.asked_count >= TOTAL_QUESTIONS:
+            return session, None
 
-        # Embed user profile for Chroma matching
-        user_profile_embedding = self._get_user_profile_embedding(interview.user_id)
+        return session, session.next_order
 
-        question = self._get_personalized_question(
-            interview.user_id, question_type, next_order, user_profile_embedding
-        )
-
-        # Create InterviewQuestion row
+    def _record_question(self, session: InterviewSession, question, question_type: str, next_order: int) -> dict:
+        """Create the InterviewQuestion row (the step's one write) and build the API payload"""
         interview_question = InterviewQuestion(
-            interview_id=interview_id,
+            interview_id=session.interview_id,
             question_id=question.question_id,  # ✅ correct FK
             order_index=next_order ,  # 0-based index
             question_type=question_type,
             subcategory=question.subcategory if hasattr(question, "subcategory") else None,
         )
         self.db.add(interview_question)
+        try:
+            self.db.flush()  # id from the INSERT itself, no refresh SELECT after commit
+        except IntegrityError:
+            self.db.rollback()
+            recorded = self._recorded_question(session.interview_id, next_order)
+            if recorded is None:
+                raise
+            return recorded
+        interview_question_id = interview_question.id
+        if question_type in TRACKED_QUESTION_TYPES:
+            SeenQuestionService.record(self.db, session.user_id, session.seen, [question.question_id])
         self.db.commit()
-        self.db.refresh(interview_question)
+        interview_sessions.record_question(session, interview_question_id, question.question_id)
+        self.question_service.increment_usage_count(self.db, question.question_id)
 
         logger.info(
-            f"interview_id={interview_id} order={next_order} "
+            f"interview_id={session.interview_id} order={next_order} "
             f"type={question_type} qid={question.question_id}"
         )
+        return self._question_payload(interview_question_id, question, question_type, next_order)
+
+    def _recorded_question(self, interview_id: int, order: int) -> Optional[dict]:
+        """
+        The slot already has a row (uq_interview_order): it was asked through another worker
+        Re-hydrates the session; the recorded question is served again while it is unanswered,
+        otherwise _StaleSession tells the caller to select the real next slot. None if the slot is free.
+        """
+        row = (
+            self.db.query(InterviewQuestion, GlobalQuestion)
+            .join(GlobalQuestion, GlobalQuestion.question_id == InterviewQuestion.question_id)
+            .filter(InterviewQuestion.interview_id == interview_id, InterviewQuestion.order_index == order)
+            .first()
+        )
+        if row is None:
+            return None
+        interview_question, question = row
+        interview_sessions.drop(interview_id)
+        session = interview_sessions.get(self.db, interview_id)
+        selection_metrics.incr("stale_sessions")
+        logger.warning(f"interview_id={interview_id} slot {order} was recorded by another worker, session re-hydrated")
+        if interview_question.id in session.answered_iq_ids:
+            raise _StaleSession(f"interview_id={interview_id} slot {order} already answered")
+        return self._question_payload(interview_question.id, question, interview_question.question_type, order)
+
+    @staticmethod
+    def _question_payload(interview_question_id: int, question, question_type: str, order: int) -> dict:
         return {
-            "interview_question_id": interview_question.id,  # PK in interview_questions
+            "interview_question_id": interview_question_id,  # PK in interview_questions
             "global_question_id": question.question_id,  # FK to global_questions
             "question_text": question.question_text,
             "question_type": question_type,
-            "order_number": next_order,
+            "order_number": order,
             "difficulty": getattr(question, "difficulty", "medium"),
             "from_db": getattr(question, "is_static", True),
         }
+
+    def get_next_question(self, interview_id: int, deadline_ms: Optional[int] = None) -> dict:
+        """
+        Core orchestrator with hybrid DB/AI + Chroma personalization
+        deadline_ms overrides settings.QUESTION_DEADLINE_MS for this call
+        """
+        deadline = self._deadline(deadline_ms)
+        try:
+            return self._next_question(interview_id, deadline)
+        except _StaleSession:
+            return self._next_question(interview_id, deadline)  # re-hydrated: the real next slot
+
+    def _next_question(self, interview_id: int, deadline: float) -> dict:
+        session, next_order = self._next_slot(interview_id)
+        if next_order is None:
+            return {"status": "complete", "message": "Interview finished"}
+
+        question_type = self._get_question_type(next_order)
+
+        # Planned interview: just reveal the slot; otherwise take the prefetched selection
+        question = self._planned_question(session, next_order, deadline) or self._prefetched_question(
+            session, next_order, deadline
+        )
+        if question is not None:
+            return self._record_question(session, question, question_type, next_order)
+
+        # Embed user profile for Chroma matching (once per session)
+        user_profile_embedding = self._get_user_profile_embedding(session)
+
+        question = self._get_personalized_question(
+            session.user, question_type, next_order, user_profile_embedding, deadline, seen=session.seen
+        )
+        return self._record_question(session, question, question_type, next_order)
+
+    def stream_next_question(self, interview_id: int, deadline_ms: Optional[int] = None) -> Iterator[dict]:
+        """
+        Streaming variant of get_next_question.
+
+        Yields events: "meta" (slot info), "token" (AI text as it arrives),
+        then "question" with the stored question. When the streamed text is a
+        near duplicate of a bank question, the bank question is used and its
+        canonical text is sent in the final "question" event.
+        """
+        deadline = self._deadline(deadline_ms)
+        try:
+            yield from self._stream_question(interview_id, deadline)
+        except _StaleSession:
+            yield from self._stream_question(interview_id, deadline)  # re-hydrated: the real next slot
+
+    def _stream_question(self, interview_id: int, deadline: float) -> Iterator[dict]:
+        session, next_order = self._next_slot(interview_id)
+        if next_order is None:
+            yield {"event": "complete", "data": {"status": "complete", "message": "Interview finished"}}
+            return
+
+        question_type = self._get_question_type(next_order)
+        yield {"event": "meta", "data": {"order_number": next_order, "question_type": question_type}}
+
+        question = self._planned_question(session, next_order, deadline) or self._prefetched_question(
+            session, next_order, deadline
+        )
+        if question is not None:
+            yield {"event": "question", "data": self._record_question(session, question, question_type, next_order)}
+            return
+
+        user = session.user
+        user_profile_embedding = self._get_user_profile_embedding(session)
+
+        question = None
+        if question_type != "introductory":
+            job_role = getattr(user, 'job_role', 'Software Engineer')
+
+            question = self._profile_match(question_type, job_role, user_profile_embedding, seen=session.seen)
+            if question is None and np.random.random() < self._ai_ratio(question_type, job_role):
+                chunks = []
+                try:
+                    for chunk in self.gemini_service.stream_question_for_type(
+                            question_type, user, blocking=False
+                    ):
+                        chunks.append(chunk)
+                        yield {"event": "token", "data": {"text": chunk}}
+                except RateLimitExceeded as e:
+                    logger.warning(f"⏳ Gemini quota exhausted, falling back to bank: {e}")
+
+                question_text = "".join(chunks).strip()
+                if question_text:
+                    question = self._store_generated_question(user, question_type, job_role, question_text)
+
+        if question is None:
+            question = self._get_personalized_question(
+                user, question_type, next_order, user_profile_embedding, deadline, seen=session.seen
+            )
+
+        yield {"event": "question", "data": self._record_question(session, question, question_type, next_order)}
+
+    # ------------------------------------------------------------
+    # Planning mode
+    # ------------------------------------------------------------
+
+    def plan_interview(self, interview_id: int) -> dict:
+        """
+        Pick every remaining slot up front and persist the plan (idempotent)
+        One profile embedding, one Chroma query per bank type and the per-type AI
+        ratios decide each slot with the same rules as the live selection; AI
+        slots are generated in parallel on _plan_executor and filled in later.
+        """
+        started = time.monotonic()
+        session = interview_sessions.get(self.db, interview_id)
+        if session.plan:
+            return self._plan_summary(session)
+
+        user = session.user
+        job_role = getattr(user, 'job_role', 'Software Engineer')
+        types = {order: self._get_question_type(order) for order in range(session.next_order, TOTAL_QUESTIONS + 1)}
+        bank_types = sorted({qtype for qtype in types.values() if qtype in REUSABLE_QUESTION_TYPES})
+
+        hits = {}
+        if bank_types:
+            hits = self.chroma.query_profile_candidates(
+                self._get_user_profile_embedding(session).tolist(),
+                bank_types,
+                job_role=job_role,
+                limit_per_type=(settings.INTERVIEW_PLAN_CANDIDATES_PER_TYPE
+                                + min(len(session.seen), SEEN_OVERFETCH))
+            )
+        ai_ratios = {qtype: self._ai_ratio(qtype, job_role) for qtype in bank_types}
+
+        taken = set(session.asked_question_ids)
+        rows, plan, generations = [], {}, []
+        for order, qtype in types.items():
+            question_id, source, fallback_id = None, "ai", None
+            if qtype == "introductory":
+                question_id, source = mandatory_roster.get(self.db, order).question_id, "roster"
+            elif qtype in REUSABLE_QUESTION_TYPES:
+                free = [
+                    hit for hit in hits.get(qtype, [])
+                    if hit['question_id'] not in taken and hit['question_id'] not in session.seen
+                ]
+                strong = [hit['question_id'] for hit in free if hit['similarity'] >= STRICT_MATCH_THRESHOLD]
+                relaxed = [hit['question_id'] for hit in free if hit['similarity'] >= RELAXED_MATCH_THRESHOLD]
+                if strong:
+                    question_id, source = exposure_sampler.choose(strong), "bank"
+                elif relaxed and np.random.random() >= ai_ratios[qtype]:
+                    question_id, source = relaxed[0], "bank"
+                else:
+                    # Generated in the background; the closest free hit (or any of the type) if that fails
+                    fallback_id = free[0]['question_id'] if free else exposure_sampler.sample(
+                        self.db, exclude_ids=taken, seen=session.seen, question_type=qtype, job_role=job_role
+                    )
+
+            status = PLAN_READY if question_id is not None else PLAN_PENDING
+            if question_id is not None:
+                taken.add(question_id)
+            plan[order] = PlanSlot(qtype, question_id, status)
+            rows.append(InterviewPlanSlot(
+                interview_id=interview_id, order_number=order, question_type=qtype,
+                question_id=question_id, source=source, status=status
+            ))
+            if status == PLAN_PENDING:
+                generations.append((order, fallback_id))
+
+        self.db.add_all(rows)
+        self.db.commit()
+
+        for order, fallback_id in generations:
+            slot = plan[order]
+            slot.future = _plan_executor.submit(
+                _generate_plan_slot, interview_id, order, slot, user, job_role, fallback_id
+            )
+        interview_sessions.set_plan(session, plan)
+        selection_metrics.incr("planned_interviews")
+
+        summary = self._plan_summary(session)
+        logger.info(
+            f"🗺️ interview_id={interview_id} planned in {(time.monotonic() - started) * 1000:.0f}ms: {summary}"
+        )
+        return summary
+
+    @staticmethod
+    def _plan_summary(session: InterviewSession) -> dict:
+        statuses = Counter(slot.status for slot in session.plan.values())
+        return {
+            "slots": len(session.plan),
+            **{status: statuses.get(status, 0) for status in (PLAN_READY, PLAN_PENDING, PLAN_FAILED)}
+        }
+
+    def _planned_question(self, session: InterviewSession, order: int, deadline: float):
+        """Question planned for this slot (waits for its generation until the deadline), or None"""
+        slot = session.plan.get(order)
+        if slot is None:
+            return None
+
+        if slot.status == PLAN_PENDING:
+            if slot.future is not None:
+                try:
+                    slot.future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except FutureTimeout:
+                    logger.info(f"⏱️ Planned {slot.question_type} slot {order} still generating, selecting live")
+                except Exception as e:
+                    logger.warning(f"Planned slot {order} failed: {e}")
+            else:  # planned by another process, or before this session was re-hydrated
+                row = (
+                    self.db.query(InterviewPlanSlot.question_id, InterviewPlanSlot.status)
+                    .filter(InterviewPlanSlot.interview_id == session.interview_id,
+                            InterviewPlanSlot.order_number == order)
+                    .first()
+                )
+                if row is not None:
+                    interview_sessions.fill_plan_slot(slot, row.question_id, row.status)
+
+        question = None
+        if slot.status == PLAN_READY and slot.question_id not in session.asked_question_ids:
+            question = self.question_service.get_question_by_id(self.db, slot.question_id)
+        selection_metrics.incr("plan_hits" if question is not None else "plan_misses")
+        return question
+
+    # ------------------------------------------------------------
+    # Speculative prefetch (unplanned slots)
+    # ------------------------------------------------------------
+
+    def _schedule_prefetch(self, session: InterviewSession):
+        """Start selecting the next slot while the candidate reads (skips planned and roster slots)"""
+        order = session.next_order
+        if not settings.QUESTION_PREFETCH_ENABLED or order > TOTAL_QUESTIONS:
+            return
+        slot = session.plan.get(order)
+        if slot is not None and slot.status != PLAN_FAILED:
+            return  # already picked, or generating on the plan executor
+        if self._get_question_type(order) == "introductory":
+            return  # roster lookup is O(1) anyway
+        question_prefetcher.schedule(session.interview_id, order, partial(_prefetch_question, session, order))
+
+    def _prefetched_question(self, session: InterviewSession, order: int, deadline: float):
+        """Question prefetched for this slot (waits for it until the deadline), or None"""
+        prefetched = question_prefetcher.take(session.interview_id, order, deadline - time.monotonic())
+        if prefetched is None:
+            return None
+        question = None
+        if isinstance(prefetched, str):  # personalized text: its temp row is created only now
+            if prefetched.strip():
+                job_role = getattr(session.user, 'job_role', 'Software Engineer')
+                question = self._store_generated_question(
+                    session.user, self._get_question_type(order), job_role, prefetched.strip()
+                )
+        elif prefetched not in session.asked_question_ids:
+            question = self.question_service.get_question_by_id(self.db, prefetched)
+        question_prefetcher.record("hits" if question is not None else "misses")
+        return question
+
     # def get_next_question(self, interview_id: int) -> dict:
     #     """Core orchestrator with hybrid DB/AI + Chroma personalization"""
     #     interview = (
@@ -155,7 +598,7 @@ class InterviewOrchestrator:
 
     def _get_question_type(self, order_number: int) -> str:
         """Phase progression"""
-        if order_number <= 3:
+        if order_number <= settings.INTRODUCTORY_PHASE_LENGTH:
             return "introductory"
         elif order_number <= 6:
             return "hr"
@@ -164,9 +607,11 @@ class InterviewOrchestrator:
         else:
             return "experience"
 
-    def _get_user_profile_embedding(self, user_id: int) -> np.ndarray:
-        """EMBED USER PROFILE for Chroma matching"""
-        user = self.question_service.get_user_profile(self.db,user_id)
+    def _get_user_profile_embedding(self, session: InterviewSession) -> np.ndarray:
+        """EMBED USER PROFILE for Chroma matching (computed once, kept on the session)"""
+        if session.profile_embedding is not None:
+            return session.profile_embedding
+        user, user_id = session.user, session.user_id
 
         # Combine profile fields for semantic matching
         profile_text = f"{user.industry} {user.bio or ''} {user.job_role or ''} {' '.join(user.skills or [])}"
@@ -176,84 +621,234 @@ class InterviewOrchestrator:
         if not profile_text.strip():
             profile_text = f"{user.industry} software engineer"  # Fallback
 
-        embedding = self.embedder.encode(profile_text)
+        # Shared (normalized) model from the vector store instead of a per-request copy
+        embedding = np.asarray(self.chroma.generate_embedding(profile_text))
         logger.info(f"user_id={user_id} profile_embedding created: {len(embedding)}-dim")
+        session.profile_embedding = embedding
         return embedding
 
-    def _get_personalized_question(self, user_id: int, qtype: str, order_num: int,
-                                   user_embedding: np.ndarray) -> GlobalQuestion:
-        """🎯 CORRECTED: Chroma-first → Job_role thresholds → Smart storage"""
-
-        if qtype == "introductory":
-            return self.question_service.get_mandatory_questions(self.db)[(order_num - 1) ]
-
-        user = self.question_service.get_user_profile(self.db,user_id)
-        job_role = getattr(user, 'job_role', 'Software Engineer')  # From user profile
-
-        # 1. ✅ PRIORITY: CHROMA - Semantic profile matching (ALWAYS FIRST)
+    def _profile_match(self, qtype: str, job_role: str, user_embedding: np.ndarray,
+                       limit: int = 3, threshold: float = STRICT_MATCH_THRESHOLD,
+                       seen: Optional[SeenFilter] = None):
+        """Best bank question for the profile embedding the user has not seen yet, or None"""
+        overfetch = min(len(seen), SEEN_OVERFETCH) if seen is not None else 0
         chroma_questions = self.chroma.query_similar_questions(
-            user_embedding.tolist(
-            ),
+            np.asarray(user_embedding).tolist(),
             question_type=qtype,
             job_role=job_role,  # Filter by job_role too
-            limit=3,
-            threshold=0.75
+            limit=limit + overfetch,
+            threshold=threshold
         )
-
-        if chroma_questions:
-            logger.info(f"✅ Chroma hit: {len(chroma_questions)} {qtype} for {job_role}")
-            return chroma_questions[0].payload
-
-        # 2. ✅ DYNAMIC THRESHOLDS: Job_role specific counts
+        if overfetch:
+            unseen = [hit for hit in chroma_questions if int(hit['question_id']) not in seen][:limit]
+            if len(unseen) < len(chroma_questions):
+                selection_metrics.incr("seen_skipped", len(chroma_questions) - len(unseen))
+            chroma_questions = unseen
+        if not chroma_questions:
+            return None
+
+        logger.info(f"✅ Chroma hit: {len(chroma_questions)} {qtype} for {job_role}")
+        # One cached lookup for all hits; skips vectors whose row no longer exists
+        questions = self.question_service.get_questions_by_ids(
+            self.db, [q['question_id'] for q in chroma_questions]
+        )
+        candidate_ids = [int(hit['question_id']) for hit in chroma_questions if int(hit['question_id']) in questions]
+        if not candidate_ids:
+            return None
+        # Every hit cleared the threshold: spread usage instead of always serving the top one
+        return questions[exposure_sampler.choose(candidate_ids)]
+
+    def _ai_ratio(self, qtype: str, job_role: str) -> float:
+        """Share of AI generation for this type, based on job_role specific counts"""
         job_role_count = self.question_service.get_question_count_by_type_jobrole(self.db,qtype, job_role)
 
         logger.info(f"📊 {qtype} questions for '{job_role}': {job_role_count}")
 
         # 🎯 YOUR EXACT STRATEGY:
         if job_role_count < 20:
-            ai_ratio = 0.7  # 70% AI
+            return 0.7  # 70% AI
         elif job_role_count <= 50:
-            ai_ratio = 0.4  # 40% AI
+            return 0.4  # 40% AI
         else:
-            ai_ratio = 0.2  # 20% AI
-
-        if np.random.random() < ai_ratio:
-            # 3. ✅ SMART AI GENERATION + SELECTIVE STORAGE
-            question_text = self.gemini_service.generate_question_for_type(qtype, user)
-
-            # 🚀 STORE IN CHROMA ONLY FOR REUSABLE TYPES
-            if qtype in ["hr", "technical"]:
-                # Reusable across interviews → Store permanently
-                new_question = self.question_service.store_question(
-                    self.db,
-                    question_text, qtype, user.industry,
-                    job_role=job_role,  # Tag with job_role
-                    is_reusable=True
-                )
-                logger.info(f"💾 Stored reusable {qtype} question for {job_role}")
-                return new_question
-            else:  # experience/project - personalized, no storage
-                # Create temp question (not stored in Chroma)
-                temp_question = self.question_service.create_temp_question(
-                    self.db,question_text, qtype, user_id
+            return 0.2  # 20% AI
+
+    def _store_generated_question(self, user, qtype: str, job_role: str, question_text: str):
+        """Deduplicate + store AI text (reusable types go to the bank, others are temp)"""
+        # 🚀 STORE IN CHROMA ONLY FOR REUSABLE TYPES
+        if qtype in REUSABLE_QUESTION_TYPES:
+            existing = self.question_service.get_question_by_hash(self.db, question_text)
+            if existing:
+                logger.info(f"♻️ Generated {qtype} question is an exact duplicate of ID {existing.question_id}, reusing it")
+                return existing
+
+            # Encode once: the same vector serves the similarity check and the insert
+            embedding = self.chroma.generate_embedding(question_text)
+            similar = self.question_service.check_question_similarity(
+                question_text, qtype, embedding=embedding
+            )
+            if similar:
+                logger.info(f"♻️ Generated {qtype} question duplicates ID {similar[0]['question_id']}, reusing it")
+                existing = self.question_service.get_question_by_id(self.db, similar[0]['question_id'])
+                if existing:
+                    return existing
+
+            # Reusable across interviews → Store permanently
+            new_question = self.question_service.store_question(
+                self.db,
+                question_text, qtype, user.industry,
+                job_role=job_role,  # Tag with job_role
+                is_reusable=True,
+                embedding=embedding
+            )
+            logger.info(f"💾 Stored reusable {qtype} question for {job_role}")
+            return new_question
+        else:  # experience/project - personalized, no storage
+            # Create temp question (not stored in Chroma)
+            temp_question = self.question_service.create_temp_question(
+                self.db,question_text, qtype, user.id
+            )
+            logger.info(f"🌪️ Temp {qtype} question (not stored)")
+            return temp_question
+
+    def _best_bank_candidate(self, qtype: str, job_role: str, user_embedding: np.ndarray,
+                             seen: Optional[SeenFilter] = None):
+        """Closest unseen bank question of this type regardless of threshold (role first, then any role)"""
+        question = self._profile_match(qtype, job_role, user_embedding, limit=1, threshold=0.0, seen=seen)
+        if question is None:
+            question = self._profile_match(qtype, None, user_embedding, limit=1, threshold=0.0, seen=seen)
+        return question
+
+    def _bank_fallback(self, qtype: str, job_role: str, seen: Optional[SeenFilter] = None):
+        """Usage-balanced bank question of this type from the in-memory snapshot (role first, then any role)"""
+        if qtype not in REUSABLE_QUESTION_TYPES:
+            return None  # personalized rows belong to other users
+        for role in (job_role, None):
+            picked = exposure_sampler.sample(self.db, seen=seen, question_type=qtype, job_role=role)
+            if picked is not None:
+                return self.question_service.get_question_by_id(self.db, picked)
+        return None
+
+    def _hedged_generation(self, user, qtype: str, job_role: str,
+                           user_embedding: np.ndarray, deadline: float,
+                           seen: Optional[SeenFilter] = None):
+        """
+        Generate with Gemini in the background and wait at most its p95 budget.
+        If the call is slower, or there is no free quota right now, serve the
+        best bank candidate and let a running generation finish in the
+        background to enrich the bank. The HTTP call itself times out with the
+        request deadline (capped at GEMINI_REQUEST_TIMEOUT_SECONDS).
+        Returns None when generation failed and the bank had nothing (caller retries).
+        """
+        # Build everything the worker needs now: ORM objects must not cross threads
+        prompt = self.gemini_service.prompt_for_type(qtype, user)
+        industry = user.industry
+        remaining = max(0.0, deadline - time.monotonic())
+        request_timeout = min(settings.GEMINI_REQUEST_TIMEOUT_SECONDS, max(remaining, 1.0))
+        future = _hedge_executor.submit(partial(
+            self.gemini_service.generate_question, prompt, blocking=False, timeout=request_timeout
+        ))
+
+        budget = min(gemini_latency.p95(), remaining)
+        try:
+            question_text = future.result(timeout=budget)
+        except FutureTimeout:
+            question_text = None
+        except RateLimitExceeded as e:
+            selection_metrics.incr("quota_fallbacks")
+            logger.warning(f"⏳ Gemini quota exhausted, serving a bank {qtype} question: {e}")
+            return self._best_bank_candidate(qtype, job_role, user_embedding, seen=seen) or self._bank_fallback(
+                qtype, job_role, seen=seen
+            )
+        except Exception as e:
+            selection_metrics.incr("ai_errors")
+            logger.warning(f"AI {qtype} generation failed: {e}")
+            return None
+
+        if question_text is None:
+            candidate = self._best_bank_candidate(qtype, job_role, user_embedding, seen=seen)
+            if candidate is not None:
+                selection_metrics.incr("hedged")
+                logger.info(f"⏱️ AI {qtype} slower than {budget * 1000:.0f}ms, serving bank question {candidate.question_id}")
+                if qtype in REUSABLE_QUESTION_TYPES:
+                    future.add_done_callback(partial(_enrich_bank_from_hedge, qtype, industry, job_role))
+                return candidate
+
+            # Nothing to hedge with: waiting past the deadline beats failing the interview,
+            # but never longer than the HTTP call itself may take
+            try:
+                question_text = future.result(timeout=request_timeout)
+            except Exception as e:
+                selection_metrics.incr("ai_errors")
+                logger.warning(f"AI {qtype} generation failed or timed out: {e!r}")
+                return self._bank_fallback(qtype, job_role, seen=seen)
+            if time.monotonic() > deadline:
+                selection_metrics.incr("deadline_misses")
+
+        return self._store_generated_question(user, qtype, job_role, question_text)
+
+    def _get_personalized_question(self, user, qtype: str, order_num: int,
+                                   user_embedding: np.ndarray,
+                                   deadline: Optional[float] = None,
+                                   seen: Optional[SeenFilter] = None) -> GlobalQuestion:
+        """
+        🎯 Chroma-first → Job_role thresholds → hedged AI generation
+        Bounded retry loop (settings.QUESTION_SELECTION_MAX_ATTEMPTS); every
+        attempt is logged with its elapsed time. Bank questions in seen (the
+        user's earlier interviews and this one) are skipped.
+        """
+
+        if qtype == "introductory":
+            return mandatory_roster.get(self.db, order_num)
+
+        deadline = deadline if deadline is not None else self._deadline(None)
+        started = time.monotonic()
+        job_role = getattr(user, 'job_role', 'Software Engineer')  # From user profile
+
+        # ✅ DYNAMIC THRESHOLDS: Job_role specific counts
+        ai_ratio = self._ai_ratio(qtype, job_role)
+        max_attempts = settings.QUESTION_SELECTION_MAX_ATTEMPTS
+        selection_metrics.incr("selections")
+
+        for attempt in range(1, max_attempts + 1):
+            selection_metrics.incr("attempts")
+
+            # 1. ✅ CHROMA - Semantic profile matching (strict first, relaxed on retries)
+            bank_question = self._profile_match(
+                qtype, job_role, user_embedding,
+                limit=3 if attempt == 1 else 1,
+                threshold=STRICT_MATCH_THRESHOLD if attempt == 1 else RELAXED_MATCH_THRESHOLD,
+                seen=seen
+            )
+            if bank_question is not None:
+                logger.info(
+                    f"attempt {attempt}/{max_attempts}: bank {qtype} question "
+                    f"after {(time.monotonic() - started) * 1000:.0f}ms"
                 )
-                logger.info(f"🌪️ Temp {qtype} question (not stored)")
-                return temp_question
-        else:
-            # 4. FALLBACK: Chroma with lower threshold (not random DB!)
-            fallback_questions = self.chroma.query_similar_questions(
-                user_embedding,
-                question_type=qtype,
-                job_role=job_role,
-                limit=1,
-                threshold=0.6  # Lower threshold for fallback
+                return bank_question
+
+            # 2. ✅ HEDGED AI GENERATION (always tried on the last attempt)
+            if attempt == max_attempts or np.random.random() < ai_ratio:
+                question = self._hedged_generation(user, qtype, job_role, user_embedding, deadline, seen=seen)
+                if question is not None:
+                    logger.info(
+                        f"attempt {attempt}/{max_attempts}: {qtype} question {question.question_id} "
+                        f"after {(time.monotonic() - started) * 1000:.0f}ms"
+                    )
+                    return question
+
+            logger.info(
+                f"🔁 attempt {attempt}/{max_attempts}: no {qtype} question for '{job_role}' "
+                f"after {(time.monotonic() - started) * 1000:.0f}ms"
             )
-            if fallback_questions:
-                logger.info(f"🔄 Chroma fallback hit for {job_role}")
-                return fallback_questions[0].payload
-            else:
-                # Last resort: Generate (will be stored if reusable)
-                return self._get_personalized_question(user_id, qtype, order_num, user_embedding)  # Retry
+
+        # 3. LAST RESORT: any bank question of this type beats failing the interview
+        fallback = self._bank_fallback(qtype, job_role, seen=seen)
+        if fallback is not None:
+            selection_metrics.incr("exhausted_fallbacks")
+            return fallback
+
+        selection_metrics.incr("failures")
+        raise ValueError(f"No {qtype} question available for '{job_role}' after {max_attempts} attempts")
 
     def _calculate_ai_percentage(self, qtype: str, db_count: int) -> float:
         """Dynamic AI generation based on DB size"""
@@ -269,32 +864,39 @@ class InterviewOrchestrator:
         else:
             return 0.7  # 70% AI when DB is small
 
-    def submit_answer(self, interview_question_id: int, answer_text: str):
-        """Store answer"""
-        iq = (
-            self.db.query(InterviewQuestion)
-            .filter(InterviewQuestion.id == interview_question_id)
-            .first()
-        )
-        if not iq:
-            raise ValueError("InterviewQuestion not found")
+    def submit_answer(self, interview_question_id: int, answer_text: str,
+                      interview_id: Optional[int] = None):
+        """Store answer (validated against the session state; the insert is the only query)"""
+        if interview_id is None:
+            interview_id = (
+                self.db.query(InterviewQuestion.interview_id)
+                .filter(InterviewQuestion.id == interview_question_id)
+                .scalar()
+            )
+            if interview_id is None:
+                raise ValueError("InterviewQuestion not found")
 
-        interview = (
-            self.db.query(Interview)
-            .filter(Interview.interview_id == iq.interview_id)
-            .first()
-        )
-        if not interview:
-            raise ValueError("Interview not found for this question")
+        session = interview_sessions.get(self.db, interview_id)
+        if interview_question_id not in session.question_by_iq:
+            # Possibly asked through another worker after this session was hydrated
+            interview_sessions.drop(interview_id)
+            session = interview_sessions.get(self.db, interview_id)
+            if interview_question_id not in session.question_by_iq:
+                raise ValueError("InterviewQuestion not found")
 
         user_answer = UserAnswer(
-            interview_id=iq.interview_id,
-            question_id=iq.id,  # ✅ FK to interview_questions.id
-            user_id=interview.user_id,
+            interview_id=interview_id,
+            question_id=interview_question_id,  # ✅ FK to interview_questions.id
+            user_id=session.user_id,
             answer_text=answer_text,
         )
         self.db.add(user_answer)
+        self.db.flush()
+        answer_id = user_answer.id
         self.db.commit()
+        interview_sessions.record_answer(session, interview_question_id)
+        answer_scorer.enqueue(answer_id, interview_id)
         logger.info(f"✅ Answer stored for interview_question_id={interview_question_id}")
+        self._schedule_prefetch(session)
         return {"status": "success"}
 
@@ -0,0 +1,208 @@
+"""
+Interview Session State - per-interview working set for the orchestrator
+Holds what every get_next_question / submit_answer step needs (interview row
+fields, a detached user profile, its embedding, asked question ids, answer
+count, the precomputed plan, the user's seen-question filter) so a step costs ONE database write instead of 5+
+reads first.
+
+Sessions are hydrated once from PostgreSQL and then updated write-through
+after each committed question/answer insert. Idle sessions expire
+(INTERVIEW_SESSION_TTL_SECONDS) and the store is LRU-bounded; an expired or
+evicted session is simply re-hydrated. A session only sees writes made through
+this process, so the orchestrator also re-hydrates it when the database shows
+it is stale: an unknown interview_question id in submit_answer, or a slot that
+is already taken (uq_interview_order) when recording a question.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.database.models import Interview, InterviewQuestion, InterviewPlanSlot, UserAnswer, User
+from app.services.seen_questions import SeenQuestionService, SeenFilter
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class UserProfileSnapshot:
+    """Detached copy of a User row (column attributes only; safe across sessions and threads)"""
+
+    def __init__(self, user: User):
+        for column in User.__table__.columns:
+            setattr(self, column.key, getattr(user, column.key))
+
+    def __repr__(self):
+        return f"UserProfileSnapshot(id={self.id}, job_role={getattr(self, 'job_role', None)!r})"
+
+
+# Plan slot states (interview_plan_slots.status)
+PLAN_READY = "ready"
+PLAN_PENDING = "pending"  # AI generation queued at /start
+PLAN_FAILED = "failed"  # nothing planned: the slot is selected live
+
+
+class PlanSlot:
+    """One planned slot; future is the in-process generation of a pending slot (None after a re-hydration)"""
+
+    __slots__ = ("question_type", "question_id", "status", "future")
+
+    def __init__(self, question_type: str, question_id: Optional[int], status: str, future=None):
+        self.question_type = question_type
+        self.question_id = question_id
+        self.status = status
+        self.future = future
+
+
+class InterviewSession:
+    """Mutable state of one interview; mutate only through InterviewSessionStore"""
+
+    __slots__ = (
+        "interview_id", "user_id", "status", "user", "profile_embedding",
+        "asked_question_ids", "question_by_iq", "answered_iq_ids", "plan", "seen", "touched_at"
+    )
+
+    def __init__(self, interview: Interview, user: UserProfileSnapshot,
+                 asked: List[tuple], answered_iq_ids: set, plan: Dict[int, PlanSlot], seen: SeenFilter):
+        self.interview_id = interview.interview_id
+        self.user_id = interview.user_id
+        self.status = interview.status
+        self.user = user
+        self.profile_embedding: Optional[np.ndarray] = None  # computed on first use
+        self.asked_question_ids = [question_id for _, question_id in asked]  # in order
+        self.question_by_iq: Dict[int, int] = dict(asked)  # interview_question id -> global question id
+        self.answered_iq_ids = answered_iq_ids
+        self.plan = plan  # order_number -> PlanSlot (empty when the interview was not planned)
+        self.seen = seen  # bank questions this user was asked in any interview
+        self.touched_at = time.monotonic()
+
+    @property
+    def asked_count(self) -> int:
+        return len(self.asked_question_ids)
+
+    @property
+    def answered_count(self) -> int:
+        return len(self.answered_iq_ids)
+
+    @property
+    def next_order(self) -> int:
+        return self.asked_count + 1
+
+
+class InterviewSessionStore:
+    """LRU + idle-TTL map: interview_id -> InterviewSession"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[int, InterviewSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._hydrations = 0
+
+    def get(self, db: Session, interview_id: int) -> InterviewSession:
+        """Cached session, or hydrate it (raises ValueError if the interview does not exist)"""
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(interview_id)
+            if session is not None and now - session.touched_at < self.ttl_seconds:
+                session.touched_at = now
+                self._sessions.move_to_end(interview_id)
+                self._hits += 1
+                return session
+
+        session = self._hydrate(db, interview_id)
+        with self._lock:
+            self._sessions[interview_id] = session
+            self._sessions.move_to_end(interview_id)
+            while len(self._sessions) > self.max_size:
+                self._sessions.popitem(last=False)
+            self._hydrations += 1
+        return session
+
+    def _hydrate(self, db: Session, interview_id: int) -> InterviewSession:
+        """Interview + user in one query, then asked questions, answered ids, plan slots and seen filter in one each"""
+        row = (
+            db.query(Interview, User)
+            .join(User, User.id == Interview.user_id)
+            .filter(Interview.interview_id == interview_id)
+            .first()
+        )
+        if not row:
+            raise ValueError(f"Interview {interview_id} not found")
+        interview, user = row
+
+        asked = (
+            db.query(InterviewQuestion.id, InterviewQuestion.question_id)
+            .filter(InterviewQuestion.interview_id == interview_id)
+            .order_by(InterviewQuestion.order_index, InterviewQuestion.id)
+            .all()
+        )
+        answered = {
+            iq_id for (iq_id,) in db.query(func.distinct(UserAnswer.question_id))
+            .filter(UserAnswer.interview_id == interview_id)
+        }
+        plan = {
+            order: PlanSlot(question_type, question_id, status)
+            for order, question_type, question_id, status in db.query(
+                InterviewPlanSlot.order_number, InterviewPlanSlot.question_type,
+                InterviewPlanSlot.question_id, InterviewPlanSlot.status
+            ).filter(InterviewPlanSlot.interview_id == interview_id)
+        }
+        logger.debug(
+            f"interview_id={interview_id} session hydrated: {len(asked)} asked, "
+            f"{len(answered)} answered, {len(plan)} planned"
+        )
+        seen = SeenQuestionService.load(db, interview.user_id)
+        return InterviewSession(interview, UserProfileSnapshot(user), [tuple(a) for a in asked], answered, plan, seen)
+
+    # ------------------------------------------------------------
+    # Write-through (call after the commit succeeded)
+    # ------------------------------------------------------------
+
+    def record_question(self, session: InterviewSession, interview_question_id: int, question_id: int):
+        with self._lock:
+            session.asked_question_ids.append(question_id)
+            session.question_by_iq[interview_question_id] = question_id
+            session.touched_at = time.monotonic()
+
+    def record_answer(self, session: InterviewSession, interview_question_id: int):
+        with self._lock:
+            session.answered_iq_ids.add(interview_question_id)
+            session.touched_at = time.monotonic()
+
+    def set_plan(self, session: InterviewSession, plan: Dict[int, PlanSlot]):
+        with self._lock:
+            session.plan = plan
+            session.touched_at = time.monotonic()
+
+    def fill_plan_slot(self, slot: PlanSlot, question_id: Optional[int], status: str):
+        with self._lock:
+            slot.question_id = question_id
+            slot.status = status
+
+    def drop(self, interview_id: int):
+        with self._lock:
+            self._sessions.pop(interview_id, None)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._hydrations
+            return {
+                "sessions": len(self._sessions),
+                "hits": self._hits,
+                "hydrations": self._hydrations,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0
+            }
+
+
+# Global instance
+interview_sessions = InterviewSessionStore(
+    max_size=settings.INTERVIEW_SESSION_MAX_SIZE,
+    ttl_seconds=settings.INTERVIEW_SESSION_TTL_SECONDS
+)
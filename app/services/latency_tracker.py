@@ -0,0 +1,52 @@
+"""
+Rolling latency tracker
+Keeps the last N observations in memory so callers can budget by percentile
+"""
+
+import threading
+from collections import deque
+import numpy as np
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class LatencyTracker:
+    """Thread-safe rolling window of latencies (seconds)"""
+
+    def __init__(self, window: int, default_p95_seconds: float, min_samples: int = 20):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.default_p95_seconds = default_p95_seconds
+        self.min_samples = min_samples
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        """q-th percentile of the window; the configured default until enough samples exist"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return self.default_p95_seconds
+            samples = np.fromiter(self._samples, dtype=float)
+        return float(np.percentile(samples, q))
+
+    def p95(self) -> float:
+        return self.percentile(95)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            count = len(self._samples)
+        return {
+            "samples": count,
+            "p50_ms": round(self.percentile(50) * 1000, 1),
+            "p95_ms": round(self.p95() * 1000, 1)
+        }
+
+
+# Gemini generateContent round trips (shared by every caller in this process)
+gemini_latency = LatencyTracker(
+    window=settings.GEMINI_LATENCY_WINDOW,
+    default_p95_seconds=settings.GEMINI_DEFAULT_P95_MS / 1000.0
+)
@@ -0,0 +1,87 @@
+"""
+Mandatory Roster - the ordered introductory questions every interview starts with
+Loaded once at startup into an immutable tuple of QuestionSnapshot (ordered by
+question_id, same as QuestionService.get_mandatory_questions), so slot N of the
+introductory phase is a plain index. The roster is only rebuilt after a change
+to a static/mandatory question (or a bulk reload) has been published.
+"""
+
+import logging
+import threading
+from typing import Optional, Tuple
+from sqlalchemy.orm import Session
+from app.database.models import GlobalQuestion
+from app.services.question_events import question_events, QuestionSnapshot, RELOADED
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class MandatoryRosterError(RuntimeError):
+    """The mandatory roster cannot cover the introductory phase"""
+
+
+class MandatoryRoster:
+    """Immutable, ordered mandatory questions; O(1) lookup by interview order number"""
+
+    def __init__(self, phase_length: int):
+        self.phase_length = phase_length
+        self._lock = threading.Lock()
+        self._questions: Optional[Tuple[QuestionSnapshot, ...]] = None  # None = not loaded / stale
+
+    def load(self, db: Session) -> Tuple[QuestionSnapshot, ...]:
+        """(Re)build the roster with one query; raises MandatoryRosterError if it is too short"""
+        rows = db.query(GlobalQuestion).filter(
+            GlobalQuestion.is_mandatory == True,
+            GlobalQuestion.is_static == 1
+        ).order_by(GlobalQuestion.question_id.asc()).all()
+        questions = tuple(QuestionSnapshot.from_model(row) for row in rows)
+
+        if len(questions) < self.phase_length:
+            raise MandatoryRosterError(
+                f"Mandatory roster has {len(questions)} questions but the introductory phase "
+                f"needs {self.phase_length} (load static questions with is_mandatory=true)"
+            )
+
+        with self._lock:
+            self._questions = questions
+        logger.info(f"✓ Mandatory roster loaded: {len(questions)} questions")
+        return questions
+
+    def get(self, db: Session, order_num: int) -> QuestionSnapshot:
+        """Question for introductory slot order_num (1-based)"""
+        if not 1 <= order_num <= self.phase_length:
+            raise MandatoryRosterError(
+                f"Order {order_num} is outside the introductory phase (1..{self.phase_length})"
+            )
+        questions = self._questions
+        if questions is None:
+            with self._lock:
+                questions = self._questions
+            if questions is None:
+                questions = self.load(db)
+        return questions[order_num - 1]
+
+    def invalidate(self):
+        with self._lock:
+            self._questions = None
+
+    def on_event(self, kind: str, snapshot, previous):
+        if kind == RELOADED:
+            self.invalidate()
+            return
+        if any(
+                s is not None and (s.is_static == 1 or s.is_mandatory is True)
+                for s in (snapshot, previous)
+        ):
+            self.invalidate()
+
+    def snapshot(self) -> dict:
+        questions = self._questions
+        return {"loaded": questions is not None, "size": len(questions) if questions else 0}
+
+
+# Global instance
+mandatory_roster = MandatoryRoster(phase_length=settings.INTRODUCTORY_PHASE_LENGTH)
+question_events.subscribe(mandatory_roster.on_event)
@@ -0,0 +1,300 @@
+"""
+Question Bank Snapshot - compact, columnar, read-only view of global_questions
+One row per question in parallel numpy arrays: ids, integer-coded categoricals
+(type, subcategory, difficulty, job_role, industry), static/mandatory flags,
+usage counts and an alive mask, with the texts in one list of interned strings.
+Filtering is a handful of vectorized comparisons instead of an ORM query, so
+counting and sampling candidates takes microseconds and creates no ORM objects.
+
+Built with ONE column-only SELECT, then kept current from question events
+(appends, in-place updates, tombstones) and usage_tracker flushes; a TTL rebuild
+picks up writes made by other processes and compacts the tombstones.
+"""
+
+import logging
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.database.models import GlobalQuestion
+from app.services.question_events import question_events, CREATED, UPDATED, DELETED, RELOADED
+from app.services.usage_tracker import usage_tracker
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+CATEGORICAL_COLUMNS = ("question_type", "subcategory", "difficulty", "job_role", "industry")
+_CODE_DTYPE = np.int32
+_INITIAL_CAPACITY = 1024
+
+
+class _Codebook:
+    """value <-> small integer code for one categorical column (None is a value too)"""
+
+    def __init__(self):
+        self.codes: Dict[Optional[str], int] = {}
+        self.values: List[Optional[str]] = []
+
+    def encode(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def lookup(self, value) -> int:
+        """Code of an existing value, -1 (matches nothing) when the value was never seen"""
+        return self.codes.get(value, -1)
+
+
+class QuestionBankSnapshot:
+    """In-memory columnar copy of the question bank"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self.version = 0  # bumped on every rebuild / row change (not on usage changes)
+        self._reset(0)
+
+    def _reset(self, capacity: int):
+        capacity = max(capacity, _INITIAL_CAPACITY)
+        self._size = 0
+        self._row_of: Dict[int, int] = {}  # question_id -> row
+        self._codebooks = {name: _Codebook() for name in CATEGORICAL_COLUMNS}
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._columns = {name: np.zeros(capacity, dtype=_CODE_DTYPE) for name in CATEGORICAL_COLUMNS}
+        self._is_static = np.zeros(capacity, dtype=bool)
+        self._is_mandatory = np.zeros(capacity, dtype=bool)
+        self._usage = np.zeros(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._texts: List[str] = []
+
+    # ------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------
+
+    def _mask(self, exclude_ids: Optional[Iterable[int]], filters: dict) -> np.ndarray:
+        """Boolean mask over the live rows; caller holds the lock"""
+        n = self._size
+        mask = self._alive[:n].copy()
+        for name, value in filters.items():
+            if value is None:
+                continue
+            if name == "is_static":
+                mask &= self._is_static[:n] == bool(value)
+            elif name == "is_mandatory":
+                mask &= self._is_mandatory[:n] == bool(value)
+            elif name in self._codebooks:
+                mask &= self._columns[name][:n] == self._codebooks[name].lookup(value)
+            else:
+                raise ValueError(f"Unknown snapshot filter: {name}")
+        if exclude_ids:
+            excluded = np.fromiter((int(qid) for qid in exclude_ids), dtype=np.int64)
+            mask &= ~np.isin(self._ids[:n], excluded)
+        return mask
+
+    def count(self, db: Session, exclude_ids: Optional[Iterable[int]] = None, **filters) -> int:
+        """Number of questions matching the filters (e.g. question_type="hr", is_static=True)"""
+        self._ensure_fresh(db)
+        with self._lock:
+            return int(np.count_nonzero(self._mask(exclude_ids, filters)))
+
+    def sample_ids(
+            self,
+            db: Session,
+            k: int = 1,
+            exclude_ids: Optional[Iterable[int]] = None,
+            rng: Optional[np.random.Generator] = None,
+            **filters
+    ) -> List[int]:
+        """Up to k distinct matching question ids, uniformly at random"""
+        self._ensure_fresh(db)
+        with self._lock:
+            candidates = self._ids[:self._size][self._mask(exclude_ids, filters)]
+        if len(candidates) == 0:
+            return []
+        rng = rng or np.random.default_rng()
+        picked = rng.choice(candidates, size=min(k, len(candidates)), replace=False)
+        return [int(qid) for qid in picked]
+
+    def select(
+            self,
+            db: Session,
+            exclude_ids: Optional[Iterable[int]] = None,
+            **filters
+    ) -> Tuple[np.ndarray, np.ndarray, int]:
+        """(ids, usage counts, version) of the matching questions - copies, safe to keep"""
+        self._ensure_fresh(db)
+        with self._lock:
+            mask = self._mask(exclude_ids, filters)
+            return self._ids[:self._size][mask], self._usage[:self._size][mask], self.version
+
+    def usage_of(self, question_ids: Iterable[int]) -> Dict[int, int]:
+        """Usage counts of the given questions (ids not in the snapshot are left out)"""
+        with self._lock:
+            return {
+                int(qid): int(self._usage[self._row_of[int(qid)]])
+                for qid in question_ids if int(qid) in self._row_of
+            }
+
+    def text(self, question_id: int) -> Optional[str]:
+        with self._lock:
+            row = self._row_of.get(int(question_id))
+            return self._texts[row] if row is not None and self._alive[row] else None
+
+    def memory_bytes(self) -> int:
+        """Approximate footprint of the arrays, codebooks and texts"""
+        with self._lock:
+            arrays = self._ids.nbytes + self._is_static.nbytes + self._is_mandatory.nbytes + self._alive.nbytes
+            arrays += self._usage.nbytes
+            arrays += sum(column.nbytes for column in self._columns.values())
+            texts = sys.getsizeof(self._texts) + sum(sys.getsizeof(t) for t in set(self._texts))
+            index = sys.getsizeof(self._row_of)
+            return arrays + texts + index
+
+    def snapshot(self) -> dict:
+        memory = self.memory_bytes()
+        with self._lock:
+            alive = int(np.count_nonzero(self._alive[:self._size]))
+            return {
+                "loaded": self._loaded_at is not None,
+                "questions": alive,
+                "rows": self._size,
+                "memory_bytes": memory,
+                "memory_mb_per_100k": round(memory / alive * 100_000 / 1_048_576, 2) if alive else 0.0
+            }
+
+    # ------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------
+
+    def current_version(self, db: Session) -> int:
+        """Version after making sure the snapshot is loaded and within its TTL"""
+        self._ensure_fresh(db)
+        return self.version
+
+    def _ensure_fresh(self, db: Session):
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < self.ttl_seconds:
+            return
+        if loaded_at is None:
+            with self._refresh_lock:  # first load: everyone waits for it
+                if self._loaded_at is None:
+                    self.refresh(db)
+        elif self._refresh_lock.acquire(blocking=False):  # stale: one caller rebuilds, others read
+            try:
+                self.refresh(db)
+            finally:
+                self._refresh_lock.release()
+
+    def refresh(self, db: Session):
+        """Rebuild from one column-only SELECT (no ORM objects)"""
+        started = time.perf_counter()
+        rows = db.execute(
+            select(
+                GlobalQuestion.question_id,
+                GlobalQuestion.question_text,
+                GlobalQuestion.is_static,
+                GlobalQuestion.is_mandatory,
+                GlobalQuestion.usage_count,
+                *(getattr(GlobalQuestion, name) for name in CATEGORICAL_COLUMNS)
+            ).order_by(GlobalQuestion.question_id)
+        ).all()
+
+        with self._lock:
+            self._reset(len(rows) * 2)
+            for row in rows:
+                self._append(row.question_id, row.question_text, row.is_static, row.is_mandatory,
+                             row.usage_count, {name: getattr(row, name) for name in CATEGORICAL_COLUMNS})
+            self._loaded_at = time.monotonic()
+            self.version += 1
+        logger.debug(
+            f"Question bank snapshot rebuilt: {len(rows)} questions "
+            f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    # ------------------------------------------------------------
+    # Incremental updates (caller holds the lock)
+    # ------------------------------------------------------------
+
+    def _grow(self):
+        capacity = len(self._ids) * 2
+        self._ids = np.resize(self._ids, capacity)
+        self._is_static = np.resize(self._is_static, capacity)
+        self._is_mandatory = np.resize(self._is_mandatory, capacity)
+        self._usage = np.resize(self._usage, capacity)
+        self._alive = np.resize(self._alive, capacity)
+        self._alive[self._size:] = False
+        for name in CATEGORICAL_COLUMNS:
+            self._columns[name] = np.resize(self._columns[name], capacity)
+
+    def _write(self, row: int, question_text, is_static, is_mandatory, usage_count, categoricals: dict):
+        self._texts[row] = sys.intern(question_text or "")
+        self._is_static[row] = is_static == 1
+        self._is_mandatory[row] = is_mandatory is True
+        self._usage[row] = usage_count or 0
+        self._alive[row] = True
+        for name in CATEGORICAL_COLUMNS:
+            self._columns[name][row] = self._codebooks[name].encode(categoricals.get(name))
+
+    def _append(self, question_id: int, question_text, is_static, is_mandatory, usage_count, categoricals: dict):
+        if self._size == len(self._ids):
+            self._grow()
+        row = self._size
+        self._size += 1
+        self._ids[row] = question_id
+        self._row_of[question_id] = row
+        self._texts.append("")
+        self._write(row, question_text, is_static, is_mandatory, usage_count, categoricals)
+
+    def _upsert(self, snapshot):
+        categoricals = {name: getattr(snapshot, name) for name in CATEGORICAL_COLUMNS}
+        row = self._row_of.get(snapshot.question_id)
+        if row is None:
+            self._append(snapshot.question_id, snapshot.question_text, snapshot.is_static,
+                         snapshot.is_mandatory, snapshot.usage_count, categoricals)
+        else:
+            usage_count = max(snapshot.usage_count or 0, int(self._usage[row]))  # event may predate a flush
+            self._write(row, snapshot.question_text, snapshot.is_static, snapshot.is_mandatory,
+                        usage_count, categoricals)
+
+    def on_event(self, kind: str, snapshot, previous):
+        if kind == RELOADED:
+            self.invalidate()
+            return
+        with self._lock:
+            if self._loaded_at is None:
+                return  # the next read rebuilds everything
+            if kind in (CREATED, UPDATED):
+                self._upsert(snapshot)
+            elif kind == DELETED:
+                row = self._row_of.pop(snapshot.question_id, None)
+                if row is not None:
+                    self._alive[row] = False
+                    self._texts[row] = ""
+            self.version += 1
+
+    def on_usage_flush(self, deltas: Dict[int, int]):
+        """usage_tracker listener: add the flushed increments"""
+        with self._lock:
+            for question_id, delta in deltas.items():
+                row = self._row_of.get(question_id)
+                if row is not None:
+                    self._usage[row] += delta
+
+
+# Global instance
+question_bank_snapshot = QuestionBankSnapshot(ttl_seconds=settings.QUESTION_BANK_SNAPSHOT_TTL_SECONDS)
+question_events.subscribe(question_bank_snapshot.on_event)
+usage_tracker.on_flush(question_bank_snapshot.on_usage_flush)
@@ -0,0 +1,129 @@
+"""
+Question Cache - read-through cache of GlobalQuestion rows by id
+Holds detached QuestionSnapshot objects (never live ORM instances) with LRU
+and TTL bounds. Entries are dropped on update/delete events; get_many
+fetches only the misses, in one IN query. Every invalidation bumps a
+generation counter, so a miss read from the database before an update event
+is not cached after it (it would otherwise be served stale until its TTL).
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+from sqlalchemy.orm import Session
+from app.database.models import GlobalQuestion
+from app.services.question_events import question_events, QuestionSnapshot, UPDATED, DELETED, RELOADED
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class QuestionCache:
+    """Thread-safe LRU + TTL cache: question_id -> QuestionSnapshot"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()  # id -> (snapshot, expires_at)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._generation = 0  # bumped by every invalidation
+        self._invalidated: Dict[int, int] = {}  # id -> generation of its last invalidation (while loads run)
+        self._cleared_at = 0  # generation of the last clear()
+        self._loads_in_flight = 0
+
+    def _lookup(self, question_id: int, now: float) -> Optional[QuestionSnapshot]:
+        entry = self._entries.get(question_id)
+        if entry is None:
+            return None
+        snapshot, expires_at = entry
+        if expires_at <= now:
+            del self._entries[question_id]
+            return None
+        self._entries.move_to_end(question_id)
+        return snapshot
+
+    def _store(self, snapshot: QuestionSnapshot, now: float):
+        self._entries[snapshot.question_id] = (snapshot, now + self.ttl_seconds)
+        self._entries.move_to_end(snapshot.question_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get(self, db: Session, question_id: int) -> Optional[QuestionSnapshot]:
+        return self.get_many(db, [question_id]).get(question_id)
+
+    def get_many(self, db: Session, question_ids: Iterable[int]) -> Dict[int, QuestionSnapshot]:
+        """Snapshots for the ids that exist (cache hits + ONE query for the misses)"""
+        now = time.monotonic()
+        found, missing = {}, []
+        with self._lock:
+            for question_id in dict.fromkeys(int(qid) for qid in question_ids):
+                snapshot = self._lookup(question_id, now)
+                if snapshot is None:
+                    missing.append(question_id)
+                else:
+                    found[question_id] = snapshot
+            self._hits += len(found)
+            self._misses += len(missing)
+            if missing:
+                started_at = self._generation
+                self._loads_in_flight += 1
+
+        if missing:
+            loaded = []
+            try:
+                rows = db.query(GlobalQuestion).filter(GlobalQuestion.question_id.in_(missing)).all()
+                loaded = [QuestionSnapshot.from_model(row) for row in rows]
+            finally:
+                with self._lock:
+                    self._loads_in_flight -= 1
+                    stale = self._cleared_at > started_at
+                    for snapshot in loaded if not stale else ():
+                        # Invalidated while we were reading: return it, but do not cache it
+                        if self._invalidated.get(snapshot.question_id, 0) <= started_at:
+                            self._store(snapshot, now)
+                    if self._loads_in_flight == 0:
+                        self._invalidated.clear()
+            found.update((snapshot.question_id, snapshot) for snapshot in loaded)
+        return found
+
+    def invalidate(self, question_id: int):
+        with self._lock:
+            self._entries.pop(question_id, None)
+            self._generation += 1
+            if self._loads_in_flight:
+                self._invalidated[question_id] = self._generation
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._cleared_at = self._generation
+
+    def on_event(self, kind: str, snapshot, previous):
+        if kind in (UPDATED, DELETED):
+            self.invalidate(snapshot.question_id)
+        elif kind == RELOADED:
+            self.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0
+            }
+
+
+# Global instance
+question_cache = QuestionCache(
+    max_size=settings.QUESTION_CACHE_MAX_SIZE,
+    ttl_seconds=settings.QUESTION_CACHE_TTL_SECONDS
+)
+question_events.subscribe(question_cache.on_event)
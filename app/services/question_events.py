@@ -0,0 +1,84 @@
+"""
+Question change events
+QuestionService publishes here after every committed write to global_questions,
+so in-process caches/snapshots can update incrementally instead of re-querying.
+Writes made by other processes are not seen; subscribers keep a TTL as a backstop.
+"""
+
+import logging
+import threading
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+RELOADED = "reloaded"  # bulk change: subscribers should drop their state
+
+
+class QuestionSnapshot:
+    """Detached, read-only copy of a GlobalQuestion row (safe to keep after the session closes)"""
+
+    __slots__ = (
+        "question_id", "question_text", "question_type", "subcategory", "tags",
+        "industry", "job_role", "difficulty", "expected_answer", "usage_count",
+        "is_static", "is_mandatory", "created_at"
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_model(cls, question) -> "QuestionSnapshot":
+        return cls(**{name: getattr(question, name, None) for name in cls.__slots__})
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"QuestionSnapshot(question_id={self.question_id}, question_type={self.question_type!r})"
+
+
+class QuestionEvents:
+    """Synchronous in-process pub/sub; a failing subscriber never breaks the write path"""
+
+    def __init__(self):
+        self._subscribers: List[Callable] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable):
+        """callback(kind, snapshot, previous) - previous is set for UPDATED only"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def publish(
+            self,
+            kind: str,
+            snapshot: Optional[QuestionSnapshot] = None,
+            previous: Optional[QuestionSnapshot] = None
+    ):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(kind, snapshot, previous)
+            except Exception as e:
+                logger.error(f"Question event subscriber {getattr(callback, '__qualname__', callback)} failed: {e}")
+
+    def created(self, question):
+        self.publish(CREATED, QuestionSnapshot.from_model(question))
+
+    def updated(self, question, previous: QuestionSnapshot):
+        self.publish(UPDATED, QuestionSnapshot.from_model(question), previous)
+
+    def deleted(self, snapshot: QuestionSnapshot):
+        self.publish(DELETED, snapshot)
+
+    def reloaded(self):
+        self.publish(RELOADED)
+
+
+# Global instance
+question_events = QuestionEvents()
@@ -4,10 +4,12 @@ Orchestrates use of Gemini AI + similarity check + DB storage
 """
 
 import logging
-from typing import Optional
+from typing import Dict
 from sqlalchemy.orm import Session
+from app.database.chroma_db import chroma_db
 from app.services.gemini_service import GeminiService
 from app.services.question_service import QuestionService
+from app.services.generation_pipeline import filter_candidates, generation_yield
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -28,10 +30,19 @@ class QuestionGenerationService:
         question_text = GeminiService.generate_hr_question(job_role, industry)
         logger.debug(f"Generated HR question: {question_text}")
 
+        # Exact duplicate: indexed hash lookup, no embedding work
+        existing_question = QuestionService.get_question_by_hash(db, question_text)
+        if existing_question:
+            logger.info(f"Exact duplicate found, reusing existing ID: {existing_question.question_id}")
+            return existing_question
+
+        # Encode once: the same vector serves the similarity check and the insert
+        embedding = chroma_db.generate_embedding(question_text)
         similar = QuestionService.check_question_similarity(
             question_text,
             question_type="hr",
-            threshold=similarity_threshold
+            threshold=similarity_threshold,
+            embedding=embedding
         )
         if similar:
             logger.info(f"Similar question found, reusing existing ID: {similar[0]['question_id']}")
@@ -51,7 +62,7 @@ class QuestionGenerationService:
             "is_static": 0,
             "is_mandatory": False
         }
-        new_question = QuestionService.create_question(db, question_data)
+        new_question = QuestionService.create_question(db, question_data, embedding=embedding)
         return new_question
 
     @staticmethod
@@ -67,10 +78,19 @@ class QuestionGenerationService:
         question_text = GeminiService.generate_technical_question(job_role, skills)
         logger.debug(f"Generated technical question: {question_text}")
 
+        # Exact duplicate: indexed hash lookup, no embedding work
+        existing_question = QuestionService.get_question_by_hash(db, question_text)
+        if existing_question:
+            logger.info(f"Exact duplicate found, reusing existing ID: {existing_question.question_id}")
+            return existing_question
+
+        # Encode once: the same vector serves the similarity check and the insert
+        embedding = chroma_db.generate_embedding(question_text)
         similar = QuestionService.check_question_similarity(
             question_text,
             question_type="technical",
-            threshold=similarity_threshold
+            threshold=similarity_threshold,
+            embedding=embedding
         )
         if similar:
             logger.info(f"Similar question found, reusing existing ID: {similar[0]['question_id']}")
@@ -89,7 +109,7 @@ class QuestionGenerationService:
             "is_static": 0,
             "is_mandatory": False
         }
-        new_question = QuestionService.create_question(db, question_data)
+        new_question = QuestionService.create_question(db, question_data, embedding=embedding)
         return new_question
 
     @staticmethod
@@ -114,3 +134,70 @@ class QuestionGenerationService:
         }
         new_question = QuestionService.create_question(db, question_data)
         return new_question
+
+    @staticmethod
+    def generate_and_store_question_batch(
+            db: Session,
+            question_type: str,
+            job_role: str,
+            industry: str = "general",
+            count: int = None,
+            skills: str = "",
+            similarity_threshold: float = None,
+            max_store: int = None
+    ) -> Dict:
+        """
+        Over-generate K questions with ONE Gemini call and store the unique ones.
+
+        Candidates are encoded in one batch and filtered in one vectorized pass
+        (pairwise similarity matrix + one bank lookup); the maximal unique subset
+        is stored in a single transaction (capped at max_store when given).
+
+        Returns:
+            {"questions": newly created GlobalQuestion objects, "stats": yield/dedup counts}
+        """
+        similarity_threshold = similarity_threshold or settings.SIMILARITY_THRESHOLD
+        count = count or settings.GENERATION_OVERSAMPLE_K
+
+        logger.debug(f"Generating {question_type} batch (K={count}) for role={job_role}, industry={industry}")
+        candidates = GeminiService.generate_question_batch_for_type(
+            question_type, job_role, industry=industry, count=count, skills=skills
+        )
+
+        texts = [c.question_text for c in candidates]
+        # Exact duplicates of the bank are found on the hash index and never encoded
+        in_bank = QuestionService.existing_hashes(db, [QuestionService.question_hash(t) for t in texts])
+        result = filter_candidates(
+            texts, similarity_threshold,
+            exact_in_bank=[QuestionService.question_hash(t) in in_bank for t in texts]
+        )
+
+        questions_data = []
+        survivor_embeddings = []
+        kept = result["kept"] if max_store is None else result["kept"][:max_store]
+        for i in kept:
+            candidate = candidates[i]
+            questions_data.append({
+                "question_text": candidate.question_text,
+                "question_type": question_type,
+                "subcategory": question_type,
+                "tags": candidate.tags,
+                "industry": industry,
+                "job_role": job_role,
+                "difficulty": candidate.difficulty.value,
+                "expected_answer": candidate.expected_answer,
+                "is_static": 0,
+                "is_mandatory": False
+            })
+            survivor_embeddings.append(result["embeddings"][i].tolist())
+
+        new_questions = QuestionService.create_questions(db, questions_data, embeddings=survivor_embeddings)
+
+        stats = {**result["stats"], "requested": count, "stored": len(new_questions)}
+        generation_yield.record(question_type, result["stats"], stored=len(new_questions))
+        logger.info(
+            f"Batch {question_type}/{job_role}: {stats['candidates']} generated, "
+            f"{stats['exact_duplicates']} exact / {stats['intra_batch_duplicates']} intra-batch / "
+            f"{stats['bank_duplicates']} bank duplicates, {stats['stored']} stored"
+        )
+        return {"questions": new_questions, "stats": stats}
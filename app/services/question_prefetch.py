@@ -0,0 +1,105 @@
+"""
+Question Prefetch - speculative selection of the next question
+While the candidate reads, submit_answer already runs the next slot's selection
+(and generation, if the dice say AI) in the background. The result is parked in
+a per-interview slot keyed by order number; get_next_question takes it (waiting
+at most until its own deadline) instead of selecting again.
+
+Personalized slots (experience) prefetch only the generated text: their temp
+question row is created when the prefetch is served, so a discarded prefetch
+leaves no orphan row behind.
+
+A prefetch for another order number, or one still parked when the interview
+completes, is discarded. Only in-process: another worker simply selects live.
+"""
+
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Optional, Union
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class _Prefetch:
+    __slots__ = ("order", "future")
+
+    def __init__(self, order: int, future: Future):
+        self.order = order
+        self.future = future
+
+
+class QuestionPrefetcher:
+    """interview_id -> the background selection of its next slot"""
+
+    def __init__(self, workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="question-prefetch")
+        self._slots: Dict[int, _Prefetch] = {}
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    def schedule(self, interview_id: int, order: int, select: Callable[[], Union[int, str]]) -> bool:
+        """Run select() (-> question id or generated text) in the background for this slot; False if already scheduled"""
+        with self._lock:
+            current = self._slots.get(interview_id)
+            if current is not None and current.order == order:
+                return False
+            if current is not None:
+                current.future.cancel()
+                self._stats["discarded"] += 1
+            self._slots[interview_id] = _Prefetch(order, self._executor.submit(select))
+            self._stats["scheduled"] += 1
+        logger.debug(f"interview_id={interview_id} prefetching slot {order}")
+        return True
+
+    def take(self, interview_id: int, order: int, timeout: float) -> Optional[Union[int, str]]:
+        """
+        Prefetched question id (or text) for this slot (waits up to timeout), or None; the slot is emptied either way
+        The caller reports whether it could serve the id with record("hits") / record("misses").
+        """
+        with self._lock:
+            prefetch = self._slots.pop(interview_id, None)
+        if prefetch is None:
+            return None
+
+        if prefetch.order != order:
+            prefetch.future.cancel()
+            self.record("discarded")
+            return None
+        try:
+            return prefetch.future.result(timeout=max(0.0, timeout))
+        except FutureTimeout:
+            self.record("timeouts")  # still running: a generated hr/technical question stays in the bank
+        except Exception as e:
+            logger.warning(f"Prefetch of slot {order} for interview {interview_id} failed: {e}")
+            self.record("failures")
+        return None
+
+    def record(self, outcome: str):
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def cancel(self, interview_id: int):
+        """Interview ended: cancel a queued prefetch, ignore a running one"""
+        with self._lock:
+            prefetch = self._slots.pop(interview_id, None)
+            if prefetch is not None:
+                self._stats["cancelled" if prefetch.future.cancel() else "discarded"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            pending = len(self._slots)
+        taken = sum(stats.get(name, 0) for name in ("hits", "misses", "timeouts", "failures", "discarded"))
+        return {
+            **stats,
+            "pending": pending,
+            "hit_rate": round(stats.get("hits", 0) / taken, 3) if taken else 0.0
+        }
+
+
+# Global instance
+question_prefetcher = QuestionPrefetcher(workers=settings.QUESTION_PREFETCH_WORKERS)
@@ -4,13 +4,24 @@ Handles conditional ChromaDB storage based on question type
 """
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, or_
+from sqlalchemy import any_, bindparam, insert, select, String
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import IntegrityError
 from app.database.models import GlobalQuestion, InterviewQuestion
 from app.database.chroma_db import chroma_db
+from app.services.generation_pipeline import normalize_text
+from app.services.question_events import question_events, QuestionSnapshot
+from app.services.question_stats import question_stats
+from app.services.bank_inventory import bank_inventory
+from app.services.usage_tracker import usage_tracker
+from app.services.question_cache import question_cache
+from app.services.vector_outbox import vector_outbox
 from app.config import get_settings
 from typing import List, Dict, Optional
+import hashlib
 import json
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -21,6 +32,12 @@ VECTOR_DB_QUESTION_TYPES = ['hr', 'technical', 'behavioral', 'situational', 'cod
 # Question types that are personalized (no vector storage needed)
 PERSONALIZED_QUESTION_TYPES = ['experience', 'project', 'personalized']
 
+# Fields stored in ChromaDB metadata: changing one needs a metadata update, not a re-encode
+VECTOR_METADATA_FIELDS = {'question_type', 'subcategory', 'industry', 'job_role', 'difficulty', 'tags', 'is_static'}
+
+# Never set through update_question / bulk_update_questions
+IMMUTABLE_QUESTION_FIELDS = {'question_id', 'question_hash', 'created_at'}
+
 
 class QuestionService:
     """Service layer for question management"""
@@ -42,6 +59,36 @@ class QuestionService:
         """
         return question_type.lower() in [q.lower() for q in PERSONALIZED_QUESTION_TYPES]
 
+    @staticmethod
+    def question_hash(question_text: str, question_type: str = "") -> Optional[str]:
+        """
+        sha256 of the normalized (case/whitespace-insensitive) text
+        None for personalized types: they are per-user and never deduplicated
+        """
+        if question_type and QuestionService.is_personalized_question(question_type):
+            return None
+        return hashlib.sha256(normalize_text(question_text).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_question_by_hash(db: Session, question_text: str) -> Optional[GlobalQuestion]:
+        """Exact (normalized) duplicate lookup through the unique hash index - no embedding needed"""
+        return db.query(GlobalQuestion).filter(
+            GlobalQuestion.question_hash == QuestionService.question_hash(question_text)
+        ).first()
+
+    @staticmethod
+    def existing_hashes(db: Session, hashes: List[str]) -> set:
+        """Subset of hashes already in the bank (one indexed query)"""
+        if not hashes:
+            return set()
+        return set(db.scalars(
+            select(GlobalQuestion.question_hash).where(
+                GlobalQuestion.question_hash == any_(
+                    bindparam("hashes", list(hashes), type_=ARRAY(String(64)))
+                )
+            )
+        ))
+
     @staticmethod
     def load_static_questions(db: Session, json_file_path: str) -> int:
         """
@@ -56,58 +103,12 @@ class QuestionService:
             with open(json_file_path, 'r') as f:
                 questions_data = json.load(f)
 
-            count = 0
-            vector_db_count = 0
-
-            for category, questions in questions_data.items():
-                logger.info(f"Processing category: {category}")
-
-                for q_data in questions:
-                    # Check if question already exists
-                    existing = db.query(GlobalQuestion).filter(
-                        GlobalQuestion.question_text == q_data['question_text']
-                    ).first()
-
-                    if not existing:
-                        # Create new question in PostgreSQL (ALL static questions)
-                        question = GlobalQuestion(
-                            question_text=q_data['question_text'],
-                            question_type=q_data['question_type'],
-                            subcategory=q_data['subcategory'],
-                            tags=q_data['tags'],
-                            industry=q_data['industry'],
-                            job_role=q_data['job_role'],
-                            difficulty=q_data['difficulty'],
-                            expected_answer=q_data.get('expected_answer'),
-                            is_static=1,
-                            is_mandatory=q_data.get('is_mandatory', False)
-                        )
-                        db.add(question)
-                        db.flush()  # Get the generated question_id
-
-                        # Add to ChromaDB with INDIVIDUAL PARAMETERS
-                        chroma_db.add_question(
-                            question_id=question.question_id,
-                            question_text=question.question_text,
-                            question_type=question.question_type,
-                            industry=question.industry,
-                            job_role=question.job_role,
-                            difficulty=question.difficulty,
-                            tags=q_data.get('tags', []),
-                            subcategory=question.subcategory,
-                            is_static=1
-                        )
-
-                        vector_db_count += 1
-                        logger.debug(f"✓ Added to PostgreSQL + ChromaDB: {q_data['question_text'][:50]}...")
-                        count += 1
-                    else:
-                        logger.debug(f"→ Already exists: {q_data['question_text'][:50]}...")
+            questions = []
+            for category, category_questions in questions_data.items():
+                logger.info(f"Processing category: {category} ({len(category_questions)} questions)")
+                questions.extend(category_questions)
 
-            db.commit()
-            logger.info(f"✓ Loaded {count} static questions into PostgreSQL")
-            logger.info(f"✓ Added {vector_db_count} static questions to ChromaDB")
-            return count
+            return QuestionService.bulk_load_static_questions(db, questions)["inserted"]
 
         except FileNotFoundError:
             logger.error(f"File not found: {json_file_path}")
@@ -115,8 +116,98 @@ class QuestionService:
         except json.JSONDecodeError as e:
             logger.error(f"Invalid JSON format: {e}")
             raise
+
+    @staticmethod
+    def bulk_load_static_questions(db: Session, questions_data: List[Dict], push_vectors: bool = True) -> Dict:
+        """
+        Set-based static question loader
+
+        1. Hash every incoming text; existing rows are found in ONE query
+           on the unique question_hash index instead of one SELECT per entry
+        2. New rows go in with multi-row INSERT ... RETURNING question_id
+        3. Vectors are encoded and added to ChromaDB in batches (unless push_vectors=False)
+        Everything is committed once; on failure the vectors already pushed are removed.
+
+        Returns:
+            {"received", "duplicates", "inserted", "timings_ms": {...}}
+        """
+        batch_size = settings.STATIC_LOAD_BATCH_SIZE
+        timings = {}
+        pushed_ids = []
+
+        try:
+            started = time.perf_counter()
+            # Exact duplicates inside the file: first occurrence wins
+            incoming = []
+            seen = set()
+            for q_data in questions_data:
+                text_hash = QuestionService.question_hash(q_data['question_text'], q_data['question_type'])
+                if text_hash is None or text_hash not in seen:
+                    seen.add(text_hash)
+                    incoming.append((text_hash, q_data))
+
+            existing = QuestionService.existing_hashes(db, [h for h, _ in incoming if h])
+            new_rows = [
+                {
+                    "question_text": q_data['question_text'],
+                    "question_hash": text_hash,
+                    "question_type": q_data['question_type'],
+                    "subcategory": q_data.get('subcategory'),
+                    "tags": q_data.get('tags') or [],
+                    "industry": q_data.get('industry') or "general",
+                    "job_role": q_data.get('job_role') or "general",
+                    "difficulty": q_data.get('difficulty'),
+                    "expected_answer": q_data.get('expected_answer'),
+                    "is_static": 1,
+                    "is_mandatory": q_data.get('is_mandatory', False)
+                }
+                for text_hash, q_data in incoming
+                if text_hash is None or text_hash not in existing
+            ]
+            timings["lookup"] = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            question_ids = []
+            for i in range(0, len(new_rows), batch_size):
+                question_ids.extend(db.scalars(
+                    insert(GlobalQuestion).returning(GlobalQuestion.question_id, sort_by_parameter_order=True),
+                    new_rows[i:i + batch_size]
+                ))
+            timings["insert"] = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            vector_rows = [
+                {**row, "question_id": question_id}
+                for question_id, row in zip(question_ids, new_rows)
+                if push_vectors and QuestionService.should_store_in_vector_db(row['question_type'])
+            ]
+            for i in range(0, len(vector_rows), batch_size):
+                batch = vector_rows[i:i + batch_size]
+                chroma_db.add_questions(batch)
+                pushed_ids.extend(row["question_id"] for row in batch)
+            timings["vectors"] = (time.perf_counter() - started) * 1000
+
+            db.commit()
+            if question_ids:
+                question_events.reloaded()
+            logger.info(
+                f"✓ Loaded {len(question_ids)} static questions into PostgreSQL "
+                f"({len(pushed_ids)} added to ChromaDB, "
+                f"{len(questions_data) - len(question_ids)} duplicates skipped)"
+            )
+            return {
+                "received": len(questions_data),
+                "duplicates": len(questions_data) - len(question_ids),
+                "inserted": len(question_ids),
+                "timings_ms": {phase: round(ms, 1) for phase, ms in timings.items()}
+            }
+
         except Exception as e:
             db.rollback()
+            try:
+                chroma_db.delete_questions(pushed_ids)
+            except Exception:
+                pass  # already logged; the load error below is the one to surface
             logger.error(f"Error loading static questions: {e}")
             raise
 
@@ -163,17 +254,21 @@ class QuestionService:
         return query.all()
 
     @staticmethod
-    def get_question_by_id(db: Session, question_id: int) -> Optional[GlobalQuestion]:
-        """Get specific question by ID"""
-        return db.query(GlobalQuestion).filter(
-            GlobalQuestion.question_id == question_id
-        ).first()
+    def get_question_by_id(db: Session, question_id: int) -> Optional[QuestionSnapshot]:
+        """Get specific question by ID (read-only snapshot from the question cache)"""
+        return question_cache.get(db, int(question_id))
+
+    @staticmethod
+    def get_questions_by_ids(db: Session, question_ids: List[int]) -> Dict[int, QuestionSnapshot]:
+        """Snapshots by ID; cache misses are fetched in one IN query"""
+        return question_cache.get_many(db, question_ids)
 
     @staticmethod
     def check_question_similarity(
             question_text: str,
             question_type: str,
-            threshold: Optional[float] = None
+            threshold: Optional[float] = None,
+            embedding: Optional[List[float]] = None
     ) -> List[Dict]:
         """
         Check if similar question exists in vector database
@@ -184,6 +279,7 @@ class QuestionService:
             question_text: The question text to check
             question_type: Type of question (hr, technical, experience, etc.)
             threshold: Similarity threshold (uses config default if not provided)
+            embedding: Precomputed embedding of question_text (avoids re-encoding)
 
         Returns:
             List of similar questions above threshold (empty for personalized questions)
@@ -197,7 +293,9 @@ class QuestionService:
         if threshold is None:
             threshold = settings.SIMILARITY_THRESHOLD
 
-        return chroma_db.find_similar_questions(question_text, n_results=5, threshold=threshold)
+        return chroma_db.find_similar_questions(
+            question_text, n_results=5, threshold=threshold, embedding=embedding
+        )
 
     # @staticmethod
     # def create_question(db: Session, question_data: Dict) -> GlobalQuestion:
@@ -246,18 +344,38 @@ class QuestionService:
     #         logger.error(f"Error creating question: {e}")
     #         raise
     @staticmethod
-    def create_question(db: Session, question_data: Dict) -> GlobalQuestion:
+    def create_question(
+            db: Session,
+            question_data: Dict,
+            embedding: Optional[List[float]] = None
+    ) -> GlobalQuestion:
         """
         Create new question in database
-        Conditionally adds to ChromaDB based on question type
+        Generic types get a vector_outbox entry in the same transaction;
+        the outbox dispatcher adds them to ChromaDB in the background
 
         Args:
             db: Database session
             question_data: Dictionary with question fields
+            embedding: Embedding already computed for the similarity check (reused by the dispatcher)
 
         Returns:
-            Created GlobalQuestion object
+            Created GlobalQuestion object (or the existing one for an exact duplicate)
         """
+        question_data = {
+            **question_data,
+            'question_hash': QuestionService.question_hash(
+                question_data['question_text'], question_data.get('question_type', '')
+            )
+        }
+        if question_data['question_hash']:
+            existing = db.query(GlobalQuestion).filter(
+                GlobalQuestion.question_hash == question_data['question_hash']
+            ).first()
+            if existing:
+                logger.info(f"♻️ Exact duplicate of question {existing.question_id}, reusing it")
+                return existing
+
         try:
             question = GlobalQuestion(**question_data)
             db.add(question)
@@ -265,37 +383,139 @@ class QuestionService:
 
             question_type = question_data.get('question_type', '')
 
-            # Add to ChromaDB ONLY for generic question types
+            # Queue for ChromaDB ONLY for generic question types
             if QuestionService.should_store_in_vector_db(question_type):
-                # Pass individual fields separately instead of metadata dict
-                chroma_db.add_question(
-                    question_id=question.question_id,
-                    question_text=question.question_text,
-                    question_type=question_type,
-                    subcategory=question_data.get('subcategory'),
-                    industry=question_data.get('industry', 'general'),
-                    job_role=question_data.get('job_role', 'general'),
-                    difficulty=question_data.get('difficulty', 'medium'),
-                    tags=question_data.get('tags', []),
-                    is_static=question_data.get('is_static', 0)
-                )
-                logger.info(f"Created question {question.question_id} in PostgreSQL + ChromaDB")
+                vector_outbox.enqueue_upsert(db, question.question_id, embedding)
+                logger.info(f"Created question {question.question_id} in PostgreSQL (ChromaDB via outbox)")
             else:
                 logger.info(f"Created question {question.question_id} in PostgreSQL only (personalized)")
 
             db.commit()
+            vector_outbox.notify()
+            question_events.created(question)
             return question
 
+        except IntegrityError:
+            # Lost a race with a concurrent insert of the same text
+            db.rollback()
+            existing = db.query(GlobalQuestion).filter(
+                GlobalQuestion.question_hash == question_data['question_hash']
+            ).first()
+            if existing:
+                logger.info(f"♻️ Exact duplicate of question {existing.question_id} inserted concurrently, reusing it")
+                return existing
+            raise
         except Exception as e:
             db.rollback()
             logger.error(f"Error creating question: {e}")
             raise
 
+    @staticmethod
+    def create_questions(
+            db: Session,
+            questions_data: List[Dict],
+            embeddings: Optional[List[List[float]]] = None
+    ) -> List[GlobalQuestion]:
+        """
+        Create many questions in ONE transaction
+        Generic types are queued in vector_outbox (the dispatcher encodes them in one batch)
+
+        Args:
+            db: Database session
+            questions_data: List of dictionaries with question fields
+            embeddings: Optional precomputed embeddings, aligned with questions_data
+
+        Returns:
+            Created GlobalQuestion objects (input order, exact duplicates skipped)
+        """
+        if not questions_data:
+            return []
+
+        # Exact duplicates (of the bank or earlier in this batch) are skipped before any vector work
+        embeddings = embeddings or [None] * len(questions_data)
+        hashes = [
+            QuestionService.question_hash(data['question_text'], data.get('question_type', ''))
+            for data in questions_data
+        ]
+        seen = QuestionService.existing_hashes(db, [h for h in hashes if h])
+        unique_data, unique_embeddings = [], []
+        for data, embedding, text_hash in zip(questions_data, embeddings, hashes):
+            if text_hash is not None and text_hash in seen:
+                continue
+            seen.add(text_hash)
+            unique_data.append({**data, 'question_hash': text_hash})
+            unique_embeddings.append(embedding)
+        if len(unique_data) < len(questions_data):
+            logger.info(f"Skipped {len(questions_data) - len(unique_data)} exact duplicate question(s)")
+        questions_data, embeddings = unique_data, unique_embeddings
+
+        try:
+            questions = [GlobalQuestion(**data) for data in questions_data]
+            db.add_all(questions)
+            db.flush()  # Get the generated question_ids
+
+            queued = 0
+            for question, data, embedding in zip(questions, questions_data, embeddings):
+                if QuestionService.should_store_in_vector_db(data.get('question_type', '')):
+                    vector_outbox.enqueue_upsert(db, question.question_id, embedding)
+                    queued += 1
+
+            db.commit()
+            vector_outbox.notify()
+            for question in questions:
+                question_events.created(question)
+            logger.info(
+                f"Created {len(questions)} questions in PostgreSQL "
+                f"({queued} queued for ChromaDB)"
+            )
+            return questions
+
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error creating questions: {e}")
+            raise
+
+    @staticmethod
+    def _apply_update(question: GlobalQuestion, update_data: Dict) -> set:
+        """Set the given (non-None) fields; returns the names whose value actually changed"""
+        changed = set()
+        for field, value in update_data.items():
+            if field in IMMUTABLE_QUESTION_FIELDS or value is None or not hasattr(question, field):
+                continue
+            if getattr(question, field) != value:
+                setattr(question, field, value)
+                changed.add(field)
+        return changed
+
+    @staticmethod
+    def _queue_vector_sync(db: Session, question: GlobalQuestion, previous: QuestionSnapshot,
+                           changed: set) -> Optional[str]:
+        """
+        Outbox entry for an update, from the diff of old vs new:
+        text changed (or newly generic) -> re-encode, vector metadata changed -> metadata only,
+        generic -> personalized -> delete, anything else -> nothing
+        """
+        is_generic = QuestionService.should_store_in_vector_db(question.question_type)
+        was_generic = QuestionService.should_store_in_vector_db(previous.question_type)
+        if not is_generic:
+            if was_generic:
+                vector_outbox.enqueue_delete(db, question.question_id)
+                return "delete"
+            return None
+        if not was_generic or 'question_text' in changed:
+            vector_outbox.enqueue_upsert(db, question.question_id)
+            return "reencode"
+        if changed & VECTOR_METADATA_FIELDS:
+            vector_outbox.enqueue_metadata(db, question.question_id)
+            return "metadata"
+        return None
+
     @staticmethod
     def update_question(db: Session, question_id: int, update_data: Dict) -> Optional[GlobalQuestion]:
         """
         Update existing question
-        Updates ChromaDB if question type uses vector storage
+        Only a text change re-encodes; metadata-only edits skip the embedding model
+        (the ChromaDB change is queued in vector_outbox in the same transaction)
         """
         try:
             question = db.query(GlobalQuestion).filter(
@@ -304,37 +524,34 @@ class QuestionService:
 
             if not question:
                 return None
-
-            # Update fields
-            for field, value in update_data.items():
-                if hasattr(question, field) and value is not None:
-                    setattr(question, field, value)
-
-            # Update ChromaDB if it's a generic question type
-            if QuestionService.should_store_in_vector_db(question.question_type):
-                # Delete old entry
-                chroma_db.delete_question(question_id)
-
-                # Add updated entry
-                metadata = {
-                    'question_type': question.question_type,
-                    'subcategory': question.subcategory,
-                    'industry': question.industry,
-                    'job_role': question.job_role,
-                    'difficulty': question.difficulty,
-                    'is_mandatory': str(question.is_mandatory)
-                }
-                chroma_db.add_question(
-                    question.question_id,
-                    question.question_text,
-                    metadata
-                )
-                logger.info(f"Updated question {question_id} in PostgreSQL + ChromaDB")
-            else:
-                logger.info(f"Updated question {question_id} in PostgreSQL only")
+            previous = QuestionSnapshot.from_model(question)
+
+            changed = QuestionService._apply_update(question, update_data)
+            if not changed:
+                logger.info(f"Question {question_id} unchanged, nothing to update")
+                return question
+
+            if changed & {'question_text', 'question_type'}:
+                new_hash = QuestionService.question_hash(question.question_text, question.question_type)
+                if new_hash != question.question_hash:
+                    if new_hash and db.query(GlobalQuestion.question_id).filter(
+                            GlobalQuestion.question_hash == new_hash,
+                            GlobalQuestion.question_id != question_id
+                    ).first():
+                        raise ValueError("Another question with the same text already exists")
+                    question.question_hash = new_hash
+
+            vector_change = QuestionService._queue_vector_sync(db, question, previous, changed)
+            logger.info(
+                f"Updated question {question_id} ({', '.join(sorted(changed))}); "
+                f"ChromaDB: {vector_change or 'no change'}"
+            )
 
             db.commit()
+            if vector_change:
+                vector_outbox.notify()
             db.refresh(question)
+            question_events.updated(question, previous)
             return question
 
         except Exception as e:
@@ -342,6 +559,94 @@ class QuestionService:
             logger.error(f"Error updating question: {e}")
             raise
 
+    @staticmethod
+    def bulk_update_questions(db: Session, updates: List[Dict]) -> Dict:
+        """
+        Apply many per-question updates (e.g. re-tagging thousands of questions) in ONE transaction
+
+        Rows are loaded with one IN query per chunk and flushed per chunk; every
+        question gets the same old-vs-new diff as update_question, so only text
+        changes are re-encoded and the rest become metadata-only outbox entries.
+
+        Args:
+            updates: Dicts with question_id plus the fields to change
+
+        Returns:
+            {"requested", "updated", "unchanged", "not_found": [...], "vector_changes": {...}}
+        """
+        chunk_size = settings.STATIC_LOAD_BATCH_SIZE
+        by_id = {}
+        for item in updates:  # later entries for the same question win
+            by_id.setdefault(int(item['question_id']), {}).update(item)
+
+        updated, not_found = [], []
+        vector_changes = {"reencode": 0, "metadata": 0, "delete": 0}
+        try:
+            ids = list(by_id)
+            for i in range(0, len(ids), chunk_size):
+                chunk = ids[i:i + chunk_size]
+                questions = {
+                    q.question_id: q
+                    for q in db.query(GlobalQuestion).filter(GlobalQuestion.question_id.in_(chunk))
+                }
+                not_found.extend(qid for qid in chunk if qid not in questions)
+
+                rehashed = {}
+                for qid, question in questions.items():
+                    previous = QuestionSnapshot.from_model(question)
+                    changed = QuestionService._apply_update(question, by_id[qid])
+                    if not changed:
+                        continue
+                    if changed & {'question_text', 'question_type'}:
+                        new_hash = QuestionService.question_hash(question.question_text, question.question_type)
+                        if new_hash != question.question_hash:
+                            if new_hash in rehashed:
+                                raise ValueError(f"Questions {rehashed[new_hash]} and {qid} would get the same text")
+                            question.question_hash = new_hash
+                            if new_hash:
+                                rehashed[new_hash] = qid
+                    updated.append((question, previous, changed))
+
+                if rehashed:
+                    # Earlier chunks are flushed already, so this also covers clashes across chunks
+                    with db.no_autoflush:
+                        clashes = db.query(GlobalQuestion.question_id).filter(
+                            GlobalQuestion.question_hash.in_(list(rehashed)),
+                            GlobalQuestion.question_id.notin_(list(rehashed.values()))
+                        ).all()
+                    if clashes:
+                        raise ValueError(
+                            f"Updated text duplicates existing question(s): {[qid for (qid,) in clashes]}"
+                        )
+                db.flush()
+
+            for question, previous, changed in updated:
+                change = QuestionService._queue_vector_sync(db, question, previous, changed)
+                if change:
+                    vector_changes[change] += 1
+
+            db.commit()
+            vector_outbox.notify()
+            for question, previous, _ in updated:
+                question_events.updated(question, previous)
+            logger.info(
+                f"Bulk updated {len(updated)}/{len(by_id)} questions "
+                f"(re-encode {vector_changes['reencode']}, metadata-only {vector_changes['metadata']}, "
+                f"vector delete {vector_changes['delete']})"
+            )
+            return {
+                "requested": len(by_id),
+                "updated": len(updated),
+                "unchanged": len(by_id) - len(updated) - len(not_found),
+                "not_found": not_found,
+                "vector_changes": vector_changes
+            }
+
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error bulk updating questions: {e}")
+            raise
+
     @staticmethod
     def delete_question(db: Session, question_id: int) -> bool:
         """
@@ -355,14 +660,16 @@ class QuestionService:
             if not question:
                 return False
 
-            # Delete from ChromaDB if it's stored there
+            # Remove from ChromaDB (via outbox) if it's stored there
             if QuestionService.should_store_in_vector_db(question.question_type):
-                chroma_db.delete_question(question_id)
-                logger.info(f"Deleted question {question_id} from ChromaDB")
+                vector_outbox.enqueue_delete(db, question_id)
 
             # Delete from PostgreSQL
+            snapshot = QuestionSnapshot.from_model(question)
             db.delete(question)
             db.commit()
+            vector_outbox.notify()
+            question_events.deleted(snapshot)
             logger.info(f"Deleted question {question_id} from PostgreSQL")
             return True
 
@@ -377,78 +684,26 @@ class QuestionService:
             job_role: str,
             industry: str = "general"
     ) -> Dict[str, int]:
-        """Get count of questions by type for specific job role"""
-        all_types = VECTOR_DB_QUESTION_TYPES + PERSONALIZED_QUESTION_TYPES
-        counts = {}
-
-        for q_type in all_types:
-            count = db.query(func.count(GlobalQuestion.question_id)).filter(
-                and_(
-                    GlobalQuestion.job_role == job_role,
-                    GlobalQuestion.industry == industry,
-                    GlobalQuestion.question_type == q_type
-                )
-            ).scalar()
-            counts[q_type] = count
-
-        return counts
+        """Get count of questions by type for specific job role (served from the bank inventory)"""
+        return bank_inventory.counts_by_type(
+            db, job_role, industry, VECTOR_DB_QUESTION_TYPES + PERSONALIZED_QUESTION_TYPES
+        )
 
     @staticmethod
     def get_question_stats(db: Session) -> Dict[str, any]:
-        """Get comprehensive question statistics"""
-        total_questions = db.query(func.count(GlobalQuestion.question_id)).scalar()
-        mandatory_questions = db.query(func.count(GlobalQuestion.question_id)).filter(
-            GlobalQuestion.is_mandatory == True
-        ).scalar()
-        optional_questions = db.query(func.count(GlobalQuestion.question_id)).filter(
-            or_(
-                GlobalQuestion.is_mandatory == False,
-                GlobalQuestion.is_mandatory == None
-            )
-        ).scalar()
-
-        # Count by subcategory
-        subcategory_counts = db.query(
-            GlobalQuestion.subcategory,
-            func.count(GlobalQuestion.question_id)
-        ).group_by(GlobalQuestion.subcategory).all()
-
-        # Count by question type
-        type_counts = db.query(
-            GlobalQuestion.question_type,
-            func.count(GlobalQuestion.question_id)
-        ).group_by(GlobalQuestion.question_type).all()
-
-        # Count questions in vector DB vs personalized
-        vector_db_count = 0
-        personalized_count = 0
-        for q_type, count in type_counts:
-            if QuestionService.should_store_in_vector_db(q_type):
-                vector_db_count += count
-            else:
-                personalized_count += count
-
-        return {
-            'total': total_questions,
-            'mandatory': mandatory_questions,
-            'optional': optional_questions,
-            'by_subcategory': {cat: count for cat, count in subcategory_counts},
-            'by_type': {q_type: count for q_type, count in type_counts},
-            'in_vector_db': vector_db_count,
-            'personalized': personalized_count
-        }
+        """
+        Get comprehensive question statistics
+        Served from an in-process snapshot (one GROUPING SETS scan, then incremental updates)
+        """
+        return question_stats.get(db, QuestionService.should_store_in_vector_db)
 
     @staticmethod
     def increment_usage_count(db: Session, question_id: int):
-        """Increment usage counter when question is asked"""
-        question = db.query(GlobalQuestion).filter(
-            GlobalQuestion.question_id == question_id
-        ).first()
-
-        if question:
-            question.usage_count += 1
-            db.commit()
-            logger.debug(f"Incremented usage count for question {question_id}")
+        """
+        Increment usage counter when question is asked
+        Write-behind: aggregated in memory, persisted by usage_tracker's batched flush
+        """
+        usage_tracker.record(question_id)
 
     # 🔥 ADD THESE 3 METHODS (copy-paste exactly)
 
@@ -463,19 +718,13 @@ class QuestionService:
 
     @staticmethod
     def get_question_count_by_type_jobrole(db: Session, question_type: str, job_role: str) -> int:
-        """Count questions by type + job_role (YOUR threshold logic)"""
-        from sqlalchemy import func
-        count = db.query(func.count(GlobalQuestion.question_id)).filter(
-            and_(
-                GlobalQuestion.question_type == question_type,
-                GlobalQuestion.job_role == job_role
-            )
-        ).scalar() or 0
-        return count
+        """Count questions by type + job_role (YOUR threshold logic) - in-memory, no query per call"""
+        return bank_inventory.count_by_type_role(db, question_type, job_role)
 
     @staticmethod
     def store_question(db: Session, question_text: str, question_type: str, industry: str,
-                       job_role: str = None, is_reusable: bool = True) -> GlobalQuestion:
+                       job_role: str = None, is_reusable: bool = True,
+                       embedding: Optional[List[float]] = None) -> GlobalQuestion:
         """Store reusable question (uses your existing create_question)"""
         question_data = {
             'question_text': question_text,
@@ -486,7 +735,7 @@ class QuestionService:
             'is_mandatory': False,
             'difficulty': 'medium'
         }
-        return QuestionService.create_question(db, question_data)
+        return QuestionService.create_question(db, question_data, embedding=embedding)
 
     @staticmethod
     def create_temp_question(db: Session, question_text: str, question_type: str, user_id: int) -> GlobalQuestion:
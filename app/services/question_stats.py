@@ -0,0 +1,114 @@
+"""
+Question statistics snapshot
+All counters come from ONE statement (COUNT ... FILTER + GROUPING SETS) and are
+kept in-process, updated incrementally from question events. A TTL refresh
+covers writes made by other processes (scripts, other API workers).
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session
+from app.database.models import GlobalQuestion
+from app.services.question_events import question_events, CREATED, UPDATED, DELETED, RELOADED
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def _stats_query():
+    return select(
+        func.grouping(GlobalQuestion.question_type).label("g_type"),
+        func.grouping(GlobalQuestion.subcategory).label("g_sub"),
+        GlobalQuestion.question_type,
+        GlobalQuestion.subcategory,
+        func.count().label("total"),
+        func.count().filter(GlobalQuestion.is_mandatory.is_(True)).label("mandatory")
+    ).group_by(
+        func.grouping_sets(GlobalQuestion.question_type, GlobalQuestion.subcategory, tuple_())
+    )
+
+
+class QuestionStatsCache:
+    """Counters behind /questions/stats/summary"""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._total = 0
+        self._mandatory = 0
+        self._by_type = Counter()
+        self._by_subcategory = Counter()
+
+    def get(self, db: Session, should_store_in_vector_db) -> Dict:
+        with self._lock:
+            fresh = self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+        if not fresh:
+            self.refresh(db)
+
+        with self._lock:
+            by_type = {q_type: count for q_type, count in self._by_type.items() if count > 0}
+            vector_db_count = sum(c for t, c in by_type.items() if should_store_in_vector_db(t))
+            return {
+                'total': self._total,
+                'mandatory': self._mandatory,
+                'optional': self._total - self._mandatory,
+                'by_subcategory': {cat: count for cat, count in self._by_subcategory.items() if count > 0},
+                'by_type': by_type,
+                'in_vector_db': vector_db_count,
+                'personalized': self._total - vector_db_count
+            }
+
+    def refresh(self, db: Session):
+        """Recompute every counter with a single table scan"""
+        total, mandatory = 0, 0
+        by_type, by_subcategory = Counter(), Counter()
+        for row in db.execute(_stats_query()):
+            if row.g_type and row.g_sub:
+                total, mandatory = row.total, row.mandatory
+            elif row.g_sub:
+                by_type[row.question_type] = row.total
+            else:
+                by_subcategory[row.subcategory] = row.total
+
+        with self._lock:
+            self._total, self._mandatory = total, mandatory
+            self._by_type, self._by_subcategory = by_type, by_subcategory
+            self._loaded_at = time.monotonic()
+        logger.debug(f"Question stats refreshed: {total} questions")
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def _apply(self, snapshot, sign: int):
+        self._total += sign
+        if snapshot.is_mandatory is True:
+            self._mandatory += sign
+        self._by_type[snapshot.question_type] += sign
+        self._by_subcategory[snapshot.subcategory] += sign
+
+    def on_event(self, kind: str, snapshot, previous):
+        if kind == RELOADED:
+            self.invalidate()
+            return
+        with self._lock:
+            if self._loaded_at is None:
+                return  # nothing cached yet; the next read does a full refresh
+            if kind == CREATED:
+                self._apply(snapshot, +1)
+            elif kind == DELETED:
+                self._apply(snapshot, -1)
+            elif kind == UPDATED:
+                self._apply(previous, -1)
+                self._apply(snapshot, +1)
+
+
+# Global instance
+question_stats = QuestionStatsCache(ttl_seconds=settings.QUESTION_STATS_TTL_SECONDS)
+question_events.subscribe(question_stats.on_event)
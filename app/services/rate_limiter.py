@@ -0,0 +1,278 @@
+"""
+Gemini Rate Limiter - Token buckets shared by every worker process
+Requests-per-minute and tokens-per-minute buckets live in one SQLite file,
+so all uvicorn workers and scripts on a node draw from the same quota.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+REQUEST_BUCKET = "requests"
+TOKEN_BUCKET = "tokens"
+
+# How often a queued caller re-checks whether it reached the head of the queue
+QUEUE_POLL_SECONDS = 0.05
+
+
+class RateLimitExceeded(Exception):
+    """Raised when quota could not be acquired (non-blocking call or max wait exceeded)"""
+
+
+class GeminiRateLimiter:
+    """
+    Cross-process token bucket for the shared GEMINI_API_KEY
+
+    - acquire(): FIFO queue with a max wait (fair across processes)
+    - try_acquire(): never waits and never jumps the queue
+    - record_usage(): per-endpoint request/token accounting
+    """
+
+    def __init__(
+            self,
+            db_path: str,
+            requests_per_minute: int,
+            tokens_per_minute: int,
+            max_wait_seconds: float
+    ):
+        self.db_path = db_path
+        self.request_rate = requests_per_minute / 60.0
+        self.token_rate = tokens_per_minute / 60.0
+        self.capacities = {
+            REQUEST_BUCKET: float(requests_per_minute),
+            TOKEN_BUCKET: float(tokens_per_minute)
+        }
+        self.max_wait_seconds = max_wait_seconds
+        self._local = threading.local()
+
+    # ------------------------------------------------------------
+    # SQLite plumbing
+    # ------------------------------------------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections are not thread-safe)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(os.path.abspath(self.db_path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS waiters ("
+                "ticket INTEGER PRIMARY KEY AUTOINCREMENT, expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS usage ("
+                "endpoint TEXT PRIMARY KEY, requests INTEGER NOT NULL DEFAULT 0, "
+                "prompt_tokens INTEGER NOT NULL DEFAULT 0, output_tokens INTEGER NOT NULL DEFAULT 0, "
+                "total_tokens INTEGER NOT NULL DEFAULT 0, throttled INTEGER NOT NULL DEFAULT 0, "
+                "updated_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def _refill(self, conn: sqlite3.Connection, now: float) -> Dict[str, float]:
+        """Load both buckets and add the tokens earned since the last update"""
+        rates = {REQUEST_BUCKET: self.request_rate, TOKEN_BUCKET: self.token_rate}
+        levels = {}
+        for name, rate in rates.items():
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM buckets WHERE name = ?", (name,)
+            ).fetchone()
+            if row is None:
+                levels[name] = self.capacities[name]
+            else:
+                tokens, updated_at = row
+                levels[name] = min(self.capacities[name], tokens + max(0.0, now - updated_at) * rate)
+        return levels
+
+    def _store(self, conn: sqlite3.Connection, levels: Dict[str, float], now: float):
+        conn.executemany(
+            "INSERT INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+            [(name, tokens, now) for name, tokens in levels.items()]
+        )
+
+    def _try_take(self, tokens: float, ticket: Optional[int]) -> float:
+        """
+        Attempt to take 1 request + `tokens` tokens atomically.
+
+        Returns 0.0 on success, otherwise the number of seconds
+        worth waiting before trying again.
+        """
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Tickets of callers that crashed or gave up expire on their own
+            conn.execute("DELETE FROM waiters WHERE expires_at < ?", (now,))
+            head = conn.execute("SELECT MIN(ticket) FROM waiters").fetchone()[0]
+
+            if ticket is None and head is not None:
+                conn.execute("COMMIT")
+                return QUEUE_POLL_SECONDS  # try_acquire never jumps the queue
+            if ticket is not None and head != ticket:
+                conn.execute("COMMIT")
+                return QUEUE_POLL_SECONDS
+
+            levels = self._refill(conn, now)
+            if levels[REQUEST_BUCKET] >= 1 and levels[TOKEN_BUCKET] >= tokens:
+                levels[REQUEST_BUCKET] -= 1
+                levels[TOKEN_BUCKET] -= tokens
+                self._store(conn, levels, now)
+                if ticket is not None:
+                    conn.execute("DELETE FROM waiters WHERE ticket = ?", (ticket,))
+                conn.execute("COMMIT")
+                return 0.0
+
+            self._store(conn, levels, now)
+            conn.execute("COMMIT")
+            return max(
+                (1 - levels[REQUEST_BUCKET]) / self.request_rate,
+                (tokens - levels[TOKEN_BUCKET]) / self.token_rate,
+                QUEUE_POLL_SECONDS
+            )
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # ------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------
+
+    def _clamp(self, tokens: float) -> float:
+        """A single call larger than the bucket would otherwise wait forever"""
+        return min(float(tokens), self.capacities[TOKEN_BUCKET])
+
+    def try_acquire(self, tokens: float = 0) -> bool:
+        """Take quota only if it is available right now and nobody is queued"""
+        acquired = self._try_take(self._clamp(tokens), ticket=None) == 0.0
+        if not acquired:
+            logger.debug(f"Gemini quota unavailable for non-blocking call ({tokens:.0f} tokens)")
+        return acquired
+
+    def acquire(self, tokens: float = 0, max_wait: Optional[float] = None):
+        """
+        Wait in a FIFO queue (shared across processes) until quota is available
+
+        Raises:
+            RateLimitExceeded: if quota is not available within max_wait seconds
+        """
+        max_wait = self.max_wait_seconds if max_wait is None else max_wait
+        tokens = self._clamp(tokens)
+        deadline = time.time() + max_wait
+
+        conn = self._connection()
+        # A little slack so a slow poll does not expire a live ticket
+        cursor = conn.execute(
+            "INSERT INTO waiters (expires_at) VALUES (?)", (deadline + 5 * QUEUE_POLL_SECONDS,)
+        )
+        ticket = cursor.lastrowid
+
+        try:
+            while True:
+                wait = self._try_take(tokens, ticket)
+                if wait == 0.0:
+                    return
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise RateLimitExceeded(
+                        f"Gemini quota not available within {max_wait:.1f}s ({tokens:.0f} tokens)"
+                    )
+                time.sleep(min(wait, remaining))
+        finally:
+            conn.execute("DELETE FROM waiters WHERE ticket = ?", (ticket,))
+
+    def reconcile(self, estimated_tokens: float, actual_tokens: int):
+        """Refund (or charge) the difference between the estimate and the real usage"""
+        delta = self._clamp(estimated_tokens) - actual_tokens
+        if delta == 0:
+            return
+
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            levels = self._refill(conn, now)
+            # Going negative is allowed: it is debt repaid by future refills
+            levels[TOKEN_BUCKET] = min(self.capacities[TOKEN_BUCKET], levels[TOKEN_BUCKET] + delta)
+            self._store(conn, levels, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def record_usage(
+            self,
+            endpoint: str,
+            prompt_tokens: int = 0,
+            output_tokens: int = 0,
+            total_tokens: int = 0,
+            throttled: bool = False
+    ):
+        """Account one call against an endpoint"""
+        self._connection().execute(
+            "INSERT INTO usage (endpoint, requests, prompt_tokens, output_tokens, total_tokens, throttled, updated_at) "
+            "VALUES (?, 1, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(endpoint) DO UPDATE SET "
+            "requests = requests + 1, "
+            "prompt_tokens = prompt_tokens + excluded.prompt_tokens, "
+            "output_tokens = output_tokens + excluded.output_tokens, "
+            "total_tokens = total_tokens + excluded.total_tokens, "
+            "throttled = throttled + excluded.throttled, "
+            "updated_at = excluded.updated_at",
+            (endpoint, prompt_tokens, output_tokens, total_tokens, int(throttled), time.time())
+        )
+
+    def usage_report(self) -> Dict:
+        """Per-endpoint usage plus current bucket levels and queue depth"""
+        conn = self._connection()
+        rows = conn.execute(
+            "SELECT endpoint, requests, prompt_tokens, output_tokens, total_tokens, throttled "
+            "FROM usage ORDER BY endpoint"
+        ).fetchall()
+        levels = self._refill(conn, time.time())
+        queued = conn.execute(
+            "SELECT COUNT(*) FROM waiters WHERE expires_at >= ?", (time.time(),)
+        ).fetchone()[0]
+
+        return {
+            "endpoints": {
+                endpoint: {
+                    "requests": requests,
+                    "prompt_tokens": prompt_tokens,
+                    "output_tokens": output_tokens,
+                    "total_tokens": total_tokens,
+                    "throttled": throttled
+                }
+                for endpoint, requests, prompt_tokens, output_tokens, total_tokens, throttled in rows
+            },
+            "available_requests": round(levels[REQUEST_BUCKET], 2),
+            "available_tokens": round(levels[TOKEN_BUCKET], 2),
+            "queued_callers": queued
+        }
+
+
+def estimate_tokens(prompt: str, max_output_tokens: int) -> int:
+    """Upper-bound estimate (~4 chars per token) charged before the call"""
+    return len(prompt) // 4 + max_output_tokens
+
+
+# Create singleton instance
+gemini_rate_limiter = GeminiRateLimiter(
+    db_path=settings.GEMINI_RATE_LIMIT_DB,
+    requests_per_minute=settings.GEMINI_REQUESTS_PER_MINUTE,
+    tokens_per_minute=settings.GEMINI_TOKENS_PER_MINUTE,
+    max_wait_seconds=settings.GEMINI_RATE_LIMIT_MAX_WAIT
+)
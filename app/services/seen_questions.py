@@ -0,0 +1,157 @@
+"""
+Seen Questions - per-user Bloom filter of already asked bank questions
+Selection only looked at the current interview, so returning users got the same
+top-ranked questions again. Every user gets a fixed-size Bloom filter
+(SEEN_FILTER_BITS, 2 KB by default) of the hr/technical question ids they were
+asked in ANY interview:
+
+  - membership and insert are O(SEEN_FILTER_HASHES) bit probes
+  - contains_many() tests a whole numpy id column at once (snapshot buckets)
+  - a false positive only skips a question the user has not seen; there are
+    no false negatives, so a seen question is never served again while others remain
+
+Stored as one bytea row per user (user_seen_questions), loaded with the
+interview session and rewritten in the same transaction as each
+InterviewQuestion insert, as one upsert (the first write of two workers never
+conflicts). A user without a row is backfilled from their interview history on
+first load. Two interviews of the same user running at once each write their
+own copy (last write wins); the lost bits only mean a possible repeat, never a
+failure.
+"""
+
+import logging
+from typing import Iterable, Optional
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.database.models import Interview, InterviewQuestion, UserSeenQuestions
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Bank question types picked by selection (introductory comes from the roster, experience is per user)
+TRACKED_QUESTION_TYPES = ("hr", "technical")
+
+_MASK64 = (1 << 64) - 1
+
+
+def _splitmix64(x: int) -> int:
+    z = (x + 0x9E3779B97F4A7C15) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+def _splitmix64_array(x: np.ndarray) -> np.ndarray:
+    """Same mix as _splitmix64 over a uint64 array (wrapping arithmetic)"""
+    z = x.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class SeenFilter:
+    """Bloom filter over question ids (double hashing of one 64-bit mix)"""
+
+    __slots__ = ("num_bits", "num_hashes", "bits", "count")
+
+    def __init__(self, num_bits: int, num_hashes: int, data: Optional[bytes] = None, count: int = 0):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bytearray(data) if data is not None else bytearray((num_bits + 7) // 8)
+        if len(self.bits) * 8 != num_bits:
+            raise ValueError(f"Seen filter has {len(self.bits) * 8} bits, expected {num_bits}")
+        self.count = count
+
+    def _positions(self, question_id: int):
+        h = _splitmix64(int(question_id))
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, question_id: int) -> bool:
+        """Set the id's bits; False if they were all set already"""
+        added = False
+        for position in self._positions(question_id):
+            byte, bit = position >> 3, 1 << (position & 7)
+            if not self.bits[byte] & bit:
+                self.bits[byte] |= bit
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, question_id) -> bool:
+        for position in self._positions(question_id):
+            if not self.bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def contains_many(self, question_ids: np.ndarray) -> np.ndarray:
+        """Vectorized membership: bool mask, one entry per id"""
+        ids = np.asarray(question_ids, dtype=np.int64)
+        if len(ids) == 0 or self.count == 0:
+            return np.zeros(len(ids), dtype=bool)
+        seen = np.ones(len(ids), dtype=bool)
+        bits = np.unpackbits(np.frombuffer(bytes(self.bits), dtype=np.uint8), bitorder="little")
+        h = _splitmix64_array(ids)
+        h1, h2 = h & np.uint64(0xFFFFFFFF), (h >> np.uint64(32)) | np.uint64(1)
+        for i in range(self.num_hashes):
+            seen &= bits[((h1 + np.uint64(i) * h2) % np.uint64(self.num_bits)).astype(np.int64)].astype(bool)
+        return seen
+
+    def __len__(self) -> int:
+        return self.count
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.bits)
+
+    def false_positive_rate(self) -> float:
+        """Expected false-positive rate at the current fill"""
+        return float((1 - np.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes)
+
+
+def new_filter(data: Optional[bytes] = None, count: int = 0) -> SeenFilter:
+    return SeenFilter(settings.SEEN_FILTER_BITS, settings.SEEN_FILTER_HASHES, data, count)
+
+
+class SeenQuestionService:
+    """Load / persist the per-user filters (callers commit)"""
+
+    @staticmethod
+    def load(db: Session, user_id: int) -> SeenFilter:
+        """The user's filter (one query), backfilled from past interviews when there is no row yet"""
+        row = (
+            db.query(UserSeenQuestions.bloom, UserSeenQuestions.item_count)
+            .filter(UserSeenQuestions.user_id == user_id)
+            .first()
+        )
+        if row is not None:
+            try:
+                return new_filter(row.bloom, row.item_count or 0)
+            except ValueError as e:  # SEEN_FILTER_BITS changed: rebuild from history
+                logger.warning(f"user_id={user_id}: {e}")
+
+        seen = new_filter()
+        for (question_id,) in (
+            db.query(InterviewQuestion.question_id)
+            .join(Interview, Interview.interview_id == InterviewQuestion.interview_id)
+            .filter(Interview.user_id == user_id, InterviewQuestion.question_type.in_(TRACKED_QUESTION_TYPES))
+            .distinct()
+        ):
+            seen.add(question_id)
+        logger.debug(f"user_id={user_id} seen filter backfilled with {len(seen)} questions")
+        return seen
+
+    @staticmethod
+    def record(db: Session, user_id: int, seen: SeenFilter, question_ids: Iterable[int]):
+        """Add the ids and write the filter in the caller's transaction (no-op if nothing changed)"""
+        if not any([seen.add(question_id) for question_id in question_ids]):
+            return
+        statement = insert(UserSeenQuestions).values(user_id=user_id, bloom=seen.to_bytes(), item_count=len(seen))
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[UserSeenQuestions.user_id],
+            set_={"bloom": statement.excluded.bloom, "item_count": statement.excluded.item_count,
+                  "updated_at": func.now()}
+        ))
@@ -0,0 +1,140 @@
+"""
+Usage Tracker - write-behind usage_count aggregation
+Increments are summed in memory and written with one atomic statement per flush:
+
+    UPDATE global_questions SET usage_count = coalesce(usage_count, 0) + v.delta
+    FROM (VALUES (:id, :delta), ...) AS v (question_id, delta)
+    WHERE global_questions.question_id = v.question_id
+
+Flushes run on a background thread every USAGE_FLUSH_INTERVAL_SECONDS, early
+when USAGE_FLUSH_THRESHOLD questions are pending, and once more on shutdown.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import Integer, column, func, update, values
+from app.database.postgres_db import SessionLocal
+from app.database.models import GlobalQuestion
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+FLUSH_CHUNK_SIZE = 1000  # rows per UPDATE ... FROM (VALUES ...)
+
+
+class UsageTracker:
+    """Per-process usage_count accumulator"""
+
+    def __init__(self, flush_interval: float, flush_threshold: int):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._pending: Dict[int, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._listeners: List[Callable[[Dict[int, int]], None]] = []
+        self._stats = {"recorded": 0, "flushes": 0, "rows_flushed": 0, "failed_flushes": 0, "last_flush_ms": 0.0}
+
+    def record(self, question_id: int, count: int = 1):
+        """O(1), no database access"""
+        with self._lock:
+            self._pending[question_id] += count
+            self._stats["recorded"] += count
+            should_flush = len(self._pending) >= self.flush_threshold
+        if should_flush:
+            self._wake.set()
+
+    def on_flush(self, callback: Callable[[Dict[int, int]], None]):
+        """callback({question_id: delta}) after each successful flush"""
+        self._listeners.append(callback)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Write all pending increments; on failure they are put back for the next flush"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, defaultdict(int)
+            if not batch:
+                return 0
+
+            started = time.perf_counter()
+            rows = sorted(batch.items())  # fixed lock order across processes
+            db = SessionLocal()
+            try:
+                for i in range(0, len(rows), FLUSH_CHUNK_SIZE):
+                    deltas = values(
+                        column("question_id", Integer), column("delta", Integer), name="v"
+                    ).data(rows[i:i + FLUSH_CHUNK_SIZE])
+                    db.execute(
+                        update(GlobalQuestion)
+                        .where(GlobalQuestion.question_id == deltas.c.question_id)
+                        .values(usage_count=func.coalesce(GlobalQuestion.usage_count, 0) + deltas.c.delta)
+                    )
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                with self._lock:
+                    for question_id, delta in batch.items():
+                        self._pending[question_id] += delta
+                    self._stats["failed_flushes"] += 1
+                logger.error(f"❌ Usage flush of {len(batch)} questions failed, will retry: {e}")
+                return 0
+            finally:
+                db.close()
+
+            with self._lock:
+                self._stats["flushes"] += 1
+                self._stats["rows_flushed"] += len(rows)
+                self._stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            logger.debug(f"Flushed usage counts for {len(rows)} questions")
+
+        for callback in self._listeners:
+            try:
+                callback(dict(batch))
+            except Exception as e:
+                logger.error(f"Usage flush listener failed: {e}")
+        return len(rows)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="usage-tracker", daemon=True)
+        self._thread.start()
+        logger.info(f"✓ Usage tracker flushing every {self.flush_interval}s / {self.flush_threshold} questions")
+
+    def stop(self):
+        """Stop the flusher and write whatever is still pending"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        flushed = self.flush()
+        logger.info(f"✓ Usage tracker stopped ({flushed} questions flushed on shutdown)")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self._stats, "pending_questions": len(self._pending)}
+
+
+# Global instance
+usage_tracker = UsageTracker(
+    flush_interval=settings.USAGE_FLUSH_INTERVAL_SECONDS,
+    flush_threshold=settings.USAGE_FLUSH_THRESHOLD
+)
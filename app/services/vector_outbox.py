@@ -0,0 +1,317 @@
+"""
+Vector Outbox - PostgreSQL -> ChromaDB writes via a transactional outbox
+QuestionService adds a vector_outbox row in the SAME transaction as the question
+change, so the request path pays for one PostgreSQL insert and a rolled-back
+transaction never leaves an orphan vector.
+
+A background dispatcher drains the table in batches:
+  1. claim entries with SELECT ... FOR UPDATE SKIP LOCKED (several processes can dispatch)
+  2. collapse them per question and re-read the CURRENT rows: a delete wins, then
+     an upsert (text changed / new vector), then a metadata-only update
+  3. one batched encode + one ChromaDB upsert, one metadata update, one batched delete
+  4. delete the entries; if the batch fails, each question's entries are retried
+     on their own, and still-failing ones later with exponential backoff
+  5. after VECTOR_OUTBOX_MAX_ATTEMPTS failures an entry is parked: the row and
+     its last_error stay for inspection, but it is no longer claimed
+Every step is idempotent: upserts are keyed by question_id and rebuilt from the
+row as it is now, and an upsert for a row that no longer exists becomes a delete.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.orm import Session
+from app.database.postgres_db import SessionLocal
+from app.database.models import GlobalQuestion, VectorOutbox
+from app.database.chroma_db import chroma_db
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+UPSERT = "upsert"  # (re-)encode the text and write vector + metadata
+METADATA = "metadata"  # text unchanged: rewrite metadata only, no encoding
+DELETE = "delete"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class VectorOutboxDispatcher:
+    """Enqueues vector writes inside the caller's transaction and applies them in the background"""
+
+    def __init__(self, batch_size: int, poll_interval: float, retry_backoff: float, max_backoff: float,
+                 max_attempts: int):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {"dispatched": 0, "upserted": 0, "metadata_updated": 0, "deleted": 0, "batches": 0,
+                       "failed_batches": 0, "parked": 0, "last_batch_ms": 0.0}
+
+    # ------------------------------------------------------------
+    # Enqueue (caller commits)
+    # ------------------------------------------------------------
+
+    def enqueue_upsert(self, db: Session, question_id: int, embedding: Optional[List[float]] = None):
+        db.add(VectorOutbox(
+            question_id=question_id,
+            operation=UPSERT,
+            embedding=[float(x) for x in embedding] if embedding is not None else None
+        ))
+
+    def enqueue_metadata(self, db: Session, question_id: int):
+        db.add(VectorOutbox(question_id=question_id, operation=METADATA))
+
+    def enqueue_delete(self, db: Session, question_id: int):
+        db.add(VectorOutbox(question_id=question_id, operation=DELETE))
+
+    def notify(self):
+        """Call after committing enqueued entries: the dispatcher runs now instead of at the next poll"""
+        self._wake.set()
+
+    # ------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------
+
+    def _claimable(self, now: datetime):
+        """Entries due for dispatch: not waiting for a retry and not parked"""
+        return (
+            or_(VectorOutbox.available_at.is_(None), VectorOutbox.available_at <= now),
+            func.coalesce(VectorOutbox.attempts, 0) < self.max_attempts
+        )
+
+    def dispatch_once(self) -> int:
+        """Apply one batch; returns the number of entries consumed (0 when idle or on failure)"""
+        db = SessionLocal()
+        claimed = {}  # entry id -> question id (kept for the retry after a rollback)
+        try:
+            entries = db.scalars(
+                select(VectorOutbox)
+                .where(*self._claimable(_utcnow()))
+                .order_by(VectorOutbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not entries:
+                db.commit()
+                return 0
+            claimed = {entry.id: entry.question_id for entry in entries}
+            return self._apply(db, entries)
+
+        except Exception as e:
+            db.rollback()
+            with self._lock:
+                self._stats["failed_batches"] += 1
+            if not claimed:
+                logger.error(f"❌ Vector outbox dispatch failed: {e}")
+                return 0
+            by_question = {}
+            for entry_id, question_id in claimed.items():
+                by_question.setdefault(question_id, []).append(entry_id)
+            if len(by_question) == 1:
+                self._schedule_retry(db, list(claimed), e)
+                return 0
+            # Isolate the failure: one bad question must not hold back the rest of the batch
+            logger.warning(f"Vector outbox batch of {len(claimed)} failed ({e}), retrying per question")
+            return sum(self._dispatch_entries(entry_ids) for entry_ids in by_question.values())
+        finally:
+            db.close()
+
+    def _dispatch_entries(self, entry_ids: List[int]) -> int:
+        """Re-claim and apply specific entries (one question's) on their own; schedule a retry on failure"""
+        db = SessionLocal()
+        try:
+            entries = db.scalars(
+                select(VectorOutbox)
+                .where(VectorOutbox.id.in_(entry_ids))
+                .order_by(VectorOutbox.id)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not entries:
+                db.commit()
+                return 0
+            return self._apply(db, entries)
+        except Exception as e:
+            db.rollback()
+            self._schedule_retry(db, entry_ids, e)
+            return 0
+        finally:
+            db.close()
+
+    def _apply(self, db: Session, entries: List[VectorOutbox]) -> int:
+        """Collapse the claimed entries, write ChromaDB, delete the entries and commit"""
+        started = time.perf_counter()
+        entry_ids = [entry.id for entry in entries]
+
+        plan = {}  # question_id -> (operation, embedding)
+        for entry in entries:  # ordered by id
+            operation, embedding = plan.get(entry.question_id, (METADATA, None))
+            if entry.operation == DELETE or operation == DELETE:
+                plan[entry.question_id] = (DELETE, None)
+            elif entry.operation == UPSERT:
+                plan[entry.question_id] = (UPSERT, entry.embedding)  # latest text change
+            else:
+                plan[entry.question_id] = (operation, embedding)
+
+        live_ids = [qid for qid, (operation, _) in plan.items() if operation != DELETE]
+        rows = {
+            question.question_id: question
+            for question in db.query(GlobalQuestion).filter(GlobalQuestion.question_id.in_(live_ids))
+        } if live_ids else {}
+
+        upserts, metadata_updates = [], []
+        for qid in live_ids:
+            if qid not in rows:
+                continue
+            row = rows[qid]
+            vector_row = {
+                "question_id": qid,
+                "question_text": row.question_text,
+                "question_type": row.question_type,
+                "subcategory": row.subcategory,
+                "industry": row.industry,
+                "job_role": row.job_role,
+                "difficulty": row.difficulty,
+                "tags": row.tags,
+                "is_static": row.is_static
+            }
+            operation, embedding = plan[qid]
+            if operation == UPSERT:
+                upserts.append({**vector_row, "embedding": embedding})
+            else:
+                metadata_updates.append(vector_row)
+        deletes = [qid for qid in plan if qid not in rows]  # delete entries + rows deleted since
+
+        chroma_db.upsert_questions(upserts)
+        chroma_db.update_questions_metadata(metadata_updates)
+        chroma_db.delete_questions(deletes)
+
+        db.execute(delete(VectorOutbox).where(VectorOutbox.id.in_(entry_ids)))
+        db.commit()
+
+        with self._lock:
+            self._stats["dispatched"] += len(entries)
+            self._stats["upserted"] += len(upserts)
+            self._stats["metadata_updated"] += len(metadata_updates)
+            self._stats["deleted"] += len(deletes)
+            self._stats["batches"] += 1
+            self._stats["last_batch_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        logger.debug(
+            f"Vector outbox: {len(upserts)} upserted, {len(metadata_updates)} metadata-only, "
+            f"{len(deletes)} deleted ({len(entries)} entries)"
+        )
+        return len(entries)
+
+    def _schedule_retry(self, db: Session, entry_ids: List[int], error: Exception):
+        """attempts + 1 with exponential backoff; entries reaching max_attempts are parked"""
+        try:
+            attempts = db.scalar(
+                select(func.max(func.coalesce(VectorOutbox.attempts, 0))).where(VectorOutbox.id.in_(entry_ids))
+            )
+            if attempts is None:
+                return  # already dispatched by someone else
+            attempts += 1
+            backoff = min(self.retry_backoff * 2 ** (attempts - 1), self.max_backoff)
+            db.execute(
+                update(VectorOutbox)
+                .where(VectorOutbox.id.in_(entry_ids))
+                .values(
+                    attempts=func.coalesce(VectorOutbox.attempts, 0) + 1,
+                    last_error=str(error)[:1000],
+                    available_at=_utcnow() + timedelta(seconds=backoff)
+                )
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Could not schedule vector outbox retry: {e}")
+            return
+        if attempts >= self.max_attempts:
+            with self._lock:
+                self._stats["parked"] += len(entry_ids)
+            logger.error(
+                f"❌ Vector outbox entries {entry_ids} parked after {attempts} failed attempts: {error}"
+            )
+        else:
+            logger.error(
+                f"❌ Vector outbox entries {entry_ids} failed (attempt {attempts}), "
+                f"retrying in {backoff:.0f}s: {error}"
+            )
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.dispatch_once() >= self.batch_size:
+                continue  # backlog: keep draining
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vector-outbox", daemon=True)
+        self._thread.start()
+        logger.info(f"✓ Vector outbox dispatcher started (batch {self.batch_size}, poll {self.poll_interval}s)")
+
+    def stop(self):
+        """Stop the dispatcher after its current batch (pending entries stay in the table)"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+        logger.info("✓ Vector outbox dispatcher stopped")
+
+    # ------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------
+
+    def lag(self, db: Session) -> dict:
+        """Pending entries, the age of the oldest one, retrying and parked counts (one aggregate query)"""
+        live = func.coalesce(VectorOutbox.attempts, 0) < self.max_attempts
+        pending, oldest, retrying, parked = db.execute(
+            select(
+                func.count().filter(live),
+                func.min(VectorOutbox.created_at).filter(live),
+                func.count().filter(live, VectorOutbox.attempts > 0),
+                func.count().filter(~live)
+            )
+        ).one()
+        if oldest is not None and oldest.tzinfo is None:
+            oldest = oldest.replace(tzinfo=timezone.utc)
+        return {
+            "pending": pending,
+            "retrying": retrying,
+            "parked": parked,
+            "oldest_age_seconds": round((_utcnow() - oldest).total_seconds(), 1) if oldest else 0.0
+        }
+
+    def snapshot(self, db: Optional[Session] = None) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        if db is not None:
+            try:
+                stats.update(self.lag(db))
+            except Exception as e:
+                logger.error(f"Error reading vector outbox lag: {e}")
+        return stats
+
+
+# Global instance
+vector_outbox = VectorOutboxDispatcher(
+    batch_size=settings.VECTOR_OUTBOX_BATCH_SIZE,
+    poll_interval=settings.VECTOR_OUTBOX_POLL_SECONDS,
+    retry_backoff=settings.VECTOR_OUTBOX_RETRY_BACKOFF,
+    max_backoff=settings.VECTOR_OUTBOX_MAX_BACKOFF,
+    max_attempts=settings.VECTOR_OUTBOX_MAX_ATTEMPTS
+)